@@ -0,0 +1,396 @@
+import numpy as np
+import numpy.typing as npt
+
+from esawindowsystem.core.BCJR_decoder_utils import (MaxStarFunction, get_max_star, max_star_arr, max_star_modes,
+                                                     max_star_reduce_arr)
+from esawindowsystem.core.trellis import TrellisTables
+
+try:
+    from esawindowsystem.core.numba_utils import outer_forward_backward_numba
+except ImportError:
+    # numba_utils was compiled before the kernel was added, fall back to the JIT compiled version
+    from esawindowsystem.core.get_num_events_per_slot import \
+        outer_forward_backward as outer_forward_backward_numba
+
+# Number of stages after a window that the backward recursion of the sliding window SISOs uses to train the betas
+default_training_size: int = 32
+
+
+def calculate_gammas_arr(
+        tables: TrellisTables,
+        received_sequence: npt.NDArray[np.float64],
+        Es: float,
+        N0: float) -> npt.NDArray[np.float64]:
+    """Array based version of `calculate_gammas` (log BCJR). Returns gammas with shape (stages, states, edges). """
+    num_output_bits: int = tables.edge_outputs.shape[-1]
+    r = np.asarray(received_sequence, dtype=np.float64)[:tables.time_steps * num_output_bits]
+    r = r.reshape((-1, num_output_bits))
+
+    edge_outputs = tables.edge_outputs.reshape((-1, num_output_bits)).astype(np.float64)
+    gammas = Es / N0 * 2 * (r @ edge_outputs.T)
+    gammas = gammas.reshape((-1, tables.num_states, tables.num_edges))
+
+    return np.where(tables.valid_edges, gammas, -np.inf)
+
+
+def calculate_outer_gammas_arr(
+        tables: TrellisTables,
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        first_stage: int = 0) -> npt.NDArray[np.float64]:
+    """Array based version of `set_outer_code_gammas`. Returns gammas with shape (stages, states, edges).
+
+    `symbol_bit_LLRs` can have leading batch dimensions (for example one row per codeword), which are kept. It can
+    also cover only part of the trellis, starting at `first_stage`. """
+    num_output_bits: int = tables.edge_outputs.shape[-1]
+    symbol_bit_LLRs = np.asarray(symbol_bit_LLRs, dtype=np.float64)
+    symbol_bit_LLRs = symbol_bit_LLRs.reshape(symbol_bit_LLRs.shape[:-1] + (-1, num_output_bits))
+
+    edge_signs = ((-1.0)**tables.edge_outputs).reshape((-1, num_output_bits))
+    gammas = 0.5 * (symbol_bit_LLRs @ edge_signs.T)
+    gammas = gammas.reshape(gammas.shape[:-1] + (tables.num_states, tables.num_edges))
+    valid_edges = tables.valid_edges[first_stage:first_stage + gammas.shape[-3]]
+
+    return np.where(valid_edges, gammas, -np.inf)
+
+
+def calculate_alphas_arr(
+        tables: TrellisTables,
+        gammas: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """ Calculate the alpha for each state in the trellis, see `calculate_alphas`.
+
+    Returns an array with shape (stages, states), with one more stage than there are time steps.
+    Leading batch dimensions of `gammas` are kept. """
+    time_steps: int = gammas.shape[-3]
+    alphas = np.empty(gammas.shape[:-3] + (time_steps + 1, tables.num_states), dtype=np.float64)
+
+    # Encoder is initiated in the all zeros state, so only alpha[0, 0] is non-zero for the first column
+    if tables.zero_initiated:
+        alphas[..., 0, 0] = 0
+        alphas[..., 0, 1:] = -np.inf
+    else:
+        alphas[..., 0, :] = 0
+
+    # Gammas of the edges going into each state, with shape (stages, states, incoming edges)
+    incoming_gammas = gammas[..., tables.previous_states, tables.previous_edges]
+
+    for k in range(time_steps):
+        incoming_alphas = alphas[..., k, tables.previous_states]
+        alphas[..., k + 1, :] = max_star_reduce_arr(incoming_alphas + incoming_gammas[..., k, :, :], max_star=max_star)
+
+    return alphas
+
+
+def calculate_betas_arr(
+        tables: TrellisTables,
+        gammas: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """ Calculate the beta for each state in the trellis, see `calculate_betas`.
+
+    Returns an array with shape (stages, states), with one more stage than there are time steps.
+    Leading batch dimensions of `gammas` are kept. """
+    time_steps: int = gammas.shape[-3]
+    betas = np.empty(gammas.shape[:-3] + (time_steps + 1, tables.num_states), dtype=np.float64)
+
+    if tables.zero_terminated:
+        betas[..., -1, 0] = 0
+        betas[..., -1, 1:] = -np.inf
+    else:
+        betas[..., -1, :] = 0
+
+    for k in reversed(range(time_steps)):
+        betas[..., k, :] = max_star_reduce_arr(betas[..., k + 1, tables.next_states] + gammas[..., k, :, :],
+                                               max_star=max_star)
+
+    return betas
+
+
+def calculate_edge_lambdas_arr(
+        tables: TrellisTables,
+        alphas: npt.NDArray[np.float64],
+        gammas: npt.NDArray[np.float64],
+        betas: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Array based version of `set_edge_lambda`. Returns lambdas with shape (stages, states, edges). """
+    return alphas[..., :-1, :, np.newaxis] + gammas + betas[..., 1:, tables.next_states]
+
+
+def _max_star_where(
+        lambdas: npt.NDArray[np.float64],
+        mask: npt.NDArray[np.bool_],
+        empty_value: float = -np.inf,
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """Max star over the (state, edge) axes of `lambdas`, only taking the edges selected by `mask` into account.
+
+    Stages where none of the selected edges exist get `empty_value`. """
+    flat_lambdas = lambdas.reshape(lambdas.shape[:-2] + (-1,))
+    selected = np.where(mask.reshape(-1), flat_lambdas, -np.inf)
+    result = max_star_reduce_arr(selected, max_star=max_star)
+
+    if empty_value != -np.inf:
+        result = np.where(result == -np.inf, empty_value, result)
+
+    return result
+
+
+def calculate_LLRs_arr(
+        tables: TrellisTables,
+        lambdas: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """Array based version of `calculate_LLRs` (log BCJR). The LLR is the log of P(u=1)/P(u=0). """
+    numerator = _max_star_where(lambdas, tables.edge_input_labels == 1, max_star=max_star)
+    denominator = _max_star_where(lambdas, tables.edge_input_labels == 0, max_star=max_star)
+
+    return numerator - denominator
+
+
+def calculate_outer_SISO_LLRs_arr(
+        tables: TrellisTables,
+        lambdas: npt.NDArray[np.float64],
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Array based version of `calculate_outer_SISO_LLRs`.
+
+    Like `calculate_p_xk_O`, a bit value without any edges contributes 0 instead of -inf. This happens for the input bit
+    in the zero terminated stages, and keeps the extrinsic information finite. """
+    num_output_bits: int = tables.edge_outputs.shape[-1]
+    symbol_bit_LLRs = np.asarray(symbol_bit_LLRs, dtype=np.float64).reshape(lambdas.shape[:-2] + (num_output_bits,))
+
+    p_xk_O = np.zeros(lambdas.shape[:-2] + (num_output_bits,))
+    for i in range(num_output_bits):
+        p_xk_O[..., i] = _max_star_where(lambdas, tables.edge_outputs[:, :, i] == 0, 0, max_star) - \
+            _max_star_where(lambdas, tables.edge_outputs[:, :, i] == 1, 0, max_star) - symbol_bit_LLRs[..., i]
+
+    p_uk_O = _max_star_where(lambdas, tables.edge_input_labels == 0, 0, max_star) - \
+        _max_star_where(lambdas, tables.edge_input_labels == 1, 0, max_star)
+
+    return p_xk_O, p_uk_O
+
+
+def _predict_outer_SISO_windows(
+        tables: TrellisTables,
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        mode_number: int,
+        window_size: int,
+        training_size: int) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Sliding window outer SISO for one codeword, with `symbol_bit_LLRs` of shape (stages, output bits).
+
+    The alphas are carried over from one window to the next. The betas of each window are trained with a backward
+    recursion over the next `training_size` stages, starting with all states equally likely. Only the gammas, alphas
+    and betas of one window and its training stages are kept in memory. """
+    time_steps: int = symbol_bit_LLRs.shape[0]
+    p_xk_O = np.empty(symbol_bit_LLRs.shape)
+    p_uk_O = np.empty(time_steps)
+
+    alphas = tables.get_initial_alphas()
+    for start in range(0, time_steps, window_size):
+        end: int = min(start + window_size, time_steps)
+        training_end: int = min(end + training_size, time_steps)
+
+        gammas = calculate_outer_gammas_arr(tables, symbol_bit_LLRs[start:training_end].flatten(), first_stage=start)
+        final_betas = tables.get_final_betas() if training_end == time_steps else np.zeros(tables.num_states)
+
+        window_alphas, _, window_p_xk_O, window_p_uk_O = outer_forward_backward_numba(
+            gammas, tables.next_states, tables.edge_input_labels, tables.edge_outputs,
+            symbol_bit_LLRs[start:training_end], alphas, final_betas, mode_number)
+
+        p_xk_O[start:end] = window_p_xk_O[:end - start]
+        p_uk_O[start:end] = window_p_uk_O[:end - start]
+        alphas = window_alphas[end - start]
+
+    return p_xk_O, p_uk_O
+
+
+def predict_outer_SISO_arr(
+        tables: TrellisTables,
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        max_star_mode: str = 'lookup',
+        window_size: int | None = None,
+        training_size: int = default_training_size) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Run the outer SISO (BCJR on the convolutional code) on the a priori bit LLRs `symbol_bit_LLRs`.
+
+    The forward-backward pass is done by the compiled `outer_forward_backward_numba` kernel, one codeword at a time,
+    with the max star approximation `max_star_mode` (see `max_star_modes`). When `window_size` is given, the sliding
+    window log-MAP algorithm is used, see `_predict_outer_SISO_windows`.
+    Returns the extrinsic output bit LLRs (p_xk_O) and the input bit LLRs (p_uk_O). """
+    # Raises a ValueError for unknown modes
+    get_max_star(max_star_mode)
+    mode_number: int = list(max_star_modes).index(max_star_mode)
+    num_output_bits: int = tables.edge_outputs.shape[-1]
+
+    symbol_bit_LLRs = np.asarray(symbol_bit_LLRs, dtype=np.float64)
+    batch_shape = symbol_bit_LLRs.shape[:-1]
+    symbol_bit_LLRs = symbol_bit_LLRs.reshape((-1, symbol_bit_LLRs.shape[-1] // num_output_bits, num_output_bits))
+
+    p_xk_O = np.empty(symbol_bit_LLRs.shape)
+    p_uk_O = np.empty(symbol_bit_LLRs.shape[:2])
+    for i in range(symbol_bit_LLRs.shape[0]):
+        if window_size is not None:
+            p_xk_O[i], p_uk_O[i] = _predict_outer_SISO_windows(
+                tables, symbol_bit_LLRs[i], mode_number, window_size, training_size)
+            continue
+
+        gammas = calculate_outer_gammas_arr(tables, symbol_bit_LLRs[i].flatten())
+        _, _, p_xk_O[i], p_uk_O[i] = outer_forward_backward_numba(
+            gammas, tables.next_states, tables.edge_input_labels, tables.edge_outputs, symbol_bit_LLRs[i],
+            tables.get_initial_alphas(), tables.get_final_betas(), mode_number)
+
+    return p_xk_O.reshape(batch_shape + p_xk_O.shape[1:]), p_uk_O.reshape(batch_shape + p_uk_O.shape[1:])
+
+
+def calculate_inner_gammas_arr(
+        tables: TrellisTables,
+        channel_log_likelihoods: npt.NDArray[np.float64],
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        first_stage: int = 0) -> npt.NDArray[np.float64]:
+    """Array based version of `calculate_gamma_inner_SISO_arr`. Returns gammas with shape (stages, states, edges).
+
+    `channel_log_likelihoods` has shape (stages, M) and `symbol_bit_LLRs` has shape (stages, m), both can have leading
+    batch dimensions. They can also cover only part of the trellis, starting at `first_stage`. """
+    edge_signs = 0.5 * (-1.0)**tables.edge_inputs
+    bit_gammas = np.sum(edge_signs * symbol_bit_LLRs[..., np.newaxis, np.newaxis, :], axis=-1)
+    gammas = bit_gammas + channel_log_likelihoods[..., tables.edge_output_labels]
+    valid_edges = tables.valid_edges[first_stage:first_stage + gammas.shape[-3]]
+
+    return np.where(valid_edges, gammas, -np.inf)
+
+
+def calculate_gamma_primes_arr(
+        tables: TrellisTables,
+        gammas: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """Array based version of `calculate_gamma_primes`.
+
+    Combines the parallel edges between each pair of states, returns an array with shape (stages, from state, to state).
+    """
+    to_states = np.arange(tables.num_states)
+    parallel_edges = tables.next_states[:, np.newaxis, :] == to_states[np.newaxis, :, np.newaxis]
+    parallel_gammas = np.where(parallel_edges, gammas[..., :, np.newaxis, :], -np.inf)
+
+    return max_star_reduce_arr(parallel_gammas, max_star=max_star)
+
+
+def calculate_inner_alphas_arr(
+        gamma_primes: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr,
+        initial_alphas: npt.NDArray[np.float64] | None = None) -> npt.NDArray[np.float64]:
+    """Array based version of `calculate_alpha_inner_SISO`. Returns an array with shape (stages, states).
+
+    Without `initial_alphas`, `gamma_primes` starts at the first stage of the trellis. Otherwise the recursion
+    continues from `initial_alphas`, for example the last alphas of the previous window. """
+    time_steps: int = gamma_primes.shape[-3]
+    num_states: int = gamma_primes.shape[-1]
+    alphas = np.empty(gamma_primes.shape[:-3] + (time_steps + 1, num_states), dtype=np.float64)
+
+    first_stage: int = 0
+    if initial_alphas is not None:
+        alphas[..., 0, :] = initial_alphas
+    else:
+        # Encoder is initiated in the all zeros state. Like `max_star_lru(a0, -inf)`, the single path into
+        # each state of the second stage gets log(2) added. The other max star modes do not change with an offset.
+        alphas[..., 0, 0] = 0
+        alphas[..., 0, 1:] = -np.inf
+        alphas[..., 1, :] = gamma_primes[..., 0, 0, :] + np.log(2)
+        first_stage = 1
+
+    for k in range(first_stage, time_steps):
+        alphas[..., k + 1, :] = max_star_reduce_arr(alphas[..., k, :, np.newaxis] + gamma_primes[..., k, :, :],
+                                                    axis=-2, max_star=max_star)
+
+    return alphas
+
+
+def calculate_inner_betas_arr(
+        gamma_primes: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """Array based version of `calculate_beta_inner_SISO`. Returns an array with shape (stages, states).
+
+    The inner code is not terminated, so all states of the last stage are equally likely. This is also the starting
+    point of the training recursion of the sliding window SISO. """
+    time_steps: int = gamma_primes.shape[-3]
+    num_states: int = gamma_primes.shape[-1]
+    betas = np.empty(gamma_primes.shape[:-3] + (time_steps + 1, num_states), dtype=np.float64)
+    betas[..., -1, :] = 0
+
+    for k in reversed(range(time_steps)):
+        betas[..., k, :] = max_star_reduce_arr(betas[..., k + 1, np.newaxis, :] + gamma_primes[..., k, :, :],
+                                               max_star=max_star)
+
+    return betas
+
+
+def calculate_inner_SISO_LLRs_arr(
+        tables: TrellisTables,
+        lambdas: npt.NDArray[np.float64],
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """Array based version of `calculate_inner_SISO_LLRs`. Returns the extrinsic bit LLRs, with shape (stages, m). """
+    num_input_bits: int = tables.edge_inputs.shape[-1]
+    LLRs = np.zeros(lambdas.shape[:-2] + (num_input_bits,))
+
+    for i in range(num_input_bits):
+        LLRs[..., i] = _max_star_where(lambdas, tables.edge_inputs[:, :, i] == 0, max_star=max_star) - \
+            _max_star_where(lambdas, tables.edge_inputs[:, :, i] == 1, max_star=max_star) - symbol_bit_LLRs[..., i]
+
+    return LLRs
+
+
+def _predict_inner_SISO_windows(
+        tables: TrellisTables,
+        channel_log_likelihoods: npt.NDArray[np.float64],
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        max_star: MaxStarFunction,
+        window_size: int,
+        training_size: int) -> npt.NDArray[np.float64]:
+    """Sliding window version of `predict_inner_SISO_arr`, see `_predict_outer_SISO_windows`. """
+    time_steps: int = channel_log_likelihoods.shape[-2]
+    LLRs = np.empty(symbol_bit_LLRs.shape)
+
+    alphas: npt.NDArray[np.float64] | None = None
+    for start in range(0, time_steps, window_size):
+        end: int = min(start + window_size, time_steps)
+        training_end: int = min(end + training_size, time_steps)
+
+        gammas = calculate_inner_gammas_arr(tables, channel_log_likelihoods[..., start:training_end, :],
+                                            symbol_bit_LLRs[..., start:training_end, :], first_stage=start)
+        gamma_primes = calculate_gamma_primes_arr(tables, gammas, max_star)
+
+        window_alphas = calculate_inner_alphas_arr(gamma_primes[..., :end - start, :, :], max_star, alphas)
+        betas = calculate_inner_betas_arr(gamma_primes, max_star)[..., :end - start + 1, :]
+        lambdas = calculate_edge_lambdas_arr(tables, window_alphas, gammas[..., :end - start, :, :], betas)
+
+        LLRs[..., start:end, :] = calculate_inner_SISO_LLRs_arr(
+            tables, lambdas, symbol_bit_LLRs[..., start:end, :], max_star)
+        alphas = window_alphas[..., -1, :]
+
+    return LLRs
+
+
+def predict_inner_SISO_arr(
+        tables: TrellisTables,
+        channel_log_likelihoods: npt.NDArray[np.float64],
+        symbol_bit_LLRs: npt.NDArray[np.float64] | None = None,
+        max_star_mode: str = 'lookup',
+        window_size: int | None = None,
+        training_size: int = default_training_size) -> npt.NDArray[np.float64]:
+    """Run the inner SISO (BCJR on the accumulator and PPM mapping) on the channel symbol log likelihoods.
+
+    `channel_log_likelihoods` has shape (PPM symbols, M) and `symbol_bit_LLRs` has shape (PPM symbols, m), both can
+    have leading batch dimensions. `max_star_mode` selects the max star approximation, see `max_star_modes`. When
+    `window_size` is given, the sliding window log-MAP algorithm is used.
+    Returns the extrinsic bit LLRs with the same shape as `symbol_bit_LLRs`. """
+    max_star = get_max_star(max_star_mode)
+    channel_log_likelihoods = np.asarray(channel_log_likelihoods, dtype=np.float64)
+    if symbol_bit_LLRs is None:
+        symbol_bit_LLRs = np.zeros(channel_log_likelihoods.shape[:-1] + (tables.edge_inputs.shape[-1],))
+
+    if window_size is not None:
+        return _predict_inner_SISO_windows(tables, channel_log_likelihoods, symbol_bit_LLRs, max_star, window_size,
+                                           training_size)
+
+    gammas = calculate_inner_gammas_arr(tables, channel_log_likelihoods, symbol_bit_LLRs)
+    gamma_primes = calculate_gamma_primes_arr(tables, gammas, max_star)
+    alphas = calculate_inner_alphas_arr(gamma_primes, max_star)
+    betas = calculate_inner_betas_arr(gamma_primes, max_star)
+    lambdas = calculate_edge_lambdas_arr(tables, alphas, gammas, betas)
+
+    return calculate_inner_SISO_LLRs_arr(tables, lambdas, symbol_bit_LLRs, max_star)
@@ -1,10 +1,9 @@
 import itertools
+from collections.abc import Iterable
 from copy import deepcopy
 from fractions import Fraction
 from itertools import chain
 from math import exp, prod
-import pickle
-from pathlib import Path
 
 import numpy as np
 import numpy.typing as npt
@@ -13,19 +12,22 @@ from tqdm import tqdm
 
 # from esawindowsystem.core.max_star import max_star, max_star_recursive
 from esawindowsystem.core.numba_utils import max_star_recursive_numba
+from esawindowsystem.core.BCJR_array_decoder import (calculate_alphas_arr, calculate_betas_arr,
+                                                     calculate_edge_lambdas_arr, calculate_gammas_arr,
+                                                     calculate_LLRs_arr, predict_inner_SISO_arr,
+                                                     predict_outer_SISO_arr)
 from esawindowsystem.core.BCJR_decoder_utils import (max_star_lru,
                                                      max_star_recursive)
 from esawindowsystem.core.encoder_functions import (BitArray, bit_deinterleave,
                                                     bit_interleave,
                                                     channel_deinterleave,
-                                                    get_CRC, get_csm,
-                                                    get_remap_indices,
+                                                    get_csm,
                                                     randomize, unpuncture)
 from esawindowsystem.core.scppm_encoder import puncture
-from esawindowsystem.core.trellis import Edge, Trellis
-from esawindowsystem.core.utils import (flatten, generate_inner_encoder_edges,
-                                        generate_outer_code_edges,
-                                        poisson_noise)
+from esawindowsystem.core.stopping_rules import StoppingRule, check_stopping_rules, get_stopping_rules
+from esawindowsystem.core.trellis import Edge, Trellis, TrellisTables
+from esawindowsystem.core.trellis_cache import get_trellis_tables
+from esawindowsystem.core.utils import flatten, poisson_noise
 
 
 def gamma_awgn(r, v, Es, N0): return exp(Es / N0 * 2 * dot(r, v))
@@ -439,19 +441,33 @@ def calculate_outer_SISO_LLRs(trellis: Trellis, symbol_bit_LLRs, log_bcjr=True):
     return p_xk_O, p_uk_O
 
 
-def predict(trellis: Trellis, received_sequence, LOG_BCJR=True, Es=10, N0=1, verbose=False):
-    """Use the BCJR algorithm to predict the sent message, based on the received sequence. """
-    time_steps: int = len(received_sequence)
+def predict(trellis: Trellis | TrellisTables, received_sequence, LOG_BCJR=True, Es=10, N0=1, verbose=False):
+    """Use the BCJR algorithm to predict the sent message, based on the received sequence.
 
-    # Calculate alphas, betas, gammas and LLRs
-    calculate_gammas(trellis, received_sequence, trellis.num_output_bits, Es, N0, log_bcjr=LOG_BCJR)
-    calculate_alphas(trellis, log_bcjr=LOG_BCJR)
-    calculate_betas(trellis, log_bcjr=LOG_BCJR)
-    LLRs = calculate_LLRs(trellis, log_bcjr=LOG_BCJR)
+    The log BCJR runs on the array representation of the trellis (see `TrellisTables`), either passed directly or built
+    from the edge model, the number of stages and the initiation and termination of `trellis`. """
+    if LOG_BCJR:
+        if isinstance(trellis, TrellisTables):
+            tables = trellis
+        else:
+            tables = TrellisTables(trellis.edge_model, len(trellis.stages) - 1, trellis.memory_size,
+                                   zero_initiated=trellis.zero_initiated, zero_terminated=trellis.zero_terminated)
+
+        gammas = calculate_gammas_arr(tables, received_sequence, Es, N0)
+        alphas = calculate_alphas_arr(tables, gammas)
+        betas = calculate_betas_arr(tables, gammas)
+        lambdas = calculate_edge_lambdas_arr(tables, alphas, gammas, betas)
+        LLRs = calculate_LLRs_arr(tables, lambdas)
+    else:
+        # Calculate alphas, betas, gammas and LLRs
+        calculate_gammas(trellis, received_sequence, trellis.num_output_bits, Es, N0, log_bcjr=LOG_BCJR)
+        calculate_alphas(trellis, log_bcjr=LOG_BCJR)
+        calculate_betas(trellis, log_bcjr=LOG_BCJR)
+        LLRs = calculate_LLRs(trellis, log_bcjr=LOG_BCJR)
 
     if verbose:
         print('Message decoded')
-    u_hat = np.array([1 if llr >= 0 else 0 for llr in LLRs])
+    u_hat = np.where(LLRs >= 0, 1, 0)
 
     return u_hat
 
@@ -580,20 +596,176 @@ def get_edge_input_array(trellis: Trellis) -> npt.NDArray[np.int8]:
     return edge_inputs
 
 
+def predict_codeword_iteratively(
+        channel_log_likelihoods: npt.NDArray[np.float64],
+        inner_tables: TrellisTables,
+        outer_tables: TrellisTables,
+        code_rate: Fraction,
+        max_num_iterations: int,
+        sent_bits_codeword: BitArray | None = None,
+        max_star_mode: str = 'lookup',
+        window_size: int | None = None,
+        stopping_rules: Iterable[str | StoppingRule] | None = None
+) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.float64], npt.NDArray[np.float64], int]:
+    """Iteratively decode one codeword, until one of the `stopping_rules` (by default the CRC check, see
+    `get_stopping_rules`) is met or `max_num_iterations` is reached.
+
+    When `window_size` is given, both SISOs use the sliding window log-MAP algorithm with windows of that many stages.
+    Returns the decoded bits, the decoded bits per iteration, the bit error ratio per iteration and the number of
+    iterations that were done. Iterations that were not needed are left at zero. """
+    num_bits_per_slice: int = outer_tables.time_steps
+    m: int = inner_tables.edge_inputs.shape[-1]
+
+    decoded_message_array = np.zeros((max_num_iterations, num_bits_per_slice))
+    bit_error_ratios = np.zeros(max_num_iterations)
+
+    rules = get_stopping_rules(stopping_rules)
+    for rule in rules:
+        rule.reset(1, num_bits_per_slice)
+    codeword_index = np.zeros(1, dtype=int)
+
+    symbol_bit_LLRs = None
+    u_hat = np.zeros(num_bits_per_slice, dtype=int)
+    num_iterations: int = 0
+
+    for iteration in range(max_num_iterations):
+        print(f'Iteration {iteration+1}/{max_num_iterations}')
+        p_ak_O = predict_inner_SISO_arr(inner_tables, channel_log_likelihoods, symbol_bit_LLRs=symbol_bit_LLRs,
+                                        max_star_mode=max_star_mode, window_size=window_size)
+        p_xk_I = bit_deinterleave(p_ak_O.flatten(), dtype=float)
+
+        p_xk_I = unpuncture(p_xk_I, code_rate, dtype=float)
+
+        p_xk_O, LLRs_u = predict_outer_SISO_arr(outer_tables, p_xk_I, max_star_mode=max_star_mode,
+                                                window_size=window_size)
+        p_xk_O = puncture(p_xk_O.flatten(), code_rate, dtype=float)
+        p_ak_I = bit_interleave(p_xk_O.flatten(), dtype=float)
+
+        symbol_bit_LLRs = deepcopy(p_ak_I.reshape(-1, m))
+
+        u_hat = np.where(LLRs_u > 0, 0, 1)
+        stop: bool = check_stopping_rules(rules, codeword_index, LLRs_u[np.newaxis], u_hat[np.newaxis])[0]
+        num_iterations = iteration + 1
+
+        # Derandomize
+        u_hat = randomize(u_hat)
+
+        if sent_bits_codeword is not None:
+            ber: float = np.sum(
+                [abs(x - y) for x, y in zip(u_hat, sent_bits_codeword)]
+            ) / num_bits_per_slice
+            print(
+                f"iteration = {iteration+1} ber: {ber:.3e} \t min likelihood: " +
+                f"{np.min(LLRs_u):.2f} \t max likelihood: {np.max(LLRs_u):.2f}")
+
+            bit_error_ratios[iteration] = ber
+
+        decoded_message_array[iteration, :] = u_hat
+
+        if stop:
+            break
+
+    return u_hat, decoded_message_array, bit_error_ratios, num_iterations
+
+
+def get_bit_error_ratios(
+        decoded_bits: npt.NDArray[np.int_],
+        sent_bit_sequence: BitArray,
+        codeword_indices: npt.NDArray[np.int_],
+        num_termination_bits: int = 2) -> npt.NDArray[np.float64]:
+    """Bit error ratio of each row of `decoded_bits`, compared to the sent bits of the codewords in `codeword_indices`.
+
+    `sent_bit_sequence` does not contain the termination bits. When fewer bits were sent than decoded, only the bits
+    that were sent are compared. """
+    num_bits_per_slice: int = decoded_bits.shape[1]
+    num_information_bits: int = num_bits_per_slice - num_termination_bits
+
+    num_errors = np.zeros(codeword_indices.shape[0])
+    for row, i in enumerate(codeword_indices):
+        sent_bits_codeword = sent_bit_sequence[i * num_information_bits:(i + 1) * num_information_bits]
+        num_errors[row] = np.count_nonzero(decoded_bits[row, :sent_bits_codeword.shape[0]] != sent_bits_codeword)
+
+    return num_errors / num_bits_per_slice
+
+
+def predict_iteratively_batched(
+        channel_log_likelihoods: npt.NDArray[np.float64],
+        inner_tables: TrellisTables,
+        outer_tables: TrellisTables,
+        code_rate: Fraction,
+        max_num_iterations: int,
+        sent_bit_sequence: BitArray | None = None,
+        max_star_mode: str = 'lookup',
+        window_size: int | None = None,
+        stopping_rules: Iterable[str | StoppingRule] | None = None
+) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.int_]]:
+    """Iteratively decode all codewords at the same time.
+
+    `channel_log_likelihoods` has shape (codewords, PPM symbols, M). Each iteration, the SISOs and (de)interleavers are
+    applied to all codewords that are still being decoded. Codewords that meet one of the `stopping_rules` (by default
+    the CRC check) are removed from the batch.
+
+    Returns the decoded bits, the decoded bits per iteration, the bit error ratios per iteration and the number of
+    iterations per codeword, in the same format as `predict_iteratively`. """
+    num_slices, num_symbols_per_slice, _ = channel_log_likelihoods.shape
+    num_bits_per_slice: int = outer_tables.time_steps
+    m: int = inner_tables.edge_inputs.shape[-1]
+
+    decoded_message = np.zeros((num_slices, num_bits_per_slice), dtype=int)
+    decoded_message_array = np.zeros((max_num_iterations, num_slices, num_bits_per_slice))
+    bit_error_ratios = np.zeros((max_num_iterations, num_slices))
+
+    num_iterations = np.zeros(num_slices, dtype=int)
+
+    rules = get_stopping_rules(stopping_rules)
+    for rule in rules:
+        rule.reset(num_slices, num_bits_per_slice)
+
+    symbol_bit_LLRs = np.zeros((num_slices, num_symbols_per_slice, m))
+    # Indices of the codewords that are still being decoded
+    active = np.arange(num_slices)
+
+    for iteration in range(max_num_iterations):
+        print(f'Iteration {iteration+1}/{max_num_iterations}, decoding {active.shape[0]}/{num_slices} codewords')
+
+        p_ak_O = predict_inner_SISO_arr(inner_tables, channel_log_likelihoods[active], symbol_bit_LLRs[active],
+                                        max_star_mode=max_star_mode, window_size=window_size)
+        p_ak_O = p_ak_O.reshape((active.shape[0], -1))
+        p_xk_I = bit_deinterleave(p_ak_O, dtype=float)
+        p_xk_I = unpuncture(p_xk_I, code_rate, dtype=float)
+
+        p_xk_O, LLRs_u = predict_outer_SISO_arr(outer_tables, p_xk_I, max_star_mode=max_star_mode,
+                                                window_size=window_size)
+        p_xk_O = puncture(p_xk_O.reshape((active.shape[0], -1)), code_rate, dtype=float)
+        p_ak_I = bit_interleave(p_xk_O, dtype=float)
+
+        symbol_bit_LLRs[active] = p_ak_I.reshape((active.shape[0], -1, m))
+
+        u_hat = np.where(LLRs_u > 0, 0, 1)
+
+        stop = check_stopping_rules(rules, active, LLRs_u, u_hat)
+        num_iterations[active] = iteration + 1
+
+        # Derandomize
+        u_hat = randomize(u_hat)
+
+        if sent_bit_sequence is not None:
+            bit_error_ratios[iteration, active] = get_bit_error_ratios(u_hat, sent_bit_sequence, active)
+            print(f'iteration = {iteration+1} mean ber: {np.mean(bit_error_ratios[iteration, active]):.3e}')
+
+        decoded_message_array[iteration, active, :] = u_hat
+        decoded_message[active] = u_hat
+
+        active = active[~stop]
+        if active.shape[0] == 0:
+            break
+
+    return decoded_message.flatten(), decoded_message_array, bit_error_ratios, num_iterations
+
+
 def predict_iteratively(slot_mapped_sequence: npt.NDArray[np.int_], M: int, code_rate: Fraction, max_num_iterations: int = 10,
                         ns: float = 3, nb: float = 0.1, ber_stop_threshold: float = 1E-7, **kwargs):
-    # Initialize outer trellis edges
-    memory_size_outer = 2
-    num_output_bits_outer = 3
-    num_input_bits_outer = 1
-    outer_edges = generate_outer_code_edges(memory_size_outer, bpsk_encoding=False)
-
-    # Initialize inner trellis edges
     m = int(np.log2(M))
-    memory_size = 1
-    num_output_bits = m
-    num_input_bits = m
-    inner_edges = generate_inner_encoder_edges(m, bpsk_encoding=False)
 
     information_block_sizes: dict[Fraction, int] = {
         Fraction(1, 3): 5040,
@@ -607,11 +779,6 @@ def predict_iteratively(slot_mapped_sequence: npt.NDArray[np.int_], M: int, code
 
     num_events_per_slot = kwargs.get('num_events_per_slot')
 
-    with open(Path.cwd() / 'esawindowsystem' / 'core' / 'cached_trellis', 'rb') as f:
-        trellisses = pickle.load(f)
-        inner_trellis = trellisses.get('inner_trellis')
-        outer_trellis = trellisses.get('outer_trellis')
-
     # num_events_per_slot = None
     if num_events_per_slot is not None:
         N_interleaver = 2
@@ -624,15 +791,6 @@ def predict_iteratively(slot_mapped_sequence: npt.NDArray[np.int_], M: int, code
         reshaped_num_events = reshaped_num_events.reshape(-1, M)
         reshaped_num_events = channel_deinterleave(reshaped_num_events, B_interleaver, N_interleaver)
 
-        remapped_indices = get_remap_indices(reshaped_num_events, B_interleaver, N_interleaver)
-        new_remapped_indices = np.zeros(reshaped_num_events.shape[0], dtype=int)
-        for i, idx in enumerate(remapped_indices):
-            if idx >= reshaped_num_events.shape[0]:
-                continue
-            else:
-                new_remapped_indices[i] = idx
-
-        # reshaped_num_events = reshaped_num_events[new_remapped_indices]
         num_zeros_interleaver = B_interleaver * N_interleaver * (N_interleaver - 1)
         # reshaped_num_events = num_events_per_slot.reshape(num_slices, num_symbols_per_slice+len(CSM), int(5/4*M))[:, len(CSM):, :M]
         channel_likelihoods = reshaped_num_events.astype(int)
@@ -650,33 +808,47 @@ def predict_iteratively(slot_mapped_sequence: npt.NDArray[np.int_], M: int, code
     decoded_message_array = np.zeros((max_num_iterations, num_slices, num_bits_per_slice))
 
     sent_bit_sequence: BitArray | None = kwargs.get('sent_bit_sequence_no_csm')
+    # Max star approximation used by both SISOs, see `max_star_modes`
+    max_star_mode: str = kwargs.get('max_star_mode', 'lookup')
+    # Number of stages per window of the sliding window SISOs, by default the whole codeword is one window
+    window_size: int | None = kwargs.get('window_size')
+    # Early termination rules, by name or instance, see `get_stopping_rules`. By default only the CRC is checked.
+    stopping_rules: Iterable[str | StoppingRule] | None = kwargs.get('stopping_rules')
 
     bit_error_ratios = np.zeros((max_num_iterations, num_slices))
+    num_iterations = np.zeros(num_slices, dtype=int)
 
-    outer_trellis_edge_to_states = np.empty((len(outer_trellis.stages), outer_trellis.num_states, 2), dtype=np.int8)
-    for i, stage in enumerate(outer_trellis.stages):
-        for j, state in enumerate(stage.states):
-            for k, edge in enumerate(state.edges):
-                outer_trellis_edge_to_states[i, j, k] = edge.to_state
+    # Both codes are decoded with the array based BCJR, which only needs the edge tables.
+    # The inner code (accumulator) is not terminated.
+    inner_tables, outer_tables = get_trellis_tables(M, code_rate, num_bits_per_slice,
+                                                    cache_dir=kwargs.get('trellis_cache_dir'))
 
-    outer_trellis_edge_to_states[0, 1:] = -99
-    outer_trellis_edge_to_states[1, 1] = -99
-    outer_trellis_edge_to_states[1, 3] = -99
+    if kwargs.get('batched', False):
+        channel_log_likelihoods = pi_ck(
+            channel_likelihoods[:num_slices * num_symbols_per_slice].reshape((num_slices, num_symbols_per_slice, M)),
+            ns, nb)
 
-    outer_trellis_edge_to_states[-3, :, 1] = -99
-    outer_trellis_edge_to_states[-2, :, 1] = -99
-    outer_trellis_edge_to_states[-2, 2, :] = -99
-    outer_trellis_edge_to_states[-2, 3, :] = -99
+        decoded_message, decoded_message_array, bit_error_ratios, num_iterations = predict_iteratively_batched(
+            channel_log_likelihoods, inner_tables, outer_tables, code_rate, max_num_iterations, sent_bit_sequence,
+            max_star_mode=max_star_mode, window_size=window_size, stopping_rules=stopping_rules)
 
-    inner_trellis = Trellis(memory_size, num_output_bits, num_symbols_per_slice, inner_edges, num_input_bits)
-    inner_trellis.set_edges(inner_edges, zero_terminated=False)
+        return _get_predict_iteratively_result(decoded_message, decoded_message_array, bit_error_ratios,
+                                               num_iterations, kwargs.get('return_num_iterations', False))
+
+    if kwargs.get('num_workers') is not None:
+        from esawindowsystem.core.parallel_decoder import predict_iteratively_parallel
+
+        channel_log_likelihoods = pi_ck(
+            channel_likelihoods[:num_slices * num_symbols_per_slice].reshape((num_slices, num_symbols_per_slice, M)),
+            ns, nb)
 
-    outer_trellis = Trellis(memory_size_outer, num_output_bits_outer,
-                            num_bits_per_slice, outer_edges, num_input_bits_outer)
-    outer_trellis.set_edges(outer_edges)
+        decoded_message, decoded_message_array, bit_error_ratios, num_iterations = predict_iteratively_parallel(
+            channel_log_likelihoods, inner_tables, outer_tables, code_rate, max_num_iterations, sent_bit_sequence,
+            num_workers=kwargs['num_workers'], max_star_mode=max_star_mode, window_size=window_size,
+            stopping_rules=stopping_rules)
 
-    outer_code_edge_outputs: npt.NDArray[np.int8] = get_edge_output_array(outer_trellis)
-    inner_code_edge_inputs: npt.NDArray[np.int8] = get_edge_input_array(inner_trellis)
+        return _get_predict_iteratively_result(decoded_message, decoded_message_array, bit_error_ratios,
+                                               num_iterations, kwargs.get('return_num_iterations', False))
 
     for i in range(num_slices):
         print(f'Decoding slice {i+1}/{num_slices}')
@@ -685,75 +857,46 @@ def predict_iteratively(slot_mapped_sequence: npt.NDArray[np.int_], M: int, code
         channel_log_likelihoods = pi_ck(
             channel_likelihoods[i * num_symbols_per_slice:(i + 1) * num_symbols_per_slice], ns, nb)
 
-        time_steps_inner = num_symbols_per_slice
-
-        symbol_bit_LLRs = None
-        u_hat = []
-
-        for iteration in range(max_num_iterations):
-            print(f'Iteration {iteration+1}/{max_num_iterations}')
-            p_ak_O = predict_inner_SISO(inner_trellis, inner_code_edge_inputs, channel_log_likelihoods,
-                                        time_steps_inner, m, symbol_bit_LLRs=symbol_bit_LLRs)
-            p_xk_I = bit_deinterleave(p_ak_O.flatten(), dtype=float)
-
-            p_xk_I = unpuncture(p_xk_I, code_rate, dtype=float)
-
-            edge_gammas = get_outer_code_gammas_arr(outer_code_edge_outputs, p_xk_I)
-            set_outer_code_gammas_arr(outer_trellis, edge_gammas)
-            # set_outer_code_gammas(outer_trellis, p_xk_I)
-
-            state_alphas = np.empty((len(outer_trellis.stages), outer_trellis.num_states))
-
-            state_alphas = get_alphas_outer_trellis(state_alphas, edge_gammas, outer_trellis_edge_to_states)
-            set_alphas_outer_trellis(outer_trellis, state_alphas)
-            # calculate_alphas(outer_trellis)
-            calculate_betas(outer_trellis)
-            p_xk_O, LLRs_u = calculate_outer_SISO_LLRs(outer_trellis, p_xk_I)
-            p_xk_O = puncture(np.array([p_xk_O.flatten()]), code_rate, dtype=float)
-            p_ak_I = bit_interleave(p_xk_O.flatten(), dtype=float)
+        sent_bits_codeword: BitArray | None = None
+        include_CRC = False
 
-            symbol_bit_LLRs = deepcopy(p_ak_I.reshape(-1, m))
-
-            u_hat = [0 if llr > 0 else 1 for llr in LLRs_u]
-
-            received_parity_bits = u_hat[-34:-2]
-            expected_parity_bits = get_CRC(np.array(u_hat[:-2]))
-
-            # Derandomize
-            u_hat = randomize(np.array(u_hat, dtype=int))
-
-            ber: float = 1
-            sent_bits_codeword: BitArray
-
-            include_CRC = False
+        if sent_bit_sequence is not None:
+            if include_CRC:
+                sent_bits_codeword = sent_bit_sequence[
+                    i * num_bits_per_slice - 34 * i:(i + 1) * num_bits_per_slice - 34 * (i + 1)
+                ]
+            else:
+                sent_bits_codeword = sent_bit_sequence[
+                    i * num_bits_per_slice - 2 * i:(i + 1) * num_bits_per_slice - 2 * (i + 1)
+                ]
 
-            if sent_bit_sequence is not None:
-                if include_CRC:
-                    sent_bits_codeword = sent_bit_sequence[
-                        i * num_bits_per_slice - 34 * i:(i + 1) * num_bits_per_slice - 34 * (i + 1)
-                    ]
-                else:
-                    sent_bits_codeword = sent_bit_sequence[
-                        i * num_bits_per_slice - 2 * i:(i + 1) * num_bits_per_slice - 2 * (i + 1)
-                    ]
+        u_hat, decoded_message_array[:, i, :], bit_error_ratios[:, i], num_iterations[i] = \
+            predict_codeword_iteratively(
+                channel_log_likelihoods, inner_tables, outer_tables, code_rate, max_num_iterations,
+                sent_bits_codeword, max_star_mode=max_star_mode, window_size=window_size,
+                stopping_rules=stopping_rules)
 
-                ber = np.sum(
-                    [abs(x - y) for x, y in zip(u_hat, sent_bits_codeword)]
-                ) / num_bits_per_slice
-                print(
-                    f"iteration = {iteration+1} ber: {ber:.3e} \t min likelihood: " +
-                    f"{np.min(LLRs_u):.2f} \t max likelihood: {np.max(LLRs_u):.2f}")
+        decoded_message.append(u_hat)
 
-                bit_error_ratios[iteration, i] = ber
+    # Flatten and cast to numpy array
+    decoded_message = np.array([bit for sublist in decoded_message for bit in sublist], dtype=int)
 
-            decoded_message_array[iteration, i, :] = u_hat
+    return _get_predict_iteratively_result(decoded_message, decoded_message_array, bit_error_ratios, num_iterations,
+                                           kwargs.get('return_num_iterations', False))
 
-            if np.all(received_parity_bits == expected_parity_bits):
-                break
 
-        decoded_message.append(u_hat)
+def _get_predict_iteratively_result(
+        decoded_message: npt.NDArray[np.int_],
+        decoded_message_array: npt.NDArray[np.float64],
+        bit_error_ratios: npt.NDArray[np.float64],
+        num_iterations: npt.NDArray[np.int_],
+        return_num_iterations: bool):
+    """Report the number of iterations per codeword, and only return them when asked for, so that the return value
+    of `predict_iteratively` stays the same for existing callers. """
+    if num_iterations.shape[0] > 0:
+        print(f'Iterations per codeword: {num_iterations.tolist()} (mean {np.mean(num_iterations):.2f})')
 
-    # Flatten and cast to numpy array
-    decoded_message = np.array([bit for sublist in decoded_message for bit in sublist], dtype=int)
+    if return_num_iterations:
+        return decoded_message, decoded_message_array, bit_error_ratios, num_iterations
 
     return decoded_message, decoded_message_array, bit_error_ratios
@@ -1,5 +1,7 @@
 import itertools
 from functools import lru_cache
+from typing import Callable
+
 import numpy as np
 import numpy.typing as npt
 
@@ -65,3 +67,98 @@ def max_star_lru_arr_lookup(a: float, b: float) -> float:
         idx1 = int(round(a)+6)
         idx2 = int(round(b)+6)
         return max(a, b) + max_log_lookup_arr[idx1, idx2]
+
+
+def max_star_arr(a: npt.NDArray[np.float64], b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Element-wise max star of the arrays `a` and `b`, using the same approximation as `max_star_lru`.
+
+    The only difference with `max_star_lru` is that max*(a, -inf) = a, so that -inf can be used to mark edges that do
+    not exist in the trellis.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    with np.errstate(invalid='ignore'):
+        use_correction = (np.abs(a) <= 5) & (np.abs(b) <= 5) & (np.abs(a - b) <= 5)
+
+    # Values outside of the lookup table are clipped, they do not use the correction term anyway.
+    idx1 = np.clip(np.rint(a), -6, 5).astype(int) + 6
+    idx2 = np.clip(np.rint(b), -6, 5).astype(int) + 6
+    correction = np.where(use_correction, max_log_lookup_arr[idx1, idx2], 0)
+
+    return np.maximum(a, b) + correction
+
+
+# Correction term log(1+exp(-d)) of the max star operator, tabulated for d = |a-b| in steps of `max_star_table_step`.
+# The last entry is 0, and is used for all d beyond the table.
+max_star_table_step: float = 1 / 32
+max_star_table: npt.NDArray[np.float64] = np.append(
+    np.log1p(np.exp(-max_star_table_step * np.arange(int(10 / max_star_table_step)))), 0)
+
+
+def max_star_exact_arr(a: npt.NDArray[np.float64], b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Element-wise max star without approximation, max*(a, b) = log(exp(a)+exp(b)). """
+    return np.logaddexp(a, b)
+
+
+def max_star_table_arr(a: npt.NDArray[np.float64], b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Element-wise max star, with the correction term looked up in `max_star_table` (nearest value of |a-b|). """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    # When both a and b are -inf, |a-b| is nan, which `fmin` maps to the end of the table.
+    with np.errstate(invalid='ignore'):
+        idx = np.fmin(np.rint(np.abs(a - b) / max_star_table_step), max_star_table.shape[0] - 1).astype(int)
+
+    return np.maximum(a, b) + max_star_table[idx]
+
+
+def max_star_max_log_arr(a: npt.NDArray[np.float64], b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Element-wise max-log approximation of max star, max*(a, b) ~= max(a, b). """
+    return np.maximum(a, b)
+
+
+def max_star_linear_arr(a: npt.NDArray[np.float64], b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Element-wise max star, with the correction term approximated by the line max(0, log(2) - |a-b|/4). """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    with np.errstate(invalid='ignore'):
+        correction = np.fmax(0, np.log(2) - np.abs(a - b) / 4)
+
+    return np.maximum(a, b) + correction
+
+
+MaxStarFunction = Callable[[npt.NDArray[np.float64], npt.NDArray[np.float64]], npt.NDArray[np.float64]]
+
+# Max star implementations that can be selected by name. 'lookup' is the 12x12 rounded lookup approximation of
+# `max_star_lru`. The order is the same as the mode numbers of `max_star_mode_numba`.
+max_star_modes: dict[str, MaxStarFunction] = {
+    'lookup': max_star_arr,
+    'exact': max_star_exact_arr,
+    'table': max_star_table_arr,
+    'max-log': max_star_max_log_arr,
+    'linear': max_star_linear_arr
+}
+
+
+def get_max_star(max_star_mode: str) -> MaxStarFunction:
+    """Return the element-wise max star function for the name `max_star_mode`, see `max_star_modes`. """
+    if max_star_mode not in max_star_modes:
+        raise ValueError(f'Unknown max star mode {max_star_mode!r}, choose from {", ".join(max_star_modes)}')
+
+    return max_star_modes[max_star_mode]
+
+
+def max_star_reduce_arr(
+        arr: npt.NDArray[np.float64],
+        axis: int = -1,
+        max_star: MaxStarFunction = max_star_arr) -> npt.NDArray[np.float64]:
+    """Apply the max star operator along `axis`, in the same (left to right) order as `max_star_recursive`. """
+    arr = np.moveaxis(np.asarray(arr, dtype=np.float64), axis, 0)
+    result = arr[0]
+
+    for i in range(1, arr.shape[0]):
+        result = max_star(result, arr[i])
+
+    return result
@@ -0,0 +1,94 @@
+import numpy as np
+import numpy.typing as npt
+
+from esawindowsystem.core.encoder_functions import remap_symbols
+
+
+class ChannelInterleaverStream:
+    """Streaming version of `channel_interleave`.
+
+    Chunks of symbols (1D) or event counts (2D, (symbols, M)) are interleaved as they arrive. Between chunks, only the
+    shift register state of B*N*(N-1) symbols is kept. `flush` runs the interleaver another B*N*(N-1) times, so the
+    concatenated outputs equal `channel_interleave` of the concatenated chunks. """
+    __slots__ = ('B', 'N', 'delay', 'history', 'num_symbols')
+
+    def __init__(self, B: int, N: int):
+        self.B = B
+        self.N = N
+        # Longest shift register, in symbols
+        self.delay: int = B * N * (N - 1)
+        # The last `delay` input symbols, the initial interleaver state is all zeros.
+        self.history: npt.NDArray[np.int_] | None = None
+        self.num_symbols: int = 0
+
+    def interleave(self, chunk: npt.NDArray[np.int_]) -> npt.NDArray[np.int_]:
+        """Return the interleaved symbols for the next `chunk.shape[0]` output positions. """
+        chunk = np.asarray(chunk, dtype=int)
+        if self.history is None:
+            self.history = np.zeros((self.delay,) + chunk.shape[1:], dtype=int)
+
+        buffer = np.concatenate((self.history, chunk))
+
+        # Output symbol i is input symbol i - (i % N) * N * B, buffer index 0 is input symbol `num_symbols - delay`.
+        i = np.arange(self.num_symbols, self.num_symbols + chunk.shape[0])
+        output = remap_symbols(buffer, i - (i % self.N) * self.N * self.B - self.num_symbols + self.delay)
+
+        self.history = buffer[buffer.shape[0] - self.delay:]
+        self.num_symbols += chunk.shape[0]
+
+        return output
+
+    def flush(self) -> npt.NDArray[np.int_]:
+        """Empty the shift registers, by interleaving B*N*(N-1) zeros. """
+        trailing_shape = () if self.history is None else self.history.shape[1:]
+        return self.interleave(np.zeros((self.delay,) + trailing_shape, dtype=int))
+
+
+class ChannelDeinterleaverStream:
+    """Streaming version of `channel_deinterleave`.
+
+    Output symbol i needs received symbol i + (i % N) * N * B, so the output lags B*N*(N-1) symbols behind the input.
+    Only those received symbols are kept between chunks. `flush` returns the remaining symbols, so the concatenated
+    outputs equal `channel_deinterleave` of the concatenated chunks. """
+    __slots__ = ('B', 'N', 'delay', 'buffer', 'buffer_start', 'num_output_symbols')
+
+    def __init__(self, B: int, N: int):
+        self.B = B
+        self.N = N
+        self.delay: int = B * N * (N - 1)
+        # Received symbols that are still needed, starting at received symbol `buffer_start`
+        self.buffer: npt.NDArray[np.int_] | None = None
+        self.buffer_start: int = 0
+        self.num_output_symbols: int = 0
+
+    def _deinterleave_until(self, end: int) -> npt.NDArray[np.int_]:
+        assert self.buffer is not None
+        i = np.arange(self.num_output_symbols, end)
+        output = remap_symbols(self.buffer, i + (i % self.N) * self.N * self.B - self.buffer_start)
+
+        # Output symbol i only needs received symbols >= i
+        self.buffer = self.buffer[max(end - self.buffer_start, 0):]
+        self.buffer_start = max(end, self.buffer_start)
+        self.num_output_symbols = end
+
+        return output
+
+    def deinterleave(self, chunk: npt.NDArray[np.int_]) -> npt.NDArray[np.int_]:
+        """Add the received `chunk`, and return all output symbols that can be determined. """
+        chunk = np.asarray(chunk, dtype=int)
+        if self.buffer is None:
+            self.buffer = np.zeros((0,) + chunk.shape[1:], dtype=int)
+
+        self.buffer = np.concatenate((self.buffer, chunk))
+        num_received_symbols: int = self.buffer_start + self.buffer.shape[0]
+
+        return self._deinterleave_until(max(num_received_symbols - self.delay, self.num_output_symbols))
+
+    def flush(self) -> npt.NDArray[np.int_]:
+        """Return the remaining output symbols, assuming no more symbols are received. """
+        if self.buffer is None:
+            self.buffer = np.zeros(0, dtype=int)
+
+        num_received_symbols: int = self.buffer_start + self.buffer.shape[0]
+
+        return self._deinterleave_until(num_received_symbols + self.delay)
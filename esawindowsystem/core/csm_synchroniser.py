@@ -0,0 +1,130 @@
+import numpy as np
+import numpy.typing as npt
+
+from esawindowsystem.core.encoder_functions import get_csm
+
+
+class CSMSynchroniser:
+    """Streaming version of `find_csm_times`.
+
+    Time stamps are added in chunks, in chronological order, with `process`. While acquiring, every codeword length of
+    time stamps is searched for the CSM. Once a CSM is found, the next CSM is only searched `search_window` slots around
+    one codeword (CSM included) later, which tracks slow drifts of the clock. When the CSM is not found there, the
+    synchroniser acquires again from that point. Only the time stamps that are still needed for the search are kept.
+
+    The returned CSM times are the start times of the first slot of each CSM, assuming the pulses are in the middle of
+    their slots. While acquiring, a CSM is found when at least `csm_correlation_threshold` of its pulses are detected.
+    The tracking window is small, so there a lower `tracking_correlation_threshold` suffices. """
+    __slots__ = ('M', 'slot_length', 'symbol_length', 'CSM', 'pulse_offsets', 'frame_duration', 'csm_duration',
+                 'min_correlation', 'min_tracking_correlation', 'search_window', 'buffer', 'search_start', 'csm_time',
+                 'num_reacquisitions')
+
+    def __init__(self, M: int, slot_length: float, csm_correlation_threshold: float = 0.6,
+                 tracking_correlation_threshold: float = 0.3, search_window: int = 2):
+        self.M = M
+        self.slot_length = slot_length
+        self.symbol_length: float = int(5 / 4 * M) * slot_length
+        self.CSM: npt.NDArray[np.int_] = get_csm(M)
+
+        symbols_per_codeword = int(15120 / np.log2(M))
+        # Time between the start of the CSM and the pulse of each CSM symbol
+        self.pulse_offsets: npt.NDArray[np.float64] = \
+            (self.CSM + 0.5) * slot_length + np.arange(len(self.CSM)) * self.symbol_length
+        self.frame_duration: float = (len(self.CSM) + symbols_per_codeword) * self.symbol_length
+        self.csm_duration: float = len(self.CSM) * self.symbol_length
+
+        self.min_correlation: int = int(np.ceil(csm_correlation_threshold * len(self.CSM)))
+        self.min_tracking_correlation: int = int(np.ceil(tracking_correlation_threshold * len(self.CSM)))
+        self.search_window = search_window
+
+        self.buffer: npt.NDArray[np.float64] = np.zeros(0)
+        # Start of the acquisition search, or None before the first time stamp
+        self.search_start: float | None = None
+        # Time of the last CSM that was found, or None while acquiring
+        self.csm_time: float | None = None
+        self.num_reacquisitions: int = 0
+
+    def _search(self, start: float, num_slots: int, min_correlation: int) -> float | None:
+        """Return the time of a CSM that starts within `num_slots` slots after `start`, or None if there is none.
+
+        Each time stamp votes for the CSM start times that would put one of the CSM pulses on it. Due to jitter, the
+        votes of one CSM can be spread over two neighbouring slots, so pairs of slots are counted. """
+        time_stamps = self.buffer[
+            (self.buffer >= start) & (self.buffer < start + (num_slots + 1) * self.slot_length + self.csm_duration)]
+
+        slot_indices = np.floor(
+            (time_stamps[:, np.newaxis] - self.pulse_offsets[np.newaxis, :] - start) / self.slot_length).astype(int)
+        slot_indices = slot_indices[(slot_indices >= 0) & (slot_indices <= num_slots)]
+
+        votes = np.bincount(slot_indices, minlength=num_slots + 1)
+        correlation = votes[:-1] + votes[1:]
+
+        if correlation.shape[0] == 0 or np.max(correlation) < min_correlation:
+            return None
+
+        csm_time: float = start + (np.argmax(correlation) + 1) * self.slot_length
+
+        # Refine the CSM time with the mean deviation of the pulses from the middle of their slots
+        deviations = time_stamps[:, np.newaxis] - (csm_time + self.pulse_offsets[np.newaxis, :])
+        deviations = deviations[np.abs(deviations) < self.slot_length]
+
+        return csm_time + np.mean(deviations)
+
+    def _lock(self, csm_time: float):
+        self.csm_time = csm_time
+        # Time stamps before the next search window are not needed anymore
+        self.buffer = self.buffer[
+            self.buffer >= csm_time + self.frame_duration - (self.search_window + 1) * self.slot_length]
+
+    def _find_csm_times(self, final: bool) -> npt.NDArray[np.float64]:
+        csm_times: list[float] = []
+
+        while self.buffer.shape[0] > 0:
+            if self.csm_time is None:
+                if self.search_start is None:
+                    # The first time stamp can be any of the CSM pulses
+                    self.search_start = self.buffer[0] - self.csm_duration
+
+                # Acquire: search one codeword length of time stamps for the CSM
+                num_slots = int(round(self.frame_duration / self.slot_length))
+                end: float = self.search_start + (num_slots + 1) * self.slot_length + self.csm_duration
+                if self.buffer[-1] < end and not (final and self.buffer[-1] > self.search_start):
+                    break
+
+                csm_time = self._search(self.search_start, num_slots, self.min_correlation)
+                if csm_time is None:
+                    self.search_start += self.frame_duration
+                    self.buffer = self.buffer[self.buffer >= self.search_start]
+                    continue
+            else:
+                # Track: search only around the expected time of the next CSM
+                start: float = self.csm_time + self.frame_duration - self.search_window * self.slot_length
+                num_slots = 2 * self.search_window
+                end = start + (num_slots + 1) * self.slot_length + self.csm_duration
+                if self.buffer[-1] < end and (not final or self.buffer[-1] < start):
+                    break
+
+                csm_time = self._search(start, num_slots, self.min_tracking_correlation)
+                if csm_time is None:
+                    # Lost the CSM, acquire again
+                    self.csm_time = None
+                    self.search_start = start
+                    self.num_reacquisitions += 1
+                    if self.buffer[-1] < end:
+                        break
+                    continue
+
+            csm_times.append(csm_time)
+            self._lock(csm_time)
+
+        return np.array(csm_times)
+
+    def process(self, time_stamps: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """Add the next chunk of time stamps, and return the times of the CSMs that were found. """
+        self.buffer = np.concatenate((self.buffer, np.asarray(time_stamps, dtype=float)))
+
+        return self._find_csm_times(final=False)
+
+    def flush(self) -> npt.NDArray[np.float64]:
+        """Search the remaining time stamps, assuming no more time stamps arrive. """
+        return self._find_csm_times(final=True)
@@ -9,6 +9,7 @@ from PIL import Image
 
 from esawindowsystem.core.BCJR_decoder_functions import \
     ppm_symbols_to_bit_array
+from esawindowsystem.core.packed_bits import PackedBits
 from esawindowsystem.core.utils import tobits
 from esawindowsystem.ppm_parameters import GREYSCALE
 
@@ -22,26 +23,34 @@ def _validate(user_data: Any, data_type: Any) -> None:
 
 
 class DataConverter:
-    def __init__(self, user_data: Any):
-        self.bit_array: npt.NDArray[np.int_]
+    def __init__(self, user_data: Any, packed: bool = False):
+        """With `packed`, the bit array is a `PackedBits` array, 8 bits per byte. """
+        self.bit_array: npt.NDArray[np.int_] | PackedBits
         match user_data:
             case str():
-                self.bit_array = self.from_string(user_data)
+                self.bit_array = self.from_string(user_data, packed=packed)
             case pathlib.Path() if user_data.suffix in IMG_SUFFIXES:
-                self.bit_array = self.from_image(user_data, greyscale=GREYSCALE)
+                self.bit_array = self.from_image(user_data, greyscale=GREYSCALE, packed=packed)
             # CSV not yet implemented
             # case pathlib.Path() if user_data.suffix == '.csv':
             #     self.bit_array = []
             case _:
                 raise TypeError('Data type not supported')
 
-    def from_string(self, user_data: str) -> npt.NDArray[np.int_]:
+    def from_string(self, user_data: str, packed: bool = False) -> npt.NDArray[np.int_] | PackedBits:
         """Convert a string to a bit array. """
         _validate(user_data, str)
 
+        if packed and all(ord(char) < 256 for char in user_data):
+            # Each character is exactly one byte
+            return PackedBits.from_bytes(np.array([ord(char) for char in user_data], dtype=np.uint8))
+        if packed:
+            return PackedBits.from_bits(tobits(user_data))
+
         return np.array(tobits(user_data))
 
-    def from_image(self, filepath: Path, greyscale: bool = True) -> npt.NDArray[np.int_]:
+    def from_image(self, filepath: Path, greyscale: bool = True,
+                   packed: bool = False) -> npt.NDArray[np.int_] | PackedBits:
         """Take a filepath and convert the image to a bit stream. """
         _validate(filepath, Path)
         if filepath.suffix not in IMG_SUFFIXES:
@@ -53,6 +62,9 @@ class DataConverter:
         # This would be the same as saying that each pixel is a symbol, which should be mapped to an 8 bit sequence.
         if greyscale:
             img_arr = np.asarray(Image.open(filepath).convert(img_mode))
+            if packed:
+                # The pixel values already are the packed bytes
+                return PackedBits.from_bytes(img_arr.flatten())
             bit_array = ppm_symbols_to_bit_array(img_arr.flatten(), 8)
         else:
             bw_img: npt.NDArray[np.int_]
@@ -64,26 +76,31 @@ class DataConverter:
             bw = cv2.threshold(img, 10, 255, cv2.THRESH_BINARY)
             bit_array = bw_img.flatten()
 
+        if packed:
+            return PackedBits.from_bits(bit_array)
+
         return bit_array
 
     def from_csv(self, filpath: Path):
         pass
 
 
-def payload_to_bit_sequence(payload_type: str, **kwargs) -> npt.NDArray[np.int_]:
-    """Convert an image or string to a bit sequence. """
+def payload_to_bit_sequence(payload_type: str, **kwargs) -> npt.NDArray[np.int_] | PackedBits:
+    """Convert an image or string to a bit sequence. With `packed=True`, a `PackedBits` array is returned. """
     d: DataConverter
+    packed: bool = kwargs.get('packed', False)
 
     match payload_type:
         case 'string':
-            d = DataConverter(''.join(["Optical Communications Synchronization and Channel Coding"] * 10))
+            d = DataConverter(''.join(["Optical Communications Synchronization and Channel Coding"] * 10),
+                              packed=packed)
             return d.bit_array
         case 'image':
             filepath = kwargs.get('filepath')
             if not filepath:
                 raise ValueError("File path cannot be empty. ")
             file = Path(filepath)
-            d = DataConverter(file)
+            d = DataConverter(file, packed=packed)
             return d.bit_array
         case _:
             raise ValueError("Payload type not recognized. Should be one of 'string' or 'image'")
@@ -1,4 +1,6 @@
 import copy
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from math import floor, ceil
 from typing import Any
 import pickle
@@ -6,11 +8,12 @@ import pickle
 import matplotlib.pyplot as plt
 import numpy as np
 import numpy.typing as npt
-from scipy.signal import find_peaks
+from scipy.signal import fftconvolve, find_peaks
 
 from esawindowsystem.core.encoder_functions import get_csm, slot_map
 from esawindowsystem.core.numba_utils import get_num_events_numba
 from esawindowsystem.core.parse_ppm_symbols import parse_ppm_symbols
+from esawindowsystem.core.ppm_symbol_sequence import PPMSymbolSequence
 from esawindowsystem.core.utils import flatten, moving_average
 from scipy.stats import norm
 
@@ -42,40 +45,44 @@ def make_time_series(time_stamps: npt.NDArray[np.float64],
     time_vec: npt.NDArray[np.float64] = np.arange(
         time_stamps[0], time_stamps[-1] + 50 * slot_length, slot_length, dtype=float)
 
-    # The time series vector is a vector of ones and zeros with a one if there is a pulse in that slot
-    time_series: npt.NDArray[np.int_] = np.zeros(len(time_vec) - 1, dtype=np.int_)
-    deviation_from_slot_centre = np.zeros(len(time_stamps), dtype=np.float64)
-
-    m: int = 0
-    n: int = 0
-
-    while m < len(time_stamps):
-        if time_vec[n] <= time_stamps[m] < time_vec[n + 1]:
-            deviation_from_slot_centre[m] = (time_vec[n+1]-0.5*slot_length) - time_stamps[m]
-            m += 1
-        else:
-            n += 1
+    # Slot index n of each time stamp, such that time_vec[n] <= time stamp < time_vec[n + 1].
+    slot_indices = np.searchsorted(time_vec, time_stamps, side='right') - 1
+    deviation_from_slot_centre = (time_vec[slot_indices + 1] - 0.5 * slot_length) - time_stamps
 
     # # TODO: Make sure the mean is appropriate here. -> Write test to verify.
     time_stamps += np.mean(deviation_from_slot_centre)
 
     # It can happen that due to this time shift, the first time stamp starts too early, in that case, skip it.
-    if time_stamps[0] < time_vec[0]:
-        m: int = 1
-    else:
-        m: int = 0
+    slot_indices = np.searchsorted(time_vec, time_stamps, side='right') - 1
+    slot_indices = slot_indices[(slot_indices >= 0) & (slot_indices < len(time_vec) - 1)]
 
-    n: int = 0
-    while m < len(time_stamps):
-        if time_vec[n] <= time_stamps[m] < time_vec[n + 1]:
-            time_series[n] += 1
-            m += 1
-        else:
-            n += 1
+    # The time series vector is a vector of ones and zeros with a one if there is a pulse in that slot
+    time_series: npt.NDArray[np.int_] = np.bincount(slot_indices, minlength=len(time_vec) - 1)
 
     return time_series, time_vec
 
 
+def get_slot_indices(time_stamps: npt.NDArray[np.float64], slot_length: float) -> tuple[npt.NDArray[np.int_], int]:
+    """Return the slot index of each time stamp and the number of slots of the time series of `make_time_series`,
+    without building the time series or the slot start times.
+
+    The slots start at the first time stamp, so the slot index is floor((t - t0) / slot_length). Time stamps that do
+    not fall into a slot are left out. """
+    t0: float = time_stamps[0]
+    # Same number of slots as `make_time_series`, the length of np.arange(t0, stop, slot_length) minus one
+    num_slots: int = max(int(np.ceil((time_stamps[-1] + 50 * slot_length - t0) / slot_length)) - 1, 0)
+
+    slot_indices = np.floor((time_stamps - t0) / slot_length).astype(int)
+    deviation_from_slot_centre = t0 + (slot_indices + 0.5) * slot_length - time_stamps
+
+    time_stamps += np.mean(deviation_from_slot_centre)
+
+    slot_indices = np.floor((time_stamps - t0) / slot_length).astype(int)
+    slot_indices = slot_indices[(slot_indices >= 0) & (slot_indices < num_slots)]
+
+    return slot_indices, num_slots
+
+
 def determine_CSM_time_shift(
         csm_times: npt.NDArray[np.float64],
         time_stamps: npt.NDArray[np.float64],
@@ -124,6 +131,55 @@ def determine_CSM_time_shift(
     return csm_shifts
 
 
+def correlate_csm_direct(
+        time_stamps: npt.NDArray[np.float64],
+        csm_time_stamps: npt.NDArray[np.float64],
+        slot_length: float) -> npt.NDArray[np.int_]:
+    """Correlate the time series of the time stamps and of the CSM, with `np.correlate`. """
+    A, _ = make_time_series(time_stamps, slot_length)
+    B, _ = make_time_series(csm_time_stamps, slot_length)
+
+    return np.correlate(A, B, mode='valid')
+
+
+def correlate_csm_fft(
+        time_stamps: npt.NDArray[np.float64],
+        csm_time_stamps: npt.NDArray[np.float64],
+        slot_length: float) -> npt.NDArray[np.int_]:
+    """Same as `correlate_csm_direct`, but computed with an FFT, O(N log N) in the number of slots. """
+    A, _ = make_time_series(time_stamps, slot_length)
+    B, _ = make_time_series(csm_time_stamps, slot_length)
+
+    # The correlation is the convolution with the reversed CSM. The counts are integers, so round off the FFT error.
+    return np.rint(fftconvolve(A, B[::-1], mode='valid')).astype(int)
+
+
+def correlate_csm_sparse(
+        time_stamps: npt.NDArray[np.float64],
+        csm_time_stamps: npt.NDArray[np.float64],
+        slot_length: float) -> npt.NDArray[np.int_]:
+    """Same as `correlate_csm_direct`, but without time series. Every time stamp votes for the shifts that would put
+    one of the CSM pulses on it, so the cost scales with the number of time stamps instead of the number of slots. """
+    slot_indices, num_slots = get_slot_indices(time_stamps, slot_length)
+    csm_slot_indices, num_csm_slots = get_slot_indices(csm_time_stamps, slot_length)
+
+    num_shifts: int = max(num_slots - num_csm_slots + 1, 0)
+
+    shifts = (slot_indices[:, np.newaxis] - csm_slot_indices[np.newaxis, :]).flatten()
+    shifts = shifts[(shifts >= 0) & (shifts < num_shifts)]
+
+    return np.bincount(shifts, minlength=num_shifts)
+
+
+# CSM correlators that can be selected with `csm_correlation_method`
+csm_correlation_methods: dict[str, Callable[[npt.NDArray[np.float64], npt.NDArray[np.float64], float],
+                                            npt.NDArray[np.int_]]] = {
+    'direct': correlate_csm_direct,
+    'fft': correlate_csm_fft,
+    'sparse': correlate_csm_sparse
+}
+
+
 def get_csm_correlation(
         time_stamps: npt.NDArray[np.float64],
         slot_length: float,
@@ -131,14 +187,21 @@ def get_csm_correlation(
         symbol_length: float,
         csm_correlation_threshold: float = 0.6,
         **kwargs: tuple[str, Any]) -> npt.NDArray[np.int_]:
-    """Discretize timestamps and return correlation of that vector with discretized CSM. """
+    """Discretize timestamps and return correlation of that vector with discretized CSM.
+
+    The correlator is selected with the `csm_correlation_method` keyword argument, see `csm_correlation_methods`. The
+    default, 'direct', works on the time series of the time stamps. 'fft' is faster for long captures with many
+    pulses, 'sparse' for long captures with few time stamps per slot. """
+    csm_correlation_method = kwargs.get('csm_correlation_method', 'direct')
+    if csm_correlation_method not in csm_correlation_methods:
+        raise ValueError(f'Unknown CSM correlation method {csm_correlation_method!r}, '
+                         f'choose from {", ".join(csm_correlation_methods)}')
+
     # + 0.5 slot length because pulse times should be in the middle of a slot.
     csm_time_stamps = np.array([slot_length * CSM[i] + i * symbol_length for i in range(len(CSM))]) + 0.0 * slot_length
 
-    A, time_vec = make_time_series(time_stamps, slot_length)
-    B, _ = make_time_series(csm_time_stamps, slot_length)
-
-    corr: npt.NDArray[np.int_] = np.correlate(A, B, mode='valid')
+    corr: npt.NDArray[np.int_] = csm_correlation_methods[csm_correlation_method](
+        time_stamps, csm_time_stamps, slot_length)
 
     return corr
 
@@ -272,62 +335,48 @@ def find_and_parse_codewords(
         M: int,
         sent_symbols: list[float] | None = None,
         **kwargs: tuple[str, Any]):
-    """Using the CSM times, find and parse (demodulate) PPM codewords from the given PPM pulse timestamps. """
-    len_codeword: int = symbols_per_codeword + len(CSM)
-    len_codeword_no_CSM: int = symbols_per_codeword
+    """Using the CSM times, find and parse (demodulate) PPM codewords from the given PPM pulse timestamps.
 
-    msg_symbols: list[npt.NDArray[np.float64]] = []
-    num_darkcounts: int = 0
-    symbols: list[float] | npt.NDArray[np.float64]
-
-    codeword_idx = 0
-
-    symbol_slot_centre_distances_list = []
+    The pulse timestamps should be sorted. Each codeword is parsed from a slice (view) of them, the slices are found
+    once with `np.searchsorted`. The codewords are independent, with `num_workers` they are parsed by a thread pool. """
+    len_codeword: int = symbols_per_codeword + len(CSM)
 
-    for i in range(len(csm_times) - 1):
-        start: float = csm_times[i]
-        stop: float = csm_times[i + 1]
+    # Each codeword runs until the next CSM, the last one for one codeword length.
+    codeword_stop_times = np.append(csm_times[1:], csm_times[-1] + len_codeword * symbol_length)
+    codeword_start_indices = np.searchsorted(pulse_timestamps, csm_times, side='right')
+    codeword_stop_indices = np.searchsorted(pulse_timestamps, codeword_stop_times, side='left')
 
-        fraction_lost: float = (stop - start) / (symbol_length * len_codeword) - 1
-        num_codewords_lost = round(fraction_lost)
+    # Number of codewords between two CSMs that were lost. The last codeword uses the number of the one before it.
+    nums_codewords_lost: list[int] = [round((stop - start) / (symbol_length * len_codeword) - 1)
+                                      for start, stop in zip(csm_times[:-1], csm_times[1:])]
+    nums_codewords_lost.append(nums_codewords_lost[-1] if nums_codewords_lost else 0)
+    codeword_indices = np.cumsum([0] + [1 + num_codewords_lost for num_codewords_lost in nums_codewords_lost[:-1]])
 
-        symbols, num_darkcounts, symbol_slot_centre_distances = parse_ppm_symbols(
-            pulse_timestamps[pulse_timestamps > csm_times[i]],
+    def parse_codeword(i: int) -> tuple[list[float], int, list[float]]:
+        return parse_ppm_symbols(
+            pulse_timestamps[codeword_start_indices[i]:codeword_stop_indices[i]],
             csm_times[i],
-            csm_times[i + 1],
+            codeword_stop_times[i],
             slot_length,
             symbol_length,
             M,
-            num_codewords_lost,
+            nums_codewords_lost[i],
             sent_symbols,
-            num_darkcounts,
-            **{**kwargs, **{'codeword_idx': codeword_idx}}
+            0,
+            **{**kwargs, **{'codeword_idx': int(codeword_indices[i])}}
         )
 
-        symbol_slot_centre_distances_list.append(symbol_slot_centre_distances)
-        # if num_codewords_lost >= 1:
-        #     symbols = np.hstack((symbols, np.zeros(int(num_codewords_lost)*len_codeword)))
-
-        msg_symbols.append(np.round(symbols).astype(int))
-
-        codeword_idx += 1 + num_codewords_lost
-
-    # Take the last CSM and parse until the end of the message.
-    symbols, num_darkcounts, symbol_slot_centre_distances = parse_ppm_symbols(
-        pulse_timestamps[pulse_timestamps > csm_times[-1]],
-        csm_times[-1],
-        csm_times[-1] + (symbols_per_codeword + len(CSM)) * symbol_length,
-        slot_length,
-        symbol_length,
-        M,
-        num_codewords_lost,
-        sent_symbols,
-        num_darkcounts,
-        **{**kwargs, **{'codeword_idx': codeword_idx}}
-    )
+    num_workers: int | None = kwargs.get('num_workers')
+    if num_workers is not None:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            parsed_codewords = list(executor.map(parse_codeword, range(len(csm_times))))
+    else:
+        parsed_codewords = [parse_codeword(i) for i in range(len(csm_times))]
 
-    symbol_slot_centre_distances_list.append(symbol_slot_centre_distances)
-    msg_symbols.append(np.round(np.array(symbols)).astype(int))
+    msg_symbols: list[npt.NDArray[np.int_]] = [np.round(np.array(symbols)).astype(int)
+                                               for symbols, _, _ in parsed_codewords]
+    num_darkcounts: int = sum(num_codeword_darkcounts for _, num_codeword_darkcounts, _ in parsed_codewords)
+    symbol_slot_centre_distances_list = [distances for _, _, distances in parsed_codewords]
 
     print(f'Estimated number of darkcounts in message frame: {num_darkcounts}')
     print()
@@ -452,11 +501,13 @@ def demodulate(
     sent_symbols: list[float] | None = None,
     csm_correlation_threshold: float = 0.6,
     **kwargs: dict[str, Any]
-) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.int_], float]:
+) -> tuple[npt.NDArray[np.int_] | PPMSymbolSequence, npt.NDArray[np.int_], float]:
     """Demodulate the PPM pulse time stamps (convert the time stamps to PPM symbols).
 
     First, the Codeword Synchronisation Marker (CSM) is derived from the timestamps, then
-    all the codewords (collection of PPM symbols) are parsed from the timestamps, for a given PPM order (M). """
+    all the codewords (collection of PPM symbols) are parsed from the timestamps, for a given PPM order (M).
+
+    Returns the slot mapped message, or with `compact=True` the PPM symbols as a `PPMSymbolSequence`. """
 
     if len(pulse_timestamps) == 0:
         raise IndexError("Pulse timestamps array cannot be empty. ")
@@ -497,6 +548,9 @@ def demodulate(
 
     print('Number of demodulated symbols: ', len(flatten(msg_symbols)))
 
+    if kwargs.get('compact', False):
+        return PPMSymbolSequence(flatten(msg_symbols), M), events_per_slot, estimated_photons_per_pulse
+
     slot_mapped_message = slot_map(flatten(msg_symbols), M)
 
     return slot_mapped_message, events_per_slot, estimated_photons_per_pulse
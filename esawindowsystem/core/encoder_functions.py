@@ -1,11 +1,11 @@
-import math
 from fractions import Fraction
+from functools import lru_cache
 from typing import Any
 
 import numpy as np
 import numpy.typing as npt
 
-from esawindowsystem.core.shift_register import CRC
+from esawindowsystem.core.packed_bits import PackedBits
 
 BitArray = npt.NDArray[np.int_]
 
@@ -23,10 +23,14 @@ def get_asm_bit_arr(asm_hex: str = '1ACFFC1D') -> BitArray:
     return ASM_arr.astype(int)
 
 
-def prepend_asm(arr: BitArray) -> BitArray:
+def prepend_asm(arr: BitArray | PackedBits) -> BitArray | PackedBits:
     """Prepend `arr` with the Attached Synchronization Marker. """
     ASM_arr = get_asm_bit_arr()
 
+    if isinstance(arr, PackedBits):
+        # The ASM is 4 bytes, so the payload bytes can be appended as they are
+        return PackedBits(np.concatenate((np.packbits(ASM_arr), arr.data)), ASM_arr.shape[0] + arr.num_bits)
+
     # Assume for now there is only one CCSDS transfer frame
     return np.hstack((ASM_arr, arr))
 
@@ -63,57 +67,113 @@ def generate_pseudo_randomized_sequence(seed: list[int] = [1] * 8) -> list[int]:
     return sequence
 
 
-def randomize(information_blocks: BitArray) -> BitArray:
+# The pseudo randomized sequence of the CCSDS standard, it is the same for every information block.
+PSEUDO_RANDOMIZED_SEQUENCE: npt.NDArray[np.int_] = np.array(generate_pseudo_randomized_sequence())
+PSEUDO_RANDOMIZED_SEQUENCE.flags.writeable = False
+PSEUDO_RANDOMIZED_BYTES: npt.NDArray[np.uint8] = np.packbits(PSEUDO_RANDOMIZED_SEQUENCE)
+PSEUDO_RANDOMIZED_BYTES.flags.writeable = False
+
+
+@lru_cache
+def get_randomizer_mask(length: int, packed: bool = False) -> npt.NDArray[np.int_] | npt.NDArray[np.uint8]:
+    """The pseudo randomized sequence, repeated to `length` bits. With `packed`, as `np.packbits` bytes. """
+    mask = np.resize(PSEUDO_RANDOMIZED_SEQUENCE, length)
+    if packed:
+        mask = np.packbits(mask)
+    mask.flags.writeable = False
+
+    return mask
+
+
+def randomize(information_blocks: BitArray | PackedBits) -> BitArray | PackedBits:
     """Pseudo randomize the information blocks, using the shift register defined by the CCSDS.
 
-    Note that performing the randomize function twice gives back the de-randomized sequence. """
-    initial_shape = information_blocks.shape
-    pseudo_randomized_sequence = generate_pseudo_randomized_sequence()
+    Every row (last axis) of `information_blocks` is XORed with the same pseudo randomized sequence, so all blocks are
+    randomized at once. Note that performing the randomize function twice gives back the de-randomized sequence.
+    `PackedBits` are randomized bytewise. """
+    if isinstance(information_blocks, PackedBits):
+        num_bits: int = information_blocks.num_bits
+        return PackedBits(information_blocks.data ^ get_randomizer_mask(num_bits, packed=True), num_bits)
 
-    output_array = np.zeros(initial_shape, dtype=int)
-    # information_blocks = information_blocks.flatten()
+    information_blocks = np.asarray(information_blocks)
 
-    if information_blocks.ndim == 1:
-        copies = math.ceil(len(information_blocks) / len(pseudo_randomized_sequence))
-        pseudo_randomized_sequence = np.tile(pseudo_randomized_sequence, copies)
-        output_array = information_blocks ^ pseudo_randomized_sequence[:len(information_blocks)]
-        return output_array
+    return information_blocks ^ get_randomizer_mask(information_blocks.shape[-1])
 
-    i = 0
-    for row in information_blocks:
-        # Tile the randomized sequence, so that it is long enough to XOR with the information blocks
-        copies = math.ceil(len(row) / len(pseudo_randomized_sequence))
-        pseudo_randomized_sequence = np.tile(pseudo_randomized_sequence, copies)
 
-        # XOR addition of both sequences.
-        randomized_row = row ^ pseudo_randomized_sequence[:len(row)]
-        output_array[i] = randomized_row
-        i += 1
+CRC_SIZE: int = 32
+# Taps of the CRC shift register (`shift_register.CRC`). With bit i of the register as bit i of an integer, the register
+# is an MSB-first CRC with this polynomial. The tap at position 0 cancels the input bit, so it does not appear here.
+CRC_POLYNOMIAL: int = (1 << 3) | (1 << 14) | (1 << 18) | (1 << 29)
+CRC_SEED: int = 0xFFFFFFFF
+
+
+def _generate_CRC_table() -> npt.NDArray[np.uint32]:
+    """Register update for each value of the top byte of the register XOR the next 8 input bits. """
+    table = np.zeros(256, dtype=np.uint32)
+    for i in range(256):
+        register = i << 24
+        for _ in range(8):
+            register = ((register << 1) ^ CRC_POLYNOMIAL if register & 0x80000000 else register << 1) & 0xFFFFFFFF
+        table[i] = register
 
-    return output_array
+    return table
+
+
+CRC_TABLE: npt.NDArray[np.uint32] = _generate_CRC_table()
+CRC_TABLE.flags.writeable = False
+
+
+def _CRC_register_to_bits(registers: npt.NDArray[np.uint32]) -> BitArray:
+    return ((registers[..., None] >> np.arange(CRC_SIZE, dtype=np.uint32)) & 1).astype(int)
 
 
 def get_CRC(arr: BitArray) -> BitArray:
-    CRC_size: int = 32
+    """CRC-32 of all but the last 32 bits of `arr`, equal to the state of the shift register
+    `CRC([1] * 32, [0, 3, 14, 18, 29])`.
+
+    The bits are processed a byte at a time, with `CRC_TABLE`. """
+    num_bits: int = arr.shape[0] - CRC_SIZE
+    num_bytes: int = num_bits // 8
+    bits = np.asarray(arr[:num_bits], dtype=np.uint8)
+
+    table: list[int] = CRC_TABLE.tolist()
+    register: int = CRC_SEED
+    for byte in np.packbits(bits[:num_bytes * 8]).tolist():
+        register = ((register << 8) & 0xFFFFFFFF) ^ table[(register >> 24) ^ byte]
+
+    for bit in bits[num_bytes * 8:].tolist():
+        register = ((register << 1) & 0xFFFFFFFF) ^ (CRC_POLYNOMIAL if bit ^ (register >> 31) else 0)
+
+    return _CRC_register_to_bits(np.array(register, dtype=np.uint32))
+
 
-    # Initialize the CRC shift register
-    seed: list[int] = [1] * CRC_size
-    sr = CRC(seed, [0, 3, 14, 18, 29])
+def get_CRC_arr(arr: BitArray) -> BitArray:
+    """Batched version of `get_CRC`, for the rows of `arr` (information blocks, including room for the CRC). """
+    num_bits: int = arr.shape[-1] - CRC_SIZE
+    num_bytes: int = num_bits // 8
+    bits = np.asarray(arr[..., :num_bits], dtype=np.uint8)
+    # One row per byte position, so that each step reads a contiguous row
+    data = np.moveaxis(np.packbits(bits[..., :num_bytes * 8], axis=-1), -1, 0).astype(np.uint32)
 
-    for j in range(arr.shape[0] - CRC_size):
-        sr.next(arr[j] ^ sr.state[-1])
+    registers = np.full(arr.shape[:-1], CRC_SEED, dtype=np.uint32)
+    table_indices = np.empty_like(registers)
+    for byte in data:
+        np.right_shift(registers, 24, out=table_indices)
+        table_indices ^= byte
+        registers <<= 8
+        registers ^= CRC_TABLE[table_indices]
 
-    return sr.state
+    for j in range(num_bytes * 8, num_bits):
+        feedback = (registers >> 31) ^ bits[..., j]
+        registers = (registers << 1) ^ (feedback * np.uint32(CRC_POLYNOMIAL))
+
+    return _CRC_register_to_bits(registers)
 
 
 def append_CRC(arr: BitArray):
     # Fill the input array `arr` with 32 zeros, so that the CRC can be attached
-    CRC_size = 32
-    arr = np.concatenate((arr, np.zeros((arr.shape[0], CRC_size), dtype=arr.dtype)), axis=1)
-
-    for i in range(arr.shape[0]):
-        # Attach to the arr
-        arr[i, -CRC_size:] = get_CRC(arr[i, :])
+    arr = np.concatenate((arr, np.zeros((arr.shape[0], CRC_SIZE), dtype=arr.dtype)), axis=1)
+    arr[:, -CRC_SIZE:] = get_CRC_arr(arr)
 
     return arr
 
@@ -139,53 +199,49 @@ def slicer(arr: BitArray, code_rate: Fraction, include_crc: bool = False,
     return arr
 
 
+# Puncturing patterns of CCSDS 142.0-B-1, a 1 means the bit is kept.
+# "3.8.2.3.2 The puncturing shall be accomplished using the following procedure:"
+# (See page 3-12 of the CCSDS 142.0-B-1 blue book, August 2019 edition)
+puncture_scheme: dict[Fraction, npt.NDArray[np.bool_]] = {
+    Fraction(1, 3): np.array([1, 1, 1, 1, 1, 1], dtype=bool),
+    Fraction(1, 2): np.array([1, 1, 0, 1, 1, 0], dtype=bool),
+    Fraction(2, 3): np.array([1, 1, 0, 0, 1, 0], dtype=bool)
+}
+
+
+@lru_cache
+def get_puncture_mask(code_rate: Fraction, length: int) -> npt.NDArray[np.bool_]:
+    """Mask of the bits of a rate 1/3 codeword of `length` bits that are kept after puncturing to `code_rate`. """
+    mask = np.resize(puncture_scheme[code_rate], length)
+    mask.flags.writeable = False
+
+    return mask
+
+
 def unpuncture(encoded_sequence: BitArray, code_rate: Fraction,
                dtype: type[int] | type[float] = int) -> BitArray:
-    puncture_scheme: dict[Fraction, list[int]] = {
-        Fraction(1, 3): [1, 1, 1, 1, 1, 1],
-        Fraction(1, 2): [1, 1, 0, 1, 1, 0],
-        Fraction(2, 3): [1, 1, 0, 0, 1, 0]
-    }
-
-    P = puncture_scheme[code_rate]
+    """Insert zeros at the punctured positions, to get back a rate 1/3 sequence. `encoded_sequence` can also be a
+    batch with shape (..., n) of bits or LLRs. """
+    encoded_sequence = np.asarray(encoded_sequence)
 
     factor = code_rate / Fraction(1, 3)
-    unpunctured_sequence = np.zeros(int(factor * len(encoded_sequence)), dtype=dtype)
+    length = int(factor * encoded_sequence.shape[-1])
 
-    j = 0
-    for i in range(len(unpunctured_sequence) - 1):
-        if P[i % len(P)] == 1:
-            unpunctured_sequence[i] = encoded_sequence[j]
-            j += 1
+    unpunctured_sequence = np.zeros(encoded_sequence.shape[:-1] + (length,), dtype=dtype)
+    unpunctured_sequence[..., get_puncture_mask(code_rate, length)] = encoded_sequence
 
     return unpunctured_sequence
 
 
 def puncture(convoluted_bit_sequence: npt.NDArray[np.int_ | np.float64],
              code_rate: Fraction, dtype: type[int] | type[float] = int) -> BitArray:
-    """If the code rate is not 1/3, puncture (remove) elements according to the scheme defined by the CCSDS. """
-    puncture_scheme: dict[Fraction, list[int]] = {
-        Fraction(1, 3): [1, 1, 1, 1, 1, 1],
-        Fraction(1, 2): [1, 1, 0, 1, 1, 0],
-        Fraction(2, 3): [1, 1, 0, 0, 1, 0]
-    }
-
-    # THE CCSDS HATH SPOKEN:
-    # "3.8.2.3.2 The puncturing shall be accomplished using the following procedure:"
-    # (See page 3-12 of the CCSDS 142.0-B-1 blue book, August 2019 edition)
-
-    convolutional_codewords: BitArray = np.zeros(
-        (convoluted_bit_sequence.shape[0], int(convoluted_bit_sequence.shape[1] / (3 * float(code_rate)))), dtype=dtype
-    )
-    P = puncture_scheme[code_rate]
-    for i, row in enumerate(convoluted_bit_sequence):
-        j = 0
-        for m in range(row.shape[0]):
-            if P[m % 6] == 1:
-                convolutional_codewords[i, j] = convoluted_bit_sequence[i, m]
-                j += 1
-
-    return convolutional_codewords
+    """If the code rate is not 1/3, puncture (remove) elements according to the scheme defined by the CCSDS.
+
+    Each row of `convoluted_bit_sequence` (shape (..., n), bits or LLRs) is punctured. """
+    convoluted_bit_sequence = np.asarray(convoluted_bit_sequence)
+    mask = get_puncture_mask(code_rate, convoluted_bit_sequence.shape[-1])
+
+    return convoluted_bit_sequence[..., mask].astype(dtype, copy=False)
 
 
 def zero_terminate(arr: BitArray, num_termination_bits: int = 2) -> BitArray:
@@ -194,13 +250,9 @@ def zero_terminate(arr: BitArray, num_termination_bits: int = 2) -> BitArray:
 
 
 def accumulate(arr: BitArray) -> BitArray:
-    """Accumulate XOR-wise `arr` with itself. """
-    n_j = np.zeros_like(arr)
-    n_j[0] = arr[0]
-    for j in range(1, n_j.shape[0]):
-        n_j[j] = n_j[j - 1] ^ arr[j]
-
-    return n_j
+    """Accumulate XOR-wise `arr` with itself, n_j = n_(j-1) ^ arr_j. `arr` can also be a batch of codewords, with
+    shape (..., n). """
+    return np.bitwise_xor.accumulate(np.asarray(arr), axis=-1)
 
 
 def convolve(
@@ -230,6 +282,35 @@ def convolve(
     return convolutional_codeword, terminal_state
 
 
+def convolve_arr(
+        information_blocks: BitArray,
+        initial_state: tuple[int, int] = (0, 0)) -> tuple[BitArray, BitArray]:
+    """Convolutionally encode all rows of `information_blocks` (shape (..., block length)) at once.
+
+    Bit identical to `convolve` applied to each row, but the three generator outputs are computed with shifted XORs
+    of the whole matrix instead of a sliding window per bit. Returns the codewords, with shape (..., 3 * block length),
+    and the terminal state of each row. """
+    information_blocks = np.asarray(information_blocks, dtype=int)
+
+    initial_bits = np.broadcast_to(np.array(tuple(reversed(initial_state)), dtype=int),
+                                   information_blocks.shape[:-1] + (2,))
+    arr = np.concatenate((initial_bits, information_blocks), axis=-1)
+
+    # Bits u_{i-2}, u_{i-1} and u_i of each window
+    f0 = arr[..., :-2]
+    f1 = arr[..., 1:-1]
+    f2 = arr[..., 2:]
+
+    convolutional_codewords: BitArray = np.empty(information_blocks.shape + (3,), dtype=int)
+    convolutional_codewords[..., 0] = f2 ^ f0
+    convolutional_codewords[..., 1] = f0 ^ f1 ^ f2
+    convolutional_codewords[..., 2] = convolutional_codewords[..., 1]
+
+    terminal_states: BitArray = arr[..., [-1, -2]]
+
+    return convolutional_codewords.reshape(information_blocks.shape[:-1] + (-1,)), terminal_states
+
+
 def map_PPM_symbols(arr: list[int] | tuple[int, ...] | BitArray, m: int):
     """Map input array of bits to PPM symbols. """
     # Input validation
@@ -249,133 +330,106 @@ def map_PPM_symbols(arr: list[int] | tuple[int, ...] | BitArray, m: int):
     if arr.shape[0] // m != arr.shape[0] / m:
         raise ValueError(f"Input array is not a multiple of m={m}")
 
-    S = arr.shape[0] // m
+    # Each group of m bits is a PPM symbol, most significant bit first
+    powers_of_two = 2**np.arange(m - 1, -1, -1)
+    output_arr = arr.reshape((-1, m)).astype(int, copy=False) @ powers_of_two
 
-    output_arr = np.zeros(S, dtype=int)
+    return output_arr
 
-    for s in range(S):
-        q = np.zeros(m)
-        for a in range(m):
-            q[a] = 2**(m - a - 1) * arr[m * s + a]
-        output_arr[s] = np.sum(q)
 
-    return output_arr
+# The bit interleaver of CCSDS 142.0-B-1 permutes codewords of 15120 bits with a quadratic permutation polynomial.
+BIT_INTERLEAVER_SIZE: int = 15120
+_bit_interleaver_indices = np.arange(BIT_INTERLEAVER_SIZE, dtype=np.int64)
+# Bit j of the interleaved codeword is bit `bit_interleave_permutation[j]` of the original codeword
+bit_interleave_permutation: npt.NDArray[np.int_] = (
+    11 * _bit_interleaver_indices + 210 * _bit_interleaver_indices**2) % BIT_INTERLEAVER_SIZE
+# Inverse permutation of `bit_interleave_permutation`
+bit_deinterleave_permutation: npt.NDArray[np.int_] = (
+    14891 * _bit_interleaver_indices + 210 * _bit_interleaver_indices**2) % BIT_INTERLEAVER_SIZE
+bit_interleave_permutation.flags.writeable = False
+bit_deinterleave_permutation.flags.writeable = False
 
 
 def bit_interleave(arr: BitArray, dtype: type[int] | type[float] = int) -> BitArray:
     """Shuffle some bits around to make a so-called bit-interleaved codeword.
 
+    `arr` can also be a batch of codewords (or LLRs) with shape (..., 15120), every row is interleaved.
+
     Note: works only with 15120 element arrays. The modulo 15120 is hard coded for a reason.
     This is because the permutation polynomial in `bit_deinterleave` only works properly with 15120 element arrays.
     For any other length array, the interleaved array might not be invertable. """
-
-    if arr.shape[0] != 15120:
+    arr = np.asarray(arr)
+    if arr.ndim == 0 or arr.shape[-1] != BIT_INTERLEAVER_SIZE:
         raise ValueError("Input array should have length 15120")
 
-    interleaved_output = np.zeros_like(arr).astype(dtype)
-
-    # pi_j is the bit index from the original bit array
-    for j in range(interleaved_output.shape[0]):
-        pi_j = (11 * j + 210 * j**2) % 15120
-        interleaved_output[j] = arr[pi_j]
-
-    return interleaved_output
+    return arr[..., bit_interleave_permutation].astype(dtype, copy=False)
 
 
 def bit_deinterleave(arr: BitArray | list[float], dtype: Any = int) -> BitArray:
-    """De-interleave the interleaved array `arr`.
+    """De-interleave the interleaved array `arr`, or each row of a batch with shape (..., 15120).
 
     Note: works only with 15120 element arrays. """
+    arr = np.asarray(arr)
+    assert arr.ndim > 0 and arr.shape[-1] == BIT_INTERLEAVER_SIZE, "Input array should have length 15120"
+
+    return arr[..., bit_deinterleave_permutation].astype(dtype, copy=False)
 
-    assert len(arr) == 15120, "Input array should have length 15120"
 
-    deinterleaved_array: BitArray = np.zeros_like(arr).astype(dtype)
+def get_interleave_remap_indices(num_symbols: int, B: int, N: int) -> npt.NDArray[np.int_]:
+    """Index of the input symbol for each output symbol of the channel interleaver.
 
-    # pi_j is the new index for the interleaved array
-    for j in range(deinterleaved_array.shape[0]):
-        pi_j = (14891 * j + 210 * j**2) % 15120
-        deinterleaved_array[j] = arr[pi_j]
+    Symbol i goes through shift register i % N, which delays it by (i % N) * N * B symbols. The interleaver is ran
+    another B*N*(N-1) times after the last input symbol, to flush the shift registers. """
+    i = np.arange(num_symbols + B * N * (N - 1))
+    return i - (i % N) * N * B
 
-    return deinterleaved_array
+
+def get_remap_indices(input_array: BitArray, B: int, N: int) -> npt.NDArray[np.int_]:
+    """Index of the received symbol for each output symbol of the channel deinterleaver, the inverse of
+    `get_interleave_remap_indices`. """
+    i = np.arange(len(input_array) + B * N * (N - 1))
+    return i + (i % N) * N * B
+
+
+def remap_symbols(arr: BitArray, remap_indices: npt.NDArray[np.int_]) -> BitArray:
+    """Select the symbols (or rows of a 2D (symbols, M) array) of `arr` at `remap_indices`.
+
+    Indices < 0 indicate initial interleaver state bits, which are set to 0. Indices >= the length of `arr` indicate
+    terminal interleaver state bits, which are also set to 0. """
+    valid = (remap_indices >= 0) & (remap_indices < arr.shape[0])
+
+    output: BitArray = np.zeros((remap_indices.shape[0],) + arr.shape[1:], dtype=int)
+    output[valid] = arr[remap_indices[valid]]
+
+    return output
 
 
 def channel_interleave(arr: BitArray, B: int, N: int) -> BitArray:
     """Use N slots of linear shift registers to interleave the PPM symbols.
 
     - Input:
-        - `arr`: input array / sequence
+        - `arr`: input array / sequence, either 1D symbols or a 2D (symbols, M) array
         - `B`: Base length of the linear shift registers. Such that the i-th shift register has length i*B
         - `N`: Number of rows
     """
-    output: list[int] = []
-    remap_indeces: list[int] = []
-
-    # First determine the order of elements for the interleaved array .
-    remap_indeces.append(0)
-    for i in range(1, arr.shape[0] + B * N * (N - 1)):
-        if i % N == 0:
-            remap_indeces.append(i)
-        else:
-            remap_indeces.append(remap_indeces[i - 1] - N * B + 1)
-
-    # Indeces < 0 indicate initial interleaver state bits, which is set at 0.
-    # Indeces > the input array indicate terminal interleaver state bits, which are also set to 0
+    arr = np.asarray(arr)
 
     # When the final bit of the input sequence is inserted into the interleaver,
     # The interleaver needs to be ran another B*N*(N-1) times to finalize the interleaving.
-    for i in remap_indeces:
-        if i < 0 or i >= arr.shape[0]:
-            output.append(0)
-        else:
-            output.append(arr[i])
-
-    output_array: BitArray = np.array(output, dtype=int)
-
-    return output_array
-
-
-def get_remap_indices(input_array: BitArray, B: int, N: int):
-    remap_indeces: list[int] = []
-
-    remap_indeces.append(0)
-    for i in range(1, input_array.shape[0] + B * N * (N - 1)):
-        if i % N == 0:
-            remap_indeces.append(i)
-        else:
-            remap_indeces.append(remap_indeces[i - 1] + N * B + 1)
-
-    return remap_indeces
+    return remap_symbols(arr, get_interleave_remap_indices(arr.shape[0], B, N))
 
 
 def channel_deinterleave(arr: BitArray, B: int, N: int) -> BitArray:
-    """Use N slots of linear shift registers to interleave the PPM symbols.
+    """Use N slots of linear shift registers to deinterleave the PPM symbols.
 
     - Input:
-        - `arr`: input array / sequence
+        - `arr`: input array / sequence, either 1D symbols or a 2D (symbols, M) array
         - `B`: Base length of the linear shift registers. Such that the i-th shift register has length i*B
         - `N`: Number of rows
     """
-    arr = np.array(arr, dtype=int)
-    output: list[npt.NDArray[np.int_]] = []
-    interleaver_remap_indices = get_remap_indices(arr, B, N)
+    arr = np.asarray(arr, dtype=int)
 
-    # Indeces < 0 indicate initial interleaver state bits, which is set at 0.
-    # Indeces > the input array indicate terminal interleaver state bits, which are also set to 0
-
-    # When the final bit of the input sequence is inserted into the interleaver,
-    # The interleaver needs to be ran another B*N*(N-1) times to finalize the interleaving.
-    for i in interleaver_remap_indices:
-        if i < 0 or i >= arr.shape[0]:
-            if len(arr.shape) == 2:
-                output.append(np.zeros(arr.shape[1]))
-            else:
-                output.append(0)
-        else:
-            output.append(arr[i])
-
-    output_arr: BitArray = np.array(output, dtype=int)
-
-    return output_arr
+    return remap_symbols(arr, get_remap_indices(arr, B, N))
 
 
 def get_csm(M: int = 16) -> BitArray:
@@ -392,10 +446,17 @@ def get_csm(M: int = 16) -> BitArray:
     return w
 
 
-def slot_map(ppm_symbols: npt.NDArray[np.int_] | list[int], M: int, insert_guardslots: bool = True) -> BitArray:
+def slot_map(
+        ppm_symbols: npt.NDArray[np.int_] | list[int],
+        M: int,
+        insert_guardslots: bool = True,
+        sparse: bool = False) -> BitArray:
     """Convert each PPM symbol to a list of ones and zeros, where the one indicates the position of the PPM pulse.
 
-    For example, with a PPM order of 4, and a PPM symbol 3, the slot mapped vector would be [0, 0, 0, 1, 0]"""
+    For example, with a PPM order of 4, and a PPM symbol 3, the slot mapped vector would be [0, 0, 0, 1, 0]
+
+    With `sparse`, only the index of the pulse slot of each symbol in the (flattened) slot sequence is returned,
+    i.e. `np.flatnonzero` of the dense slot mapped array, instead of a (symbols, slots per symbol) array. """
     # Input validation
     validate_PPM_order(M)
 
@@ -406,12 +467,13 @@ def slot_map(ppm_symbols: npt.NDArray[np.int_] | list[int], M: int, insert_guard
     if not np.all(ppm_symbols < M):
         raise ValueError(f"All PPM symbols should be smaller than {M}")
 
-    slot_mapped: BitArray = np.zeros((len(ppm_symbols), M), dtype=int)
-    for j in range(len(ppm_symbols)):
-        slot_mapped[j, ppm_symbols[j]] = 1
-
     # Insert guard slot (M / 4 zeros) for each slot map, if applicable
-    if insert_guardslots:
-        slot_mapped = np.hstack((slot_mapped, np.zeros((M // 4, slot_mapped.shape[0]), dtype=int).T))
+    num_slots_per_symbol: int = M + M // 4 if insert_guardslots else M
+
+    if sparse:
+        return np.arange(len(ppm_symbols)) * num_slots_per_symbol + ppm_symbols
+
+    slot_mapped: BitArray = np.zeros((len(ppm_symbols), num_slots_per_symbol), dtype=int)
+    slot_mapped[np.arange(len(ppm_symbols)), ppm_symbols] = 1
 
     return slot_mapped
@@ -113,5 +113,144 @@ def max_star_recursive_numba(arr: list[float] | npt.NDArray[np.float64]) -> floa
     return result
 
 
+@cc.export('max_star_masked_numba', 'f8(f8, f8)')
+@njit
+def max_star_masked_numba(a: float, b: float) -> float:
+    """Max star of a and b, like `max_star_numba`, but -inf is used to mark edges that do not exist in the trellis.
+
+    Therefore, max*(a, -inf) = a, the same as `max_star_arr`. """
+    if a == -np.inf:
+        return b
+    elif b == -np.inf:
+        return a
+    elif abs(a) > 5 or abs(b) > 5 or abs(a - b) > 5:
+        return max(a, b)
+    else:
+        idx1 = int(round(a)+6)
+        idx2 = int(round(b)+6)
+        return max(a, b) + max_log_lookup_arr[idx1, idx2]
+
+
+# Same table as `max_star_table` in `BCJR_decoder_utils`
+max_star_table_step: float = 1 / 32
+max_star_table: npt.NDArray[np.float64] = np.append(
+    np.log1p(np.exp(-max_star_table_step * np.arange(int(10 / max_star_table_step)))), 0)
+
+
+@cc.export('max_star_mode_numba', 'f8(f8, f8, i8)')
+@njit
+def max_star_mode_numba(a: float, b: float, max_star_mode: int) -> float:
+    """Max star of a and b, with -inf for edges that do not exist, see `max_star_masked_numba`.
+
+    The approximation is selected with `max_star_mode`, in the order of `max_star_modes` in `BCJR_decoder_utils`:
+    0: 12x12 lookup, 1: exact, 2: correction table on |a-b|, 3: max-log, 4: linear correction. """
+    if max_star_mode == 0 or a == -np.inf or b == -np.inf:
+        return max_star_masked_numba(a, b)
+
+    d = abs(a - b)
+    if max_star_mode == 1:
+        return max(a, b) + np.log1p(np.exp(-d))
+    elif max_star_mode == 2:
+        idx = min(int(round(d / max_star_table_step)), max_star_table.shape[0] - 1)
+        return max(a, b) + max_star_table[idx]
+    elif max_star_mode == 3:
+        return max(a, b)
+    else:
+        return max(a, b) + max(0.0, np.log(2) - d / 4)
+
+
+@cc.export(
+    'outer_forward_backward_numba',
+    'Tuple((f8[:, :], f8[:, :], f8[:, :], f8[:]))'
+    '(f8[:, :, :], i8[:, :], i8[:, :], i1[:, :, :], f8[:, :], f8[:], f8[:], i8)'
+)
+@njit
+def outer_forward_backward(
+        gammas: npt.NDArray[np.float64],
+        next_states: npt.NDArray[np.int_],
+        edge_input_labels: npt.NDArray[np.int_],
+        edge_outputs: npt.NDArray[np.int8],
+        symbol_bit_LLRs: npt.NDArray[np.float64],
+        initial_alphas: npt.NDArray[np.float64],
+        final_betas: npt.NDArray[np.float64],
+        max_star_mode: int = 0
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Forward-backward pass of the outer SISO, for a trellis where each state has two incoming edges.
+
+    `gammas` has shape (stages, states, edges), with -inf for edges that do not exist. Returns the alphas, betas, the
+    extrinsic output bit LLRs (p_xk_O) and the input bit LLRs (p_uk_O). `max_star_mode` selects the max star
+    approximation, see `max_star_mode_numba`. """
+    time_steps, num_states, num_edges = gammas.shape
+    num_output_bits: int = edge_outputs.shape[2]
+
+    # The two edges going into each state, ordered by the state they come from
+    previous_states = np.zeros((num_states, 2), dtype=np.int64)
+    previous_edges = np.zeros((num_states, 2), dtype=np.int64)
+    num_incoming = np.zeros(num_states, dtype=np.int64)
+    for from_state in range(num_states):
+        for edge in range(num_edges):
+            to_state = next_states[from_state, edge]
+            if num_incoming[to_state] == 2:
+                raise ValueError('Each state should have exactly two incoming edges')
+            previous_states[to_state, num_incoming[to_state]] = from_state
+            previous_edges[to_state, num_incoming[to_state]] = edge
+            num_incoming[to_state] += 1
+
+    alphas = np.empty((time_steps + 1, num_states))
+    alphas[0, :] = initial_alphas
+    for k in range(time_steps):
+        for state in range(num_states):
+            s0 = previous_states[state, 0]
+            s1 = previous_states[state, 1]
+            alphas[k + 1, state] = max_star_mode_numba(
+                alphas[k, s0] + gammas[k, s0, previous_edges[state, 0]],
+                alphas[k, s1] + gammas[k, s1, previous_edges[state, 1]],
+                max_star_mode
+            )
+
+    betas = np.empty((time_steps + 1, num_states))
+    betas[-1, :] = final_betas
+    for k in range(time_steps - 1, -1, -1):
+        for state in range(num_states):
+            beta = betas[k + 1, next_states[state, 0]] + gammas[k, state, 0]
+            for edge in range(1, num_edges):
+                beta = max_star_mode_numba(
+                    beta, betas[k + 1, next_states[state, edge]] + gammas[k, state, edge], max_star_mode)
+            betas[k, state] = beta
+
+    p_xk_O = np.empty((time_steps, num_output_bits))
+    p_uk_O = np.empty(time_steps)
+    lambdas = np.empty((num_states, num_edges))
+    for k in range(time_steps):
+        for state in range(num_states):
+            for edge in range(num_edges):
+                lambdas[state, edge] = alphas[k, state] + gammas[k, state, edge] + \
+                    betas[k + 1, next_states[state, edge]]
+
+        # A bit value without any (possible) edges contributes 0, see `calculate_outer_SISO_LLRs_arr`
+        for i in range(num_output_bits + 1):
+            zeros = -np.inf
+            ones = -np.inf
+            for state in range(num_states):
+                for edge in range(num_edges):
+                    bit = edge_outputs[state, edge, i] if i < num_output_bits else edge_input_labels[state, edge]
+                    if bit == 0:
+                        zeros = max_star_mode_numba(zeros, lambdas[state, edge], max_star_mode)
+                    else:
+                        ones = max_star_mode_numba(ones, lambdas[state, edge], max_star_mode)
+
+            if zeros == -np.inf:
+                zeros = 0
+            if ones == -np.inf:
+                ones = 0
+
+            if i < num_output_bits:
+                p_xk_O[k, i] = zeros - ones - symbol_bit_LLRs[k, i]
+            else:
+                p_uk_O[k] = zeros - ones
+
+    return alphas, betas, p_xk_O, p_uk_O
+
+
 if __name__ == "__main__":
     cc.compile()
@@ -0,0 +1,128 @@
+import numpy as np
+import numpy.typing as npt
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class PackedBits:
+    """Bit array that stores 8 bits per byte, in the layout of `np.packbits` (most significant bit first).
+
+    The bits are packed along the last axis, `num_bits` is the number of bits per row. Padding bits in the last byte of
+    each row are always zero, so that bytewise operations (XOR, popcount) do not need to mask them. """
+    __slots__ = ('data', 'num_bits')
+
+    def __init__(self, data: npt.NDArray[np.uint8], num_bits: int):
+        self.data: npt.NDArray[np.uint8] = np.asarray(data, dtype=np.uint8)
+        self.num_bits = num_bits
+
+        if self.data.ndim == 0 or self.data.shape[-1] != -(-num_bits // 8):
+            raise ValueError(f"Packed data should have {-(-num_bits // 8)} bytes per row for {num_bits} bits")
+
+    @classmethod
+    def from_bits(cls, bits: npt.ArrayLike) -> 'PackedBits':
+        """Pack an array of ones and zeros along its last axis. """
+        bits = np.asarray(bits)
+        return cls(np.packbits(bits.astype(np.uint8, copy=False), axis=-1), bits.shape[-1])
+
+    @classmethod
+    def from_bytes(cls, data: bytes | npt.NDArray[np.uint8]) -> 'PackedBits':
+        """Use each byte as 8 bits, most significant bit first. """
+        arr = np.frombuffer(data, dtype=np.uint8) if isinstance(data, bytes) else np.asarray(data, dtype=np.uint8)
+        return cls(arr, arr.shape[-1] * 8)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.data.shape[:-1] + (self.num_bits,)
+
+    @property
+    def ndim(self) -> int:
+        return self.data.ndim
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return f'PackedBits(shape={self.shape})'
+
+    def unpack(self, dtype: type = int) -> npt.NDArray[np.int_]:
+        """Return the bits as an array of ones and zeros. """
+        return np.unpackbits(self.data, axis=-1, count=self.num_bits).astype(dtype)
+
+    def tobytes(self) -> bytes:
+        return self.data.tobytes()
+
+    def __xor__(self, other: 'PackedBits | npt.ArrayLike') -> 'PackedBits':
+        """Bytewise XOR. Rows are broadcast, like numpy arrays. """
+        if not isinstance(other, PackedBits):
+            other = PackedBits.from_bits(other)
+
+        if other.num_bits != self.num_bits:
+            raise ValueError(f"Cannot XOR {self.num_bits} bits with {other.num_bits} bits")
+
+        return PackedBits(self.data ^ other.data, self.num_bits)
+
+    def __getitem__(self, key):
+        """Index the rows like a numpy array. Indexing the bits (last axis) returns bits for an integer index, and
+        `PackedBits` for a slice. Byte aligned slices do not unpack the data. """
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        if len(key) < self.ndim:
+            return PackedBits(self.data[key], self.num_bits)
+
+        row_key, bit_key = key[:-1], key[-1]
+        data = self.data[row_key]
+
+        if isinstance(bit_key, slice):
+            start, stop, step = bit_key.indices(self.num_bits)
+            if step == 1 and start % 8 == 0:
+                num_bits = max(stop - start, 0)
+                data = data[..., start // 8:start // 8 + -(-num_bits // 8)].copy()
+                if num_bits % 8:
+                    # Clear the bits after `stop` in the last byte
+                    data[..., -1] &= np.uint8((0xFF << (8 - num_bits % 8)) & 0xFF)
+                return PackedBits(data, num_bits)
+
+            return PackedBits.from_bits(PackedBits(data, self.num_bits).unpack(np.uint8)[..., bit_key])
+
+        return PackedBits(data, self.num_bits).unpack()[..., bit_key]
+
+    def reshape(self, *shape: int) -> 'PackedBits':
+        """Reshape the bits, the last dimension of `shape` is the number of bits per row. When the rows stay byte
+        aligned, this does not unpack the data. """
+        if len(shape) == 1 and isinstance(shape[0], tuple):
+            shape = shape[0]
+
+        total_num_bits: int = int(np.prod(self.shape))
+        shape = tuple(int(total_num_bits // -np.prod(shape)) if s == -1 else s for s in shape)
+        num_bits: int = shape[-1]
+
+        if self.num_bits % 8 == 0 and num_bits % 8 == 0:
+            return PackedBits(self.data.reshape(shape[:-1] + (num_bits // 8,)), num_bits)
+
+        return PackedBits.from_bits(self.unpack(np.uint8).reshape(shape))
+
+    def correlate(self, pattern: npt.ArrayLike) -> npt.NDArray[np.int_]:
+        """Same as `np.correlate(bits, pattern, 'valid')` for a 1D bit array and a pattern of ones and zeros: the
+        number of ones of `pattern` that match a one in the bits, for each position.
+
+        The pattern is ANDed with the packed bits for each of the 8 bit offsets, and the ones are counted per byte. """
+        if self.ndim != 1:
+            raise ValueError("Only 1D bit arrays can be correlated")
+
+        pattern = np.asarray(pattern, dtype=np.uint8)
+        num_positions: int = self.num_bits - pattern.shape[0] + 1
+        correlation = np.zeros(max(num_positions, 0), dtype=int)
+
+        for offset in range(min(8, num_positions)):
+            # Pattern shifted by `offset` bits, so it lines up with position `8 * i + offset` for byte i
+            shifted_pattern = np.packbits(np.concatenate((np.zeros(offset, dtype=np.uint8), pattern)))
+            num_windows: int = (num_positions - offset + 7) // 8
+
+            data = self.data
+            if data.shape[0] < num_windows + shifted_pattern.shape[0] - 1:
+                data = np.concatenate((data, np.zeros(shifted_pattern.shape[0], dtype=np.uint8)))
+
+            windows = sliding_window_view(data, shifted_pattern.shape[0])[:num_windows]
+            correlation[offset::8] = np.bitwise_count(windows & shifted_pattern).sum(axis=1)
+
+        return correlation
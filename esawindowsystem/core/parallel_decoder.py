@@ -0,0 +1,147 @@
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from esawindowsystem.core.BCJR_decoder_functions import predict_codeword_iteratively
+from esawindowsystem.core.encoder_functions import BitArray
+from esawindowsystem.core.stopping_rules import StoppingRule
+from esawindowsystem.core.trellis import TrellisTables
+
+# (shared memory name, shape, dtype) of an array in shared memory
+SharedArrayDescription = tuple[str, tuple[int, ...], str]
+
+# Arrays and trellis tables of the current worker process, set by `_initialize_worker`.
+_worker_state: dict[str, Any] = {}
+
+
+def to_shared_memory(arr: npt.NDArray[Any]) -> tuple[SharedMemory, SharedArrayDescription]:
+    """Copy `arr` into a new shared memory block.
+
+    The caller owns the block, and should `close` and `unlink` it when all workers are done. """
+    shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+    shared_arr: npt.NDArray[Any] = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    shared_arr[:] = arr
+
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def from_shared_memory(description: SharedArrayDescription) -> tuple[SharedMemory, npt.NDArray[Any]]:
+    """Attach to a shared memory block created by `to_shared_memory`, without copying it.
+
+    The returned `SharedMemory` has to be kept alive as long as the array is used. """
+    name, shape, dtype = description
+    shm = SharedMemory(name=name)
+    arr: npt.NDArray[Any] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    arr.flags.writeable = False
+
+    return shm, arr
+
+
+def _initialize_worker(
+        channel_log_likelihoods: SharedArrayDescription,
+        inner_tables: TrellisTables,
+        outer_tables: TrellisTables,
+        code_rate: Fraction,
+        max_num_iterations: int,
+        max_star_mode: str,
+        window_size: int | None,
+        stopping_rules: Iterable[str | StoppingRule] | None):
+    """Attach to the shared channel log likelihoods, once per worker process.
+
+    The trellis tables only store the edges once per state, so they are small enough to be sent to each worker. """
+    _worker_state['shared_memory'], _worker_state['channel_log_likelihoods'] = from_shared_memory(
+        channel_log_likelihoods)
+
+    _worker_state['inner_tables'] = inner_tables
+    _worker_state['outer_tables'] = outer_tables
+    _worker_state['code_rate'] = code_rate
+    _worker_state['max_num_iterations'] = max_num_iterations
+    _worker_state['max_star_mode'] = max_star_mode
+    _worker_state['window_size'] = window_size
+    _worker_state['stopping_rules'] = stopping_rules
+
+    # Worker processes exit without running `atexit` handlers, but multiprocessing runs its finalizers
+    Finalize(None, _close_worker_shared_memory, exitpriority=0)
+
+
+def _close_worker_shared_memory():
+    """Close the shared memory of the current worker process. The array has to be released first, because the block
+    cannot be closed while it is still used. """
+    _worker_state.pop('channel_log_likelihoods', None)
+    shm: SharedMemory | None = _worker_state.pop('shared_memory', None)
+    if shm is not None:
+        shm.close()
+
+
+def _decode_codeword(
+        i: int,
+        sent_bits_codeword: BitArray | None
+) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.float64], npt.NDArray[np.float64], int]:
+    """Decode codeword `i` of the shared channel log likelihoods in a worker process. """
+    return predict_codeword_iteratively(
+        _worker_state['channel_log_likelihoods'][i],
+        _worker_state['inner_tables'],
+        _worker_state['outer_tables'],
+        _worker_state['code_rate'],
+        _worker_state['max_num_iterations'],
+        sent_bits_codeword,
+        _worker_state['max_star_mode'],
+        _worker_state['window_size'],
+        _worker_state['stopping_rules']
+    )
+
+
+def predict_iteratively_parallel(
+        channel_log_likelihoods: npt.NDArray[np.float64],
+        inner_tables: TrellisTables,
+        outer_tables: TrellisTables,
+        code_rate: Fraction,
+        max_num_iterations: int,
+        sent_bit_sequence: BitArray | None = None,
+        num_workers: int | None = None,
+        max_star_mode: str = 'lookup',
+        window_size: int | None = None,
+        stopping_rules: Iterable[str | StoppingRule] | None = None
+) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.int_]]:
+    """Decode the codewords in parallel, with a pool of `num_workers` processes (default: number of CPUs).
+
+    `channel_log_likelihoods` has shape (codewords, PPM symbols, M). It is put in shared memory, so only the codeword
+    index is sent with each task. The results are in codeword order, in the same format as
+    `predict_iteratively_batched`. """
+    num_slices: int = channel_log_likelihoods.shape[0]
+    num_bits_per_slice: int = outer_tables.time_steps
+
+    sent_bits_codewords: list[BitArray | None] = [None] * num_slices
+    if sent_bit_sequence is not None:
+        sent_bits_codewords = [
+            sent_bit_sequence[i * num_bits_per_slice - 2 * i:(i + 1) * num_bits_per_slice - 2 * (i + 1)]
+            for i in range(num_slices)
+        ]
+
+    channel_shm, channel_description = to_shared_memory(np.ascontiguousarray(channel_log_likelihoods))
+
+    try:
+        with ProcessPoolExecutor(
+                max_workers=num_workers,
+                initializer=_initialize_worker,
+                initargs=(channel_description, inner_tables, outer_tables, code_rate, max_num_iterations,
+                          max_star_mode, window_size, stopping_rules)
+        ) as executor:
+            # `map` returns the results in the order of the codewords
+            results = list(executor.map(_decode_codeword, range(num_slices), sent_bits_codewords))
+    finally:
+        channel_shm.close()
+        channel_shm.unlink()
+
+    decoded_message = np.array([u_hat for u_hat, _, _, _ in results], dtype=int).flatten()
+    decoded_message_array = np.stack([codeword_array for _, codeword_array, _, _ in results], axis=1)
+    bit_error_ratios = np.stack([bers for _, _, bers, _ in results], axis=1)
+    num_iterations = np.array([n for _, _, _, n in results], dtype=int)
+
+    return decoded_message, decoded_message_array, bit_error_ratios, num_iterations
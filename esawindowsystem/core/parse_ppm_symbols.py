@@ -159,6 +159,59 @@ def check_timing_requirement(pulse: float, symbol_start: float, slot_length: flo
     return timing_requirement
 
 
+def parse_symbol_frames(
+        pulse_times: npt.NDArray[np.float64],
+        start_time: float,
+        slot_length: float,
+        symbol_length: float,
+        M: int,
+        num_symbol_frames: int) -> tuple[npt.NDArray[np.float64], int, npt.NDArray[np.float64]]:
+    """Determine the PPM symbol of each of the `num_symbol_frames` symbol frames after `start_time`.
+
+    Each pulse is assigned to its symbol frame and slot arithmetically, pulses in guard slots are left out, and the
+    symbol of a frame with multiple pulses is the most occurring symbol value (the lowest one on a tie). Frames
+    without a valid pulse get symbol 0.
+    Returns the symbols, the number of extra pulses in frames with more than one pulse (dark counts) and the distances
+    of the valid pulses to their slot centres. """
+    pulse_times = np.asarray(pulse_times, dtype=float)
+    symbol_starts = start_time + np.arange(num_symbol_frames + 1) * symbol_length
+
+    # A symbol frame includes both its start and end time, so a pulse exactly at the start of a frame also belongs to
+    # the previous frame.
+    frames = np.searchsorted(symbol_starts, pulse_times, side='right') - 1
+    pulse_indices = np.arange(pulse_times.shape[0])
+    on_frame_start = (frames >= 1) & (frames <= num_symbol_frames) & (pulse_times == symbol_starts[frames.clip(0)])
+    frames = np.concatenate((frames, frames[on_frame_start] - 1))
+    pulse_indices = np.concatenate((pulse_indices, pulse_indices[on_frame_start]))
+
+    in_frame = (frames >= 0) & (frames < num_symbol_frames)
+    frames, pulse_indices = frames[in_frame], pulse_indices[in_frame]
+    # Pulses per frame in order of arrival
+    order = np.lexsort((pulse_indices, frames))
+    frames, pulses = frames[order], pulse_times[pulse_indices[order]]
+
+    num_darkcounts: int = int(np.sum(np.maximum(np.bincount(frames, minlength=num_symbol_frames) - 1, 0)))
+
+    symbol_frame_starts = symbol_starts[frames]
+    rounded_symbols = np.round((pulses - symbol_frame_starts - 0.5 * slot_length) / slot_length)
+
+    # Symbols cannot be in guard slots
+    valid = rounded_symbols < M
+    frames, rounded_symbols = frames[valid], rounded_symbols[valid]
+    distances_to_slot_centre = pulses[valid] - symbol_frame_starts[valid] - 0.5 * slot_length - \
+        rounded_symbols * slot_length
+
+    # Number of occurrences of each symbol value in each frame
+    occurrences = np.bincount(frames * M + rounded_symbols.astype(int),
+                              minlength=num_symbol_frames * M).reshape((num_symbol_frames, M))
+    has_valid_pulse = np.any(occurrences > 0, axis=1)
+
+    symbols = np.zeros(num_symbol_frames)
+    symbols[has_valid_pulse] = np.argmax(occurrences, axis=1)[has_valid_pulse]
+
+    return symbols, num_darkcounts, distances_to_slot_centre
+
+
 def parse_ppm_symbols(
         pulse_times: npt.NDArray[np.float64],
         codeword_start_time: float,
@@ -172,7 +225,6 @@ def parse_ppm_symbols(
         **kwargs: dict[str, Any]) -> tuple[list[float], int, dict[str, Any]]:
 
     debug_data: dict[str, Any] = {}
-    symbols: list[float] = []
 
     # There should always be this amount of PPM symbols in a codeword.
     # Any pulse times falling outside of this timeframe are noise or belong to an adjacent codeword.
@@ -181,57 +233,12 @@ def parse_ppm_symbols(
 
     message_pulse_times = pulse_times[(pulse_times >= codeword_start_time) & (pulse_times < stop_time)]
 
-    distances_to_slot_centre = []
-    for i in range(num_symbol_frames):
-        symbol_frame_pulses, symbol_start, _ = find_pulses_within_symbol_frame(
-            i, symbol_length, message_pulse_times, codeword_start_time)
-
-        # No symbol detected in this symbol frame
-        if symbol_frame_pulses.size == 0:
-            symbols.append(0)
-            continue
-
-        j = 0
-        if len(symbol_frame_pulses) > 1:
-            num_darkcounts += len(symbol_frame_pulses) - 1
-
-        symbol_frame_symbols = []
-        for pulse in symbol_frame_pulses:
-            symbol = (pulse - symbol_start - 0.5 * slot_length) / slot_length
-
-            # Symbols cannot be in guard slots
-            if round(symbol) >= M:
-                continue
-
-            # if kwargs.get('debug_mode'):
-            distances_to_slot_centre.append(pulse-symbol_start-0.5*slot_length-round(symbol)*slot_length)
-
-            # If the symbol is too far off the bin center, it is most likely a darkcount
-            # Uncomment to enforce the CCSDS timing requirement. It is commented
-            # because it seems to make the error rate slightly worse.
-
-            # timing_requirement = check_timing_requirement(pulse, symbol_start, slot_length)
-            # if not timing_requirement:
-            #     print('timing requirement not met')
-            #     continue
-            symbol_frame_symbols.append(symbol)
-            # symbols.append(symbol)
-            j += 1
-            # break
-
-        # If there were pulses detected in the symbol frame, but none of them were valid symbols, use a 0 instead.
-        # This makes sure that there will always be a symbol in each symbol frame.
-        if j == 0:
-            symbols.append(0)
-            continue
-        rounded_symbols = np.round(symbol_frame_symbols)
-        occurences = []
-
-        for symbol in np.unique(rounded_symbols):
-            occurences.append(np.count_nonzero(rounded_symbols == symbol))
+    frame_symbols, num_frame_darkcounts, frame_distances_to_slot_centre = parse_symbol_frames(
+        message_pulse_times, codeword_start_time, slot_length, symbol_length, M, num_symbol_frames)
 
-        best_symbol = np.unique(rounded_symbols[np.argmax(occurences)])[0]
-        symbols.append(best_symbol)
+    symbols: list[float] = frame_symbols.tolist()
+    num_darkcounts += num_frame_darkcounts
+    distances_to_slot_centre: list[float] = frame_distances_to_slot_centre.tolist()
 
     codeword_idx: int = kwargs.get('codeword_idx', 0)
     if sent_symbols is None:
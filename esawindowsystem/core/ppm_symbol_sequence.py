@@ -0,0 +1,61 @@
+import numpy as np
+import numpy.typing as npt
+
+from esawindowsystem.core.encoder_functions import get_csm, slot_map, validate_PPM_order
+
+
+class PPMSymbolSequence:
+    """Compact representation of a slot mapped PPM sequence.
+
+    Instead of a (symbols, 5M/4) array with a single one per row, only the PPM symbol value (the index of the pulse
+    slot) of each symbol is stored, as uint8. The framing metadata is kept alongside, so that the dense slot mapped
+    sequence, the pulse slot indices and the codewords can be derived from it. """
+    __slots__ = ('symbols', 'M', 'insert_guardslots', 'num_csm_symbols', 'symbols_per_codeword')
+
+    def __init__(
+            self,
+            symbols: npt.ArrayLike,
+            M: int,
+            insert_guardslots: bool = True,
+            num_csm_symbols: int | None = None,
+            symbols_per_codeword: int | None = None):
+        """By default, every codeword of 15120/m symbols is preceded by the CSM of `get_csm(M)`. """
+        validate_PPM_order(M)
+
+        self.M = M
+        self.symbols: npt.NDArray[np.uint8 | np.uint16] = np.asarray(symbols).astype(
+            np.uint8 if M <= 256 else np.uint16)
+        self.insert_guardslots = insert_guardslots
+        self.num_csm_symbols: int = len(get_csm(M)) if num_csm_symbols is None else num_csm_symbols
+        self.symbols_per_codeword: int = int(15120 / np.log2(M)) if symbols_per_codeword is None \
+            else symbols_per_codeword
+
+    @classmethod
+    def from_slot_mapped_sequence(cls, slot_mapped_sequence: npt.NDArray[np.int_], M: int, **kwargs):
+        """Convert a dense slot mapped sequence (see `slot_map`) to the compact representation. """
+        insert_guardslots: bool = slot_mapped_sequence.shape[1] > M
+        return cls(np.nonzero(slot_mapped_sequence)[1], M, insert_guardslots, **kwargs)
+
+    def __len__(self) -> int:
+        return self.symbols.shape[0]
+
+    @property
+    def num_slots_per_symbol(self) -> int:
+        return self.M + self.M // 4 if self.insert_guardslots else self.M
+
+    @property
+    def pulse_slots(self) -> npt.NDArray[np.int_]:
+        """Index of the pulse slot of each symbol in the slot sequence. """
+        return slot_map(self.symbols, self.M, self.insert_guardslots, sparse=True)
+
+    def to_slot_mapped_sequence(self) -> npt.NDArray[np.int_]:
+        """Expand to the dense (symbols, slots per symbol) slot mapped sequence. """
+        return slot_map(self.symbols, self.M, self.insert_guardslots)
+
+    def get_codeword_symbols(self) -> npt.NDArray[np.int_]:
+        """Return the PPM symbols of all complete codewords, without the CSMs. """
+        frame_length: int = self.num_csm_symbols + self.symbols_per_codeword
+        num_codewords: int = len(self) // frame_length
+
+        frames = self.symbols[:num_codewords * frame_length].reshape((num_codewords, frame_length))
+        return frames[:, self.num_csm_symbols:].flatten().astype(int)
@@ -1,4 +1,3 @@
-import pickle
 from fractions import Fraction
 from typing import Any
 from pathlib import Path
@@ -14,9 +13,10 @@ from esawindowsystem.core.encoder_functions import (bit_deinterleave,
                                                     get_asm_bit_arr, get_csm,
                                                     randomize, slot_map,
                                                     unpuncture)
-from esawindowsystem.core.trellis import Trellis
+from esawindowsystem.core.packed_bits import PackedBits
+from esawindowsystem.core.ppm_symbol_sequence import PPMSymbolSequence
+from esawindowsystem.core.trellis_cache import get_trellis_tables
 from esawindowsystem.core.utils import (bpsk_encoding,
-                                        generate_outer_code_edges,
                                         get_BER_before_decoding, poisson_noise)
 
 
@@ -29,7 +29,7 @@ PARENT_DIR = Path(__file__).parent.parent.resolve()
 
 
 def decode(
-    slot_mapped_sequence: npt.NDArray[np.int_],
+    slot_mapped_sequence: npt.NDArray[np.int_] | PPMSymbolSequence,
     M: int,
     CODE_RATE: Fraction,
     CHANNEL_INTERLEAVE: bool = True,
@@ -39,19 +39,24 @@ def decode(
 ) -> tuple[npt.NDArray[np.int_], float | None]:
     user_settings = kwargs.get('user_settings', {})
 
+    m = int(np.log2(M))
+
     # The decode message takes an array of PPM symbols, so the slot mapped message
     # Should be converted to a ppm mapped message first.
-    ppm_mapped_message = np.nonzero(slot_mapped_sequence)[1]
+    if isinstance(slot_mapped_sequence, PPMSymbolSequence):
+        # The sequence knows its own framing, which can differ from the default CSM (e.g. no CSMs at all)
+        ppm_mapped_message = slot_mapped_sequence.get_codeword_symbols()
+    else:
+        ppm_mapped_message = np.nonzero(slot_mapped_sequence)[1]
 
-    # The ppm mapped message still includes the synchronisation marker.
-    # Remove CSMs
-    CSM = get_csm(M)
-    m = int(np.log2(M))
-    symbols_per_codeword: int = int(15120 / m)
+        # The ppm mapped message still includes the synchronisation marker.
+        # Remove CSMs
+        CSM = get_csm(M)
+        symbols_per_codeword: int = int(15120 / m)
 
-    ppm_mapped_message = ppm_mapped_message.reshape((-1, symbols_per_codeword + len(CSM)))
-    ppm_mapped_message = ppm_mapped_message[:, len(CSM):]
-    ppm_mapped_message = ppm_mapped_message.flatten()
+        ppm_mapped_message = ppm_mapped_message.reshape((-1, symbols_per_codeword + len(CSM)))
+        ppm_mapped_message = ppm_mapped_message[:, len(CSM):]
+        ppm_mapped_message = ppm_mapped_message.flatten()
 
     convoluted_bit_sequence: npt.NDArray[np.int_]
 
@@ -97,9 +102,7 @@ def decode(
 
     if BIT_INTERLEAVE:
         print('Bit deinterleaving')
-        received_sequence = np.zeros_like(received_sequence_interleaved)
-        for i, row in enumerate(received_sequence_interleaved):
-            received_sequence[i] = bit_deinterleave(row)
+        received_sequence = bit_deinterleave(received_sequence_interleaved)
     else:
         received_sequence = received_sequence_interleaved
 
@@ -108,31 +111,11 @@ def decode(
     print('Setting up trellis')
     print()
 
-    num_output_bits: int = 3
-    num_input_bits: int = 1
-    memory_size: int = 2
-    edges = generate_outer_code_edges(memory_size, bpsk_encoding=False)
-
     time_steps = int(deinterleaved_received_sequence.shape[0] * float(CODE_RATE))
 
     if not use_inner_encoder:
-        if kwargs.get('use_cached_trellis'):
-            cached_trellis_file_path = kwargs.get('cached_trellis_file_path')
-            # Note to self: do this more proper, now it just falls back silently if the file path is not found.
-            if cached_trellis_file_path is not None and cached_trellis_file_path.is_file():
-                with open(cached_trellis_file_path, 'rb') as f:
-                    cached_trellis = pickle.load(f)
-                    tr = cached_trellis
-            else:
-                tr = Trellis(memory_size, num_output_bits, time_steps, edges, num_input_bits)
-                tr.set_edges(edges)
-
-                with open(f'cached_trellis_{time_steps}_timesteps', 'wb') as f:
-                    pickle.dump(tr, f)
-
-        else:
-            tr = Trellis(memory_size, num_output_bits, time_steps, edges, num_input_bits)
-            tr.set_edges(edges)
+        # The trellis tables are cached on disk, see `get_trellis_tables`.
+        _, tr = get_trellis_tables(M, CODE_RATE, time_steps, cache_dir=kwargs.get('trellis_cache_dir'))
 
         Es = 5
 
@@ -161,13 +144,14 @@ def decode(
         information_blocks = randomize(information_blocks.reshape((-1, num_bits - 2)))
         information_blocks = information_blocks.flatten()
 
-    while information_blocks.shape[0] / 8 != information_blocks.shape[0] // 8:
-        information_blocks = np.hstack((information_blocks, 0))
+    # Pad to a whole number of bytes
+    information_blocks = np.hstack((information_blocks, np.zeros(-information_blocks.shape[0] % 8, dtype=int)))
+    information_bits = PackedBits.from_bits(information_blocks)
 
     # For now, assume there is only one 32-bit ASM and remove it.
     ASM_arr = get_asm_bit_arr()
 
-    asm_corr = np.correlate(information_blocks, ASM_arr, 'valid')
+    asm_corr = information_bits.correlate(ASM_arr)
 
     if kwargs.get('debug_mode'):
         plt.figure()
@@ -190,6 +174,9 @@ def decode(
     # information_blocks = information_blocks[where_asms[0] +
     #                                         ASM_arr.shape[0]:(where_asms[0] + ASM_arr.shape[0] + num_bits * 8)]
 
+    if kwargs.get('packed', False):
+        return information_bits, BER_before_decoding, where_asms
+
     return information_blocks, BER_before_decoding, where_asms
 
 
@@ -8,21 +8,31 @@ import numpy.typing as npt
 from esawindowsystem.core.encoder_functions import (accumulate, append_CRC, get_CRC,
                                                     bit_interleave,
                                                     channel_interleave,
-                                                    convolve, get_csm,
+                                                    convolve_arr, get_csm,
                                                     map_PPM_symbols, puncture,
                                                     randomize, slicer,
                                                     slot_map, zero_terminate, prepend_asm)
+from esawindowsystem.core.packed_bits import PackedBits
+from esawindowsystem.core.ppm_symbol_sequence import PPMSymbolSequence
 from esawindowsystem.core.utils import ppm_symbols_to_bit_array
 
 # Get root directory
 PARENT_DIR = Path(__file__).parent.parent.resolve()
 
 
-def preprocess_bit_stream(bit_stream: npt.NDArray[np.int_], code_rate: Fraction, include_crc: bool = False, **kwargs) -> npt.NDArray[np.int_]:
+def preprocess_bit_stream(
+    bit_stream: npt.NDArray[np.int_] | PackedBits,
+    code_rate: Fraction,
+    include_crc: bool = False,
+    **kwargs
+) -> npt.NDArray[np.int_]:
     """This preprocessing function slices the bit stream in information blocks and attaches the CRC. """
     # Slice into information blocks of 5038 bits (code rate 1/3) and append 2 termination bits.
     # CRC attachment is still to be implemented
     bit_stream = prepend_asm(bit_stream)
+    if isinstance(bit_stream, PackedBits):
+        # The information blocks are not a whole number of bytes, so they are sliced from the unpacked bits.
+        bit_stream = bit_stream.unpack()
     information_blocks = slicer(bit_stream, code_rate, include_crc=include_crc, len_CRC=32, num_termination_bits=2)
     with open(PARENT_DIR / 'tmp' / 'sent_bit_sequence_no_csm', 'wb') as f:
         pickle.dump(information_blocks.flatten(), f)
@@ -51,11 +61,7 @@ def SCPPM_encoder(
 
     # The convolutional encoder is a 1/3 code rate encoder, so you end up with
     # 3x more columns.
-    convoluted_bit_sequence = np.zeros(
-        (information_blocks.shape[0], information_blocks.shape[1] * 3), dtype=int)
-
-    for i, row in enumerate(information_blocks):
-        convoluted_bit_sequence[i], _ = convolve(row)
+    convoluted_bit_sequence, _ = convolve_arr(information_blocks)
 
     if code_rate != Fraction(1, 3):
         convolutional_codewords: npt.NDArray[np.int_] = puncture(convoluted_bit_sequence, code_rate)
@@ -63,12 +69,10 @@ def SCPPM_encoder(
         convolutional_codewords = convoluted_bit_sequence
 
     if BIT_INTERLEAVE:
-        for i, row in enumerate(convolutional_codewords):
-            convolutional_codewords[i] = bit_interleave(convolutional_codewords[i])
+        convolutional_codewords = bit_interleave(convolutional_codewords)
 
     if kwargs.get('use_inner_encoder'):
-        for i, row in enumerate(convolutional_codewords):
-            convolutional_codewords[i] = accumulate(convolutional_codewords[i])
+        convolutional_codewords = accumulate(convolutional_codewords)
 
     encoded_message = convolutional_codewords.flatten()
 
@@ -101,8 +105,10 @@ def postprocess_ppm_symbols(
     CHANNEL_INTERLEAVE: bool = True,
     q: int = 1,
     **kwargs
-):
-    """Takes the PPM symbols and interleaves them, adds the CSM and repeats the message q times. """
+) -> npt.NDArray[np.int_] | PPMSymbolSequence:
+    """Takes the PPM symbols and interleaves them, adds the CSM and repeats the message q times.
+
+    Returns the slot mapped sequence, or with `compact=True`, a `PPMSymbolSequence`. """
     # Note: repeater not yet implemented.
     if CHANNEL_INTERLEAVE:
         PPM_symbols = channel_interleave(PPM_symbols, B_interleaver, N_interleaver)
@@ -116,28 +122,30 @@ def postprocess_ppm_symbols(
 
     ppm_mapped_message_with_csm = np.zeros(
         len(PPM_symbols) + len(CSM) * num_codewords, dtype=int)
-    for i in range(num_codewords):
-        prepended_codeword = np.hstack(
-            (CSM, PPM_symbols[i * symbols_per_codeword:(i + 1) * symbols_per_codeword]))
-        ppm_mapped_message_with_csm[
-            i * len(prepended_codeword):(i + 1) * len(prepended_codeword)
-        ] = prepended_codeword
+
+    frame_length: int = len(CSM) + symbols_per_codeword
+    frames = ppm_mapped_message_with_csm[:num_codewords * frame_length].reshape((num_codewords, frame_length))
+    frames[:, :len(CSM)] = CSM
+    frames[:, len(CSM):] = PPM_symbols[:num_codewords * symbols_per_codeword].reshape((num_codewords, -1))
 
     PPM_symbols = ppm_mapped_message_with_csm
 
+    if kwargs.get('compact', False):
+        return PPMSymbolSequence(PPM_symbols, M, num_csm_symbols=len(CSM), symbols_per_codeword=symbols_per_codeword)
+
     slot_mapped_sequence = slot_map(PPM_symbols, M)
 
     return slot_mapped_sequence
 
 
 def encoder(
-        bit_stream: npt.NDArray[np.int_],
+        bit_stream: npt.NDArray[np.int_] | PackedBits,
         M: int,
         code_rate: Fraction,
-        **kwargs) -> tuple[npt.NDArray[np.int_], npt.NDArray[np.int_], npt.NDArray[np.int_]]:
+        **kwargs) -> tuple[npt.NDArray[np.int_] | PPMSymbolSequence, npt.NDArray[np.int_], npt.NDArray[np.int_]]:
     """Does some preprocessing steps to the bit_stream (slice bit stream into blocks, add CRC), puts it through the SCPPM_encoder and post-processing (interleave, add CSM).
 
-    Returns a slot mapped binary vector.
+    Returns a slot mapped binary vector, or with `compact=True` the PPM symbols as a `PPMSymbolSequence`.
     """
 
     user_settings: dict = kwargs.get('user_settings', {})
@@ -159,11 +167,14 @@ def encoder(
     PPM_symbols = SCPPM_encoder(information_blocks, M, code_rate, **kwargs)
 
     slot_mapped_sequence = postprocess_ppm_symbols(
-        PPM_symbols, M, B_interleaver, N_interleaver
+        PPM_symbols, M, B_interleaver, N_interleaver, compact=kwargs.get('compact', False)
     )
 
     with open(PARENT_DIR / 'tmp' / 'sent_bit_sequence_post_processed', 'wb') as f:
-        sent_ppm_symbols = np.nonzero(slot_mapped_sequence)[1]
+        if isinstance(slot_mapped_sequence, PPMSymbolSequence):
+            sent_ppm_symbols = slot_mapped_sequence.symbols
+        else:
+            sent_ppm_symbols = np.nonzero(slot_mapped_sequence)[1]
         sent_bit_sequence = ppm_symbols_to_bit_array(sent_ppm_symbols, int(np.log2(M)))
         pickle.dump(sent_bit_sequence, f)
 
@@ -0,0 +1,132 @@
+from collections.abc import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+from esawindowsystem.core.encoder_functions import get_CRC_arr
+
+
+class StoppingRule:
+    """Early termination rule of the iterative (turbo) decoder.
+
+    After each iteration, the rule is called with the indices of the codewords that are still being decoded, their
+    information bit LLRs and their hard decisions (before derandomization), both with shape (codewords, bits). It
+    returns for each of these codewords whether decoding can stop. Rules that compare iterations keep their state per
+    codeword index, `reset` clears it before a new set of codewords is decoded. """
+    __slots__ = ()
+
+    def reset(self, num_codewords: int, num_bits: int) -> None:
+        pass
+
+    def __call__(
+            self,
+            codewords: npt.NDArray[np.int_],
+            LLRs: npt.NDArray[np.float64],
+            hard_decisions: npt.NDArray[np.int_]) -> npt.NDArray[np.bool_]:
+        raise NotImplementedError
+
+
+class CRCStoppingRule(StoppingRule):
+    """Stop when the CRC-32 of the hard decisions matches. The parity bits precede the two termination bits. """
+    __slots__ = ()
+
+    def __call__(self, codewords, LLRs, hard_decisions):
+        return np.all(hard_decisions[:, -34:-2] == get_CRC_arr(hard_decisions[:, :-2]), axis=1)
+
+
+class HardDecisionStoppingRule(StoppingRule):
+    """Stop when the hard decisions did not change for `num_iterations` consecutive iterations. """
+    __slots__ = ('num_iterations', 'previous_hard_decisions', 'num_unchanged_iterations')
+
+    def __init__(self, num_iterations: int = 1):
+        self.num_iterations = num_iterations
+        self.previous_hard_decisions: npt.NDArray[np.int8] = np.zeros((0, 0), dtype=np.int8)
+        self.num_unchanged_iterations: npt.NDArray[np.int_] = np.zeros(0, dtype=int)
+
+    def reset(self, num_codewords, num_bits):
+        # -1 never matches a hard decision, so the first iteration is never unchanged
+        self.previous_hard_decisions = np.full((num_codewords, num_bits), -1, dtype=np.int8)
+        self.num_unchanged_iterations = np.zeros(num_codewords, dtype=int)
+
+    def __call__(self, codewords, LLRs, hard_decisions):
+        unchanged = np.all(self.previous_hard_decisions[codewords] == hard_decisions, axis=1)
+        self.num_unchanged_iterations[codewords] = np.where(unchanged, self.num_unchanged_iterations[codewords] + 1, 0)
+        self.previous_hard_decisions[codewords] = hard_decisions
+
+        return self.num_unchanged_iterations[codewords] >= self.num_iterations
+
+
+class MinimumLLRStoppingRule(StoppingRule):
+    """Stop when the smallest |LLR| of the information bits exceeds `threshold`, i.e. when all bits are reliable. """
+    __slots__ = ('threshold',)
+
+    def __init__(self, threshold: float = 10.):
+        self.threshold = threshold
+
+    def __call__(self, codewords, LLRs, hard_decisions):
+        return np.min(np.abs(LLRs), axis=1) > self.threshold
+
+
+class CrossEntropyStoppingRule(StoppingRule):
+    """Stop when the cross entropy between the LLR distributions of two consecutive iterations, approximated by
+    sum((L(i) - L(i-1))^2 * exp(-|L(i)|)), drops below `ratio` times its value after the first iteration. """
+    __slots__ = ('ratio', 'previous_LLRs', 'initial_cross_entropy')
+
+    def __init__(self, ratio: float = 1E-3):
+        self.ratio = ratio
+        self.previous_LLRs: npt.NDArray[np.float64] = np.zeros((0, 0))
+        self.initial_cross_entropy: npt.NDArray[np.float64] = np.zeros(0)
+
+    def reset(self, num_codewords, num_bits):
+        self.previous_LLRs = np.zeros((num_codewords, num_bits))
+        self.initial_cross_entropy = np.full(num_codewords, np.nan)
+
+    def __call__(self, codewords, LLRs, hard_decisions):
+        cross_entropy = np.sum((LLRs - self.previous_LLRs[codewords])**2 * np.exp(-np.abs(LLRs)), axis=1)
+        self.previous_LLRs[codewords] = LLRs
+
+        first_iteration = np.isnan(self.initial_cross_entropy[codewords])
+        self.initial_cross_entropy[codewords[first_iteration]] = cross_entropy[first_iteration]
+
+        return ~first_iteration & (cross_entropy <= self.ratio * self.initial_cross_entropy[codewords])
+
+
+# Stopping rules that can be selected by name, with their default parameters
+stopping_rules: dict[str, type[StoppingRule]] = {
+    'crc': CRCStoppingRule,
+    'hard-decision': HardDecisionStoppingRule,
+    'min-llr': MinimumLLRStoppingRule,
+    'cross-entropy': CrossEntropyStoppingRule
+}
+
+
+def get_stopping_rules(rules: Iterable[str | StoppingRule] | None = None) -> list[StoppingRule]:
+    """Return the stopping rules, given by name (see `stopping_rules`) or as instances. By default only the CRC is
+    checked. """
+    if rules is None:
+        return [CRCStoppingRule()]
+
+    selected_rules: list[StoppingRule] = []
+    for rule in rules:
+        if isinstance(rule, StoppingRule):
+            selected_rules.append(rule)
+        elif rule in stopping_rules:
+            selected_rules.append(stopping_rules[rule]())
+        else:
+            raise ValueError(f'Unknown stopping rule {rule!r}, expected one of {list(stopping_rules)}')
+
+    return selected_rules
+
+
+def check_stopping_rules(
+        rules: list[StoppingRule],
+        codewords: npt.NDArray[np.int_],
+        LLRs: npt.NDArray[np.float64],
+        hard_decisions: npt.NDArray[np.int_]) -> npt.NDArray[np.bool_]:
+    """A codeword can stop when any of the rules says so. All rules are evaluated, so that they can update their
+    state. """
+    stop = np.zeros(codewords.shape[0], dtype=bool)
+    for rule in rules:
+        stop |= rule(codewords, LLRs, hard_decisions)
+
+    return stop
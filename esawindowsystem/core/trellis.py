@@ -1,3 +1,4 @@
+from collections.abc import Mapping, Sequence
 from copy import copy, deepcopy
 
 import numpy.typing as npt
@@ -67,7 +68,7 @@ class State:
 
     def __init__(self, label: int, num_edges: int):
         self.label: int = label
-        self.edges: list[Edge] = []
+        self.edges: list[Edge] | tuple[Edge, ...] = []
         self.alpha: None | float = None
         self.beta: None | float = None
 
@@ -90,8 +91,57 @@ class Stage:
         return self.time_step < other.time_step
 
 
+# Edges of each state of a stage
+EdgeTemplate = tuple[tuple[Edge, ...], ...]
+
+
+class LazyStages(Sequence[Stage]):
+    """Stages of a lazy `Trellis`, which are only created when they are accessed.
+
+    The states of a stage do not own their edges, they refer to a shared edge template. Only a handful of templates
+    exist (the zero initiated and zero terminated boundary stages, and one for all other stages), so setting the edges
+    does not copy any `Edge`. """
+    __slots__ = ('num_states', 'num_input_bits', 'edge_templates', 'stage_templates', '_stages')
+
+    def __init__(self, num_stages: int, num_states: int, num_input_bits: int):
+        self.num_states = num_states
+        self.num_input_bits = num_input_bits
+        # Template 0 has no edges, all stages use it until the edges are set.
+        self.edge_templates: list[EdgeTemplate] = [((),) * num_states]
+        # Index of the edge template of each stage
+        self.stage_templates: npt.NDArray[np.int_] = np.zeros(num_stages, dtype=int)
+        self._stages: dict[int, Stage] = {}
+
+    def set_edge_templates(self, edge_templates: list[EdgeTemplate], stage_templates: npt.NDArray[np.int_]) -> None:
+        self.edge_templates = edge_templates
+        self.stage_templates = stage_templates
+        self._stages = {}
+
+    def __len__(self) -> int:
+        return len(self.stage_templates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Stage index out of range')
+
+        stage = self._stages.get(index)
+        if stage is None:
+            stage = Stage(self.num_states, self.num_input_bits, index)
+            for state, state_edges in zip(stage.states, self.edge_templates[self.stage_templates[index]]):
+                state.edges = state_edges
+            self._stages[index] = stage
+
+        return stage
+
+
 class Trellis:
-    __slots__ = ('memory_size', 'num_states', 'stages', 'num_input_bits', 'num_output_bits', 'edge_model', 'edges')
+    __slots__ = ('memory_size', 'num_states', 'stages', 'num_input_bits', 'num_output_bits', 'edge_model', 'edges',
+                 'zero_initiated', 'zero_terminated')
 
     def __init__(
             self,
@@ -99,20 +149,30 @@ class Trellis:
             num_output_bits: int,
             time_steps: int,
             edges: list[list[Edge]],
-            num_input_bits: int = 1):
-
+            num_input_bits: int = 1,
+            lazy: bool = False):
+        """When `lazy` is True, the stages are only created when accessed and all stages share the same `Edge`
+        objects (see `LazyStages`). The edges of a lazy trellis should not be modified, the per time step metrics
+        (gammas, lambdas) are kept in arrays indexed by (time step, state, edge) instead, see `TrellisTables`. """
         self.memory_size = memory_size
         self.num_states = 2**memory_size
 
         # There are two stages for 1 timestep/transition, one for the initial state and one for the final state.
         # The `time_steps + 1`-th stage has all states, but no edges. This is needed to properly calculate beta
-        self.stages: tuple[Stage, ...] = tuple(
-            Stage(self.num_states, num_input_bits, time_step) for time_step in range(time_steps + 1)
-        )
+        self.stages: tuple[Stage, ...] | LazyStages
+        if lazy:
+            self.stages = LazyStages(time_steps + 1, self.num_states, num_input_bits)
+        else:
+            self.stages = tuple(
+                Stage(self.num_states, num_input_bits, time_step) for time_step in range(time_steps + 1)
+            )
         # self.stages = sorted(self.stages)
         self.num_input_bits = num_input_bits
         self.num_output_bits = num_output_bits
         self.edge_model = edges
+        # Set by `set_edges`
+        self.zero_initiated: bool = True
+        self.zero_terminated: bool = True
 
     def set_edges(self,
                   edges: list[list[Edge]],
@@ -120,6 +180,13 @@ class Trellis:
                   zero_terminated: bool = True
                   ) -> None:
         """Add edges to each state, as specified by the edges tuple. """
+        self.zero_initiated = zero_initiated
+        self.zero_terminated = zero_terminated
+
+        if isinstance(self.stages, LazyStages):
+            self._set_edge_templates(edges, zero_initiated, zero_terminated)
+            return
+
         ending_state_labels: set[int]
         if zero_initiated:
             starting_state_labels: set[int] = {0}
@@ -161,3 +228,141 @@ class Trellis:
                     {e.to_state for e in state_edges if e.to_state is not None})
 
             starting_state_labels = ending_state_labels
+
+    def _set_edge_templates(self, edges: list[list[Edge]], zero_initiated: bool, zero_terminated: bool) -> None:
+        """Set the edges of a lazy trellis, following the same rules as `set_edges`, without copying any edge. """
+        num_stages: int = len(self.stages)
+        all_edges: EdgeTemplate = tuple(tuple(state_edges) for state_edges in edges)
+
+        # Template 0 has no edges (for the last stage), template 1 has all edges.
+        edge_templates: list[EdgeTemplate] = [((),) * self.num_states, all_edges]
+        stage_templates: npt.NDArray[np.int_] = np.zeros(num_stages, dtype=int)
+
+        start: int = self.memory_size if zero_initiated else 0
+        end: int = num_stages - 1 - self.memory_size if zero_terminated else num_stages - 1
+        stage_templates[start:end] = 1
+
+        if zero_initiated:
+            starting_state_labels: set[int] = {0}
+            for i in range(self.memory_size):
+                edge_templates.append(tuple(
+                    all_edges[label] if label in starting_state_labels else () for label in range(self.num_states)))
+                stage_templates[i] = len(edge_templates) - 1
+                starting_state_labels = {e.to_state for label in starting_state_labels for e in all_edges[label]
+                                         if e.to_state is not None}
+
+        if zero_terminated:
+            zero_input_edges: EdgeTemplate = tuple(
+                tuple(e for e in state_edges if e.edge_input_label == 0) for state_edges in all_edges)
+
+            starting_state_labels = set(range(self.num_states))
+            ending_state_labels: set[int] = set()
+            for i in range(end, num_stages - 1):
+                edge_templates.append(tuple(
+                    zero_input_edges[label] if label in starting_state_labels else ()
+                    for label in range(self.num_states)))
+                stage_templates[i] = len(edge_templates) - 1
+                ending_state_labels = ending_state_labels.union(
+                    {e.to_state for label in starting_state_labels for e in zero_input_edges[label]
+                     if e.to_state is not None})
+                starting_state_labels = ending_state_labels
+
+        self.stages.set_edge_templates(edge_templates, stage_templates)
+
+
+class TrellisTables:
+    """Dense array representation of a trellis.
+
+    Every stage of the trellis has the same transitions, so instead of an `Edge` object per transition per stage, the
+    transitions are stored once as tables indexed by (state, edge). The first and last stages of a zero initiated or
+    zero terminated trellis have fewer edges, these are masked out with `valid_edges`, indexed by (stage, state, edge).
+    """
+    __slots__ = ('memory_size', 'num_states', 'num_edges', 'time_steps', 'zero_initiated', 'zero_terminated',
+                 'next_states', 'edge_inputs', 'edge_outputs', 'edge_input_labels', 'edge_output_labels',
+                 'previous_states', 'previous_edges', 'valid_edges')
+
+    def __init__(
+            self,
+            edges: list[list[Edge]],
+            time_steps: int,
+            memory_size: int,
+            zero_initiated: bool = True,
+            zero_terminated: bool = True):
+
+        self.memory_size = memory_size
+        self.num_states = len(edges)
+        self.num_edges = len(edges[0])
+        self.time_steps = time_steps
+        self.zero_initiated = zero_initiated
+        self.zero_terminated = zero_terminated
+
+        self.next_states: npt.NDArray[np.int_] = np.array([[e.to_state for e in state_edges] for state_edges in edges])
+        self.edge_inputs: npt.NDArray[np.int8] = np.array(
+            [[np.atleast_1d(e.edge_input) for e in state_edges] for state_edges in edges], dtype=np.int8)
+        self.edge_outputs: npt.NDArray[np.int8] = np.array(
+            [[e.edge_output for e in state_edges] for state_edges in edges], dtype=np.int8)
+        self.edge_input_labels: npt.NDArray[np.int_] = np.array(
+            [[e.edge_input_label for e in state_edges] for state_edges in edges])
+        self.edge_output_labels: npt.NDArray[np.int_] = np.array(
+            [[e.edge_output_label for e in state_edges] for state_edges in edges])
+
+        # For the forward recursion, each state needs to know which (state, edge) pairs end in it.
+        # Incoming edges are ordered by the state they come from.
+        incoming: list[list[tuple[int, int]]] = [[] for _ in range(self.num_states)]
+        for from_state in range(self.num_states):
+            for edge_idx in range(self.num_edges):
+                incoming[self.next_states[from_state, edge_idx]].append((from_state, edge_idx))
+
+        self.previous_states: npt.NDArray[np.int_] = np.array([[s for s, _ in i] for i in incoming])
+        self.previous_edges: npt.NDArray[np.int_] = np.array([[e for _, e in i] for i in incoming])
+
+        self.valid_edges: npt.NDArray[np.bool_] = self.get_valid_edges(time_steps)
+
+    def to_arrays(self) -> dict[str, npt.NDArray]:
+        """Return all tables and properties as arrays, for example to store them with `np.savez`. """
+        return {name: np.asarray(getattr(self, name)) for name in self.__slots__}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, npt.NDArray]) -> 'TrellisTables':
+        """Rebuild the tables from the output of `to_arrays`, without the `Edge` objects. """
+        tables = cls.__new__(cls)
+        for name in cls.__slots__:
+            arr = np.asarray(arrays[name])
+            setattr(tables, name, arr.item() if arr.ndim == 0 else arr)
+
+        return tables
+
+    def get_initial_alphas(self) -> npt.NDArray[np.float64]:
+        """Log domain state metrics of the first stage: only the zero state for a zero initiated trellis. """
+        alphas = np.zeros(self.num_states)
+        if self.zero_initiated:
+            alphas[1:] = -np.inf
+
+        return alphas
+
+    def get_final_betas(self) -> npt.NDArray[np.float64]:
+        """Log domain state metrics of the last stage: only the zero state for a zero terminated trellis. """
+        betas = np.zeros(self.num_states)
+        if self.zero_terminated:
+            betas[1:] = -np.inf
+
+        return betas
+
+    def get_valid_edges(self, time_steps: int) -> npt.NDArray[np.bool_]:
+        """Return a (stages, states, edges) mask of the edges that exist, following the same rules as
+        `Trellis.set_edges`. """
+        valid_edges = np.ones((time_steps, self.num_states, self.num_edges), dtype=bool)
+
+        if self.zero_initiated:
+            starting_states = np.zeros(self.num_states, dtype=bool)
+            starting_states[0] = True
+            for i in range(min(self.memory_size, time_steps)):
+                valid_edges[i, ~starting_states, :] = False
+                starting_states = np.zeros(self.num_states, dtype=bool)
+                starting_states[self.next_states[valid_edges[i]]] = True
+
+        # Zero termination: only a zero input is allowed in the last `memory_size` stages.
+        if self.zero_terminated:
+            valid_edges[time_steps - self.memory_size:, self.edge_input_labels != 0] = False
+
+        return valid_edges
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import zipfile
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+
+from esawindowsystem.core.trellis import TrellisTables
+from esawindowsystem.core.utils import generate_inner_encoder_edges, generate_outer_code_edges
+
+# Increment when the layout of `TrellisTables` or the edge generation changes, so stale cache files are rebuilt.
+TRELLIS_CACHE_VERSION: int = 1
+
+# Environment variable that overrides the default cache directory
+CACHE_DIR_ENV_VARIABLE: str = 'ESAWINDOWSYSTEM_CACHE_DIR'
+
+MEMORY_SIZE_INNER: int = 1
+MEMORY_SIZE_OUTER: int = 2
+
+
+def get_cache_dir(cache_dir: str | Path | None = None) -> Path:
+    """Return the trellis cache directory.
+
+    In order of precedence: `cache_dir`, the `ESAWINDOWSYSTEM_CACHE_DIR` environment variable, or `esawindowsystem` in
+    the user cache directory. The directory does not depend on the working directory. """
+    if cache_dir is not None:
+        return Path(cache_dir)
+
+    if os.environ.get(CACHE_DIR_ENV_VARIABLE):
+        return Path(os.environ[CACHE_DIR_ENV_VARIABLE])
+
+    return Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'esawindowsystem'
+
+
+def get_cache_file_path(
+        M: int,
+        code_rate: Fraction,
+        block_length: int,
+        zero_terminated: bool = True,
+        cache_dir: str | Path | None = None) -> Path:
+    """Return the path of the cache file of the trellis tables of one decoder configuration. """
+    termination: str = 'terminated' if zero_terminated else 'unterminated'
+    file_name: str = (f'trellis_tables_v{TRELLIS_CACHE_VERSION}_M{M}_rate{code_rate.numerator}-{code_rate.denominator}'
+                      f'_{termination}_{block_length}.npz')
+
+    return get_cache_dir(cache_dir) / file_name
+
+
+def build_trellis_tables(
+        M: int,
+        code_rate: Fraction,
+        block_length: int,
+        zero_terminated: bool = True) -> tuple[TrellisTables, TrellisTables]:
+    """Build the inner (accumulator) and outer (convolutional code) trellis tables for `block_length` information
+    bits. The inner code is never terminated, `zero_terminated` only applies to the outer code. """
+    m = int(np.log2(M))
+    num_symbols: int = int(block_length / code_rate / m)
+
+    inner_edges = generate_inner_encoder_edges(m, bpsk_encoding=False)
+    outer_edges = generate_outer_code_edges(MEMORY_SIZE_OUTER, bpsk_encoding=False)
+
+    inner_tables = TrellisTables(inner_edges, num_symbols, MEMORY_SIZE_INNER, zero_terminated=False)
+    outer_tables = TrellisTables(outer_edges, block_length, MEMORY_SIZE_OUTER, zero_terminated=zero_terminated)
+
+    return inner_tables, outer_tables
+
+
+def save_trellis_tables(file_path: Path, inner_tables: TrellisTables, outer_tables: TrellisTables) -> None:
+    """Write the tables to `file_path`, with a version stamp.
+
+    The file is written to a temporary file first and then moved in place, so other processes never read a partially
+    written cache file. """
+    arrays = {f'inner.{name}': arr for name, arr in inner_tables.to_arrays().items()}
+    arrays |= {f'outer.{name}': arr for name, arr in outer_tables.to_arrays().items()}
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=file_path.parent, suffix='.npz', delete=False) as f:
+        temp_file_path = Path(f.name)
+        np.savez(f, version=np.array(TRELLIS_CACHE_VERSION), **arrays)
+
+    try:
+        os.replace(temp_file_path, file_path)
+    except OSError:
+        temp_file_path.unlink(missing_ok=True)
+        raise
+
+
+def load_trellis_tables(file_path: Path) -> tuple[TrellisTables, TrellisTables] | None:
+    """Load the tables written by `save_trellis_tables`.
+
+    Returns None when the file does not exist, cannot be read or was written by another cache version. """
+    try:
+        with np.load(file_path) as cache_file:
+            if int(cache_file['version']) != TRELLIS_CACHE_VERSION:
+                return None
+
+            inner_arrays = {}
+            outer_arrays = {}
+            for key in cache_file.files:
+                prefix, _, name = key.partition('.')
+                if prefix == 'inner':
+                    inner_arrays[name] = cache_file[key]
+                elif prefix == 'outer':
+                    outer_arrays[name] = cache_file[key]
+
+            return TrellisTables.from_arrays(inner_arrays), TrellisTables.from_arrays(outer_arrays)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def get_trellis_tables(
+        M: int,
+        code_rate: Fraction,
+        block_length: int,
+        zero_terminated: bool = True,
+        cache_dir: str | Path | None = None) -> tuple[TrellisTables, TrellisTables]:
+    """Return the inner and outer trellis tables, keyed by (M, code rate, termination, block length).
+
+    The tables are loaded from the cache directory (see `get_cache_dir`) when available, otherwise they are built and
+    stored there, so that other processes can reuse them. """
+    file_path = get_cache_file_path(M, code_rate, block_length, zero_terminated, cache_dir)
+
+    tables = load_trellis_tables(file_path)
+    if tables is not None:
+        return tables
+
+    inner_tables, outer_tables = build_trellis_tables(M, code_rate, block_length, zero_terminated)
+
+    try:
+        save_trellis_tables(file_path, inner_tables, outer_tables)
+    except OSError:
+        # A read only cache directory only costs the time to rebuild the tables next time.
+        pass
+
+    return inner_tables, outer_tables
@@ -8,7 +8,7 @@ import numpy.typing as npt
 import pandas as pd
 
 from esawindowsystem.core.data_converter import payload_to_bit_sequence
-from esawindowsystem.core.encoder_functions import slot_map
+from esawindowsystem.core.ppm_symbol_sequence import PPMSymbolSequence
 from esawindowsystem.core.scppm_encoder import encoder
 from esawindowsystem.ppm_parameters import (BIT_INTERLEAVE, CHANNEL_INTERLEAVE,
                                             CODE_RATE, CSM, GREYSCALE,
@@ -30,7 +30,7 @@ def generate_awg_pattern(pulse_width: int = 10, pulse_shape: str = 'gaussian', A
     msg_PPM_symbols: npt.NDArray[np.int_] = np.array([])
     num_PPM_symbols: int
     num_bits_sent: int
-    slot_mapped_sequence: npt.NDArray[np.int_]
+    ppm_symbol_sequence: PPMSymbolSequence
     sent_symbol: int | None = None
 
     match PAYLOAD_TYPE:
@@ -62,7 +62,7 @@ def generate_awg_pattern(pulse_width: int = 10, pulse_shape: str = 'gaussian', A
             message_time_microseconds = message_time * 1E6
             num_PPM_symbols = msg_PPM_symbols.shape[0]
             num_bits_sent = num_PPM_symbols * m
-            slot_mapped_sequence = slot_map(msg_PPM_symbols, M)
+            ppm_symbol_sequence = PPMSymbolSequence(msg_PPM_symbols, M, num_csm_symbols=0)
 
         case _:
             sent_message: npt.NDArray[np.int_] = payload_to_bit_sequence(
@@ -70,7 +70,7 @@ def generate_awg_pattern(pulse_width: int = 10, pulse_shape: str = 'gaussian', A
             num_bits_sent = len(sent_message)
 
             # I should consider replacing some of these kwargs with default positional arguments
-            slot_mapped_sequence, _, _ = encoder(
+            ppm_symbol_sequence, _, _ = encoder(
                 sent_message, M, CODE_RATE,
                 **{
                     'use_inner_encoder': USE_INNER_ENCODER,
@@ -82,17 +82,18 @@ def generate_awg_pattern(pulse_width: int = 10, pulse_shape: str = 'gaussian', A
                     },
                     'save_encoded_sequence_to_file': True,
                     'reference_file_prefix': 'herbig_haro',
-                    'num_samples_per_slot': num_samples_per_slot}
+                    'num_samples_per_slot': num_samples_per_slot,
+                    'compact': True}
             )
-            num_PPM_symbols = slot_mapped_sequence.shape[0]
+            num_PPM_symbols = len(ppm_symbol_sequence)
 
             # One SCPPM codeword is 15120/m symbols, as defined by the CCSDS protocol
             num_codewords = math.ceil(num_PPM_symbols / (symbols_per_codeword + len(CSM)))
-            num_slots = slot_mapped_sequence.flatten().shape[0]
+            num_slots = num_PPM_symbols * ppm_symbol_sequence.num_slots_per_symbol
             message_time = num_slots * slot_length
             message_time_microseconds = num_slots * slot_length * 1E6
 
-    sent_symbols = np.nonzero(slot_mapped_sequence)[1]
+    sent_symbols = ppm_symbol_sequence.symbols.astype(int)
 
     with open(PARENT_DIR / 'tmp' / 'sent_symbols', 'wb') as f:
         pickle.dump(sent_symbols, f)
@@ -118,8 +119,7 @@ def generate_awg_pattern(pulse_width: int = 10, pulse_shape: str = 'gaussian', A
     pulse = np.zeros(num_samples_per_symbol * num_PPM_symbols)
     print(f'Multiple of 256? {len(pulse)/256}')
 
-    for i, slot_mapped_symbol in enumerate(slot_mapped_sequence):
-        ppm_symbol_position = slot_mapped_symbol.nonzero()[0][0]
+    for i, ppm_symbol_position in enumerate(sent_symbols):
         if ADD_ASM:
             idx = i * num_samples_per_symbol + ppm_symbol_position * \
                 num_samples_per_slot + num_samples_per_slot // 2 - pulse_width // 2
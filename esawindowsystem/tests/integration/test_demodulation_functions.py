@@ -7,9 +7,9 @@ from numpy.random import default_rng
 
 from esawindowsystem.core.demodulation_functions import (
     demodulate, determine_CSM_time_shift, find_and_parse_codewords,
-    find_csm_times, get_csm_correlation, make_time_series)
+    find_csm_times, get_csm_correlation, get_slot_indices, make_time_series)
 from esawindowsystem.core.encoder_functions import get_csm
-from esawindowsystem.core.parse_ppm_symbols import parse_ppm_symbols
+from esawindowsystem.core.parse_ppm_symbols import parse_ppm_symbols, parse_symbol_frames
 
 
 @pytest.fixture
@@ -90,6 +90,29 @@ def test_parse_ppm_symbols_single_symbol():
     assert symbols[0] == pytest.approx(5)
 
 
+def test_parse_symbol_frames():
+    slot_length = 1.
+    symbol_length = 10.
+    M = 8
+    pulse_times = np.array([
+        2.5,                # Frame 0: symbol 2
+        13.4, 13.6, 15.5,   # Frame 1: symbol 3 twice and symbol 5 once
+        28.5,               # Frame 2: only a pulse in a guard slot
+        40.,                # Frame 3: the start of frame 4 is also the end of frame 3, so a guard slot
+        46.5,               # Frame 4: symbols 0 (the pulse at 40) and 6 once, a tie goes to the lowest symbol
+        51.5, 51.6, 54.4, 54.5, 54.6,   # Frame 5: symbol 1 twice and symbol 4 three times
+    ])
+
+    symbols, num_darkcounts, distances_to_slot_centre = parse_symbol_frames(
+        pulse_times, 0., slot_length, symbol_length, M, 7)
+
+    np.testing.assert_array_equal(symbols, [2, 3, 0, 0, 0, 4, 0])
+    # Two extra pulses in frame 1, one in frame 4 and four in frame 5
+    assert num_darkcounts == 7
+    np.testing.assert_allclose(distances_to_slot_centre, [0, -0.1, 0.1, 0, -0.5, 0, 0, 0.1, -0.1, 0, 0.1],
+                               atol=1E-12)
+
+
 def test_parse_ppm_symbols_multiple_symbols():
     symbol_length = 1E-6
     slot_length = 0.1 * symbol_length
@@ -180,6 +203,61 @@ def test_make_time_series():
     assert time_series[time_series == 1].shape[0] == 10
 
 
+def test_make_time_series_jitter():
+    slot_length = 1E-9
+    slots = np.sort(np.random.default_rng(4).choice(1000, 100, replace=False))
+    slots -= slots[0]
+    # The first pulse marks the start of a slot, the other pulses are in the middle of a slot, with some jitter
+    time_stamps = (slots + 0.5 + np.random.default_rng(5).uniform(-0.1, 0.1, slots.shape[0])) * slot_length
+    time_stamps[0] = 0
+
+    time_series, time_vec = make_time_series(time_stamps, slot_length)
+
+    assert time_series.shape[0] == time_vec.shape[0] - 1
+    np.testing.assert_array_equal(np.flatnonzero(time_series), slots)
+    # The time stamps are shifted, so that on average they are in the middle of a slot
+    assert np.mean(time_vec[slots] + 0.5 * slot_length - time_stamps) == pytest.approx(0, abs=1E-6 * slot_length)
+
+
+def test_get_slot_indices_compare_to_make_time_series():
+    slot_length = 1E-9
+    slots = np.sort(np.random.default_rng(4).choice(1000, 100, replace=False))
+    slots -= slots[0]
+    time_stamps = (slots + 0.5 + np.random.default_rng(5).uniform(-0.1, 0.1, slots.shape[0])) * slot_length
+    time_stamps[0] = 0
+
+    time_series, _ = make_time_series(time_stamps.copy(), slot_length)
+    slot_indices, num_slots = get_slot_indices(time_stamps.copy(), slot_length)
+
+    assert num_slots == time_series.shape[0]
+    np.testing.assert_array_equal(np.bincount(slot_indices, minlength=num_slots), time_series)
+
+
+@pytest.mark.parametrize("csm_correlation_method", ['fft', 'sparse'])
+def test_get_csm_correlation_methods(csm_correlation_method):
+    M = 8
+    slot_length = 1E-9
+    symbol_length = 10 * slot_length
+    CSM = get_csm(M)
+
+    rng = default_rng(6)
+    symbols = np.concatenate([np.concatenate((CSM, rng.integers(0, M, 200))) for _ in range(3)])
+    time_stamps = (np.arange(symbols.shape[0]) * 10 + symbols + 0.5) * slot_length
+    # Lose some of the pulses
+    time_stamps = time_stamps[rng.random(time_stamps.shape[0]) > 0.2]
+
+    expected_correlation = get_csm_correlation(time_stamps.copy(), slot_length, CSM, symbol_length)
+    correlation = get_csm_correlation(time_stamps.copy(), slot_length, CSM, symbol_length,
+                                      csm_correlation_method=csm_correlation_method)
+
+    np.testing.assert_array_equal(correlation, expected_correlation)
+
+
+def test_get_csm_correlation_unknown_method():
+    with pytest.raises(ValueError):
+        get_csm_correlation(np.arange(10) * 1E-9, 1E-9, get_csm(8), 1E-8, csm_correlation_method='wavelet')
+
+
 def test_find_csm_times_one_csm_no_lost_symbols(
         pulse_timestamps_single_csm: tuple[npt.NDArray[np.float64], float, int, float]):
     CSM = get_csm(M=8)
@@ -335,3 +413,29 @@ def test_find_csm_times_no_time_shift(pulse_timestamps_single_csm: tuple[npt.NDA
                                symbols_per_codeword, num_slots_per_symbol, csm_correlation, debug_mode=True)
 
     assert csm_times[0] == symbols_per_codeword / 2 * symbol_length
+
+
+@pytest.mark.parametrize("num_workers", [None, 3])
+def test_find_and_parse_codewords_lost_codeword(num_workers):
+    M = 8
+    slot_length = 1E-9
+    symbol_length = 10 * slot_length
+    CSM = get_csm(M)
+    symbols_per_codeword = int(15120 / np.log2(M))
+    num_codewords = 4
+
+    rng = default_rng(8)
+    sent_symbols = np.concatenate([np.concatenate((CSM, rng.integers(0, M, symbols_per_codeword)))
+                                   for _ in range(num_codewords)])
+    time_stamps = 1E-6 + (np.arange(sent_symbols.shape[0]) * 10 + sent_symbols + 0.5) * slot_length
+
+    # The CSM of the second codeword was not found, so the first CSM is followed by two codewords.
+    csm_times = 1E-6 + np.array([0, 2, 3]) * (symbols_per_codeword + len(CSM)) * symbol_length
+
+    msg_symbols = find_and_parse_codewords(csm_times, time_stamps, CSM, symbols_per_codeword, slot_length,
+                                           symbol_length, M, sent_symbols, num_workers=num_workers)
+
+    assert [len(symbols) for symbols in msg_symbols] == [2 * len(CSM) + 2 * symbols_per_codeword,
+                                                         len(CSM) + symbols_per_codeword,
+                                                         len(CSM) + symbols_per_codeword]
+    np.testing.assert_array_equal(np.concatenate(msg_symbols), sent_symbols)
@@ -2,9 +2,12 @@ from fractions import Fraction
 from math import ceil
 
 import numpy as np
+import pytest
 
 from esawindowsystem.core.encoder_functions import (bit_deinterleave, bit_interleave,
                                                     channel_deinterleave, channel_interleave)
+from esawindowsystem.core.ppm_symbol_sequence import PPMSymbolSequence
+from esawindowsystem.core.scppm_decoder import decode
 from esawindowsystem.core.scppm_encoder import encoder
 from esawindowsystem.ppm_parameters import B_interleaver, M, N_interleaver
 
@@ -55,6 +58,22 @@ def test_bit_interleaving():
     assert np.all(deinterleaved_bits == input_bits)
 
 
+def test_bit_interleaving_batch_of_LLRs():
+    rng = np.random.default_rng(5)
+    LLRs = rng.normal(size=(3, 15120))
+
+    interleaved_LLRs = bit_interleave(LLRs, dtype=float)
+    j = np.arange(15120)
+    for row, interleaved_row in zip(LLRs, interleaved_LLRs):
+        np.testing.assert_array_equal(interleaved_row, row[(11 * j + 210 * j**2) % 15120])
+
+    np.testing.assert_array_equal(bit_deinterleave(interleaved_LLRs, dtype=float), LLRs)
+    np.testing.assert_array_equal(bit_deinterleave(interleaved_LLRs[1], dtype=float), LLRs[1])
+
+    with pytest.raises(ValueError):
+        bit_interleave(LLRs[:, :-1], dtype=float)
+
+
 def test_encoder_num_output_symbols():
     M = 8
 
@@ -102,3 +121,37 @@ def test_encoder_num_output_symbols():
     assert slot_mapped_sequence.shape[0] == expected_number_of_symbols
     # Guard slots should be included at this point
     assert slot_mapped_sequence.shape[1] == int(5/4*M)
+
+
+def test_encoder_compact_output():
+    M = 16
+    code_rate = Fraction(2, 3)
+    input_bit_array = np.random.default_rng(6).integers(0, 2, 5000)
+
+    slot_mapped_sequence, sent_bit_sequence, _ = encoder(input_bit_array, M, code_rate)
+    ppm_symbol_sequence, compact_sent_bit_sequence, _ = encoder(input_bit_array, M, code_rate, compact=True)
+
+    assert isinstance(ppm_symbol_sequence, PPMSymbolSequence)
+    assert ppm_symbol_sequence.symbols.dtype == np.uint8
+    np.testing.assert_array_equal(ppm_symbol_sequence.to_slot_mapped_sequence(), slot_mapped_sequence)
+    np.testing.assert_array_equal(compact_sent_bit_sequence, sent_bit_sequence)
+
+
+@pytest.mark.parametrize("num_csm_symbols", [None, 0])
+def test_decode_ppm_symbol_sequence(num_csm_symbols):
+    M = 16
+    code_rate = Fraction(2, 3)
+    input_bit_array = np.random.default_rng(7).integers(0, 2, 5000)
+
+    ppm_symbol_sequence, _, _ = encoder(input_bit_array, M, code_rate, compact=True)
+    slot_mapped_sequence = ppm_symbol_sequence.to_slot_mapped_sequence()
+    if num_csm_symbols == 0:
+        # Sequences without CSMs, like the AWG patterns
+        ppm_symbol_sequence = PPMSymbolSequence(ppm_symbol_sequence.get_codeword_symbols(), M, num_csm_symbols=0)
+
+    expected_information_blocks, _, expected_where_asms = decode(slot_mapped_sequence, M, code_rate)
+    information_blocks, _, where_asms = decode(ppm_symbol_sequence, M, code_rate)
+
+    np.testing.assert_array_equal(where_asms, expected_where_asms)
+    np.testing.assert_array_equal(information_blocks, expected_information_blocks)
+    np.testing.assert_array_equal(information_blocks[where_asms[0] + 32:where_asms[0] + 5032], input_bit_array)
@@ -0,0 +1,81 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import esawindowsystem.core.BCJR_decoder_functions as decoder_functions
+from esawindowsystem.core.BCJR_decoder_utils import max_star_modes
+from esawindowsystem.core.encoder_functions import channel_deinterleave, get_csm, randomize, slot_map
+from esawindowsystem.core.scppm_encoder import encoder
+
+M = 8
+CODE_RATE = Fraction(2, 3)
+NS = 2.5
+NB = 0.1
+
+
+@pytest.fixture(scope="module")
+def received_codewords():
+    """Slot mapped sequence after CSM removal and channel deinterleaving, with a fixed noisy channel, so that all
+    max star modes decode the same received sequence. """
+    m = int(np.log2(M))
+    rng = np.random.default_rng(11)
+    slot_mapped_sequence, _, information_blocks = encoder(
+        rng.integers(0, 2, 9000), M, CODE_RATE, use_randomizer=True, use_inner_encoder=True)
+
+    csm = get_csm(M)
+    num_symbols_per_codeword = int(15120 / m)
+    ppm_symbols = np.nonzero(slot_mapped_sequence)[1]
+    ppm_symbols = ppm_symbols.reshape(-1, num_symbols_per_codeword + len(csm))[:, len(csm):].flatten()
+    ppm_symbols = channel_deinterleave(ppm_symbols, int(15120 / m / 2), 2)
+    received_slot_mapped_sequence = slot_map(ppm_symbols, M, insert_guardslots=True)
+
+    sent_symbols = np.argmax(received_slot_mapped_sequence[:, :M], axis=1)
+    channel = rng.poisson(NB, size=(sent_symbols.shape[0], M))
+    channel[np.arange(sent_symbols.shape[0]), sent_symbols] = rng.poisson(NS + NB, size=sent_symbols.shape[0])
+
+    # Information bits before randomization, without the termination bits
+    sent_bit_sequence = randomize(information_blocks[:, :-2]).flatten()
+
+    return received_slot_mapped_sequence, channel, sent_bit_sequence
+
+
+# Upper bound of the bit error ratio after the last iteration. With the current scale of the channel log likelihoods
+# (see `pi_ck`), the modes with a correction term do not converge as far as max-log and the 12x12 lookup.
+max_bit_error_ratios: dict[str, float] = {
+    'lookup': 1E-3,
+    'exact': 0.1,
+    'table': 0.1,
+    'max-log': 1E-3,
+    'linear': 0.25
+}
+
+
+@pytest.mark.parametrize("max_star_mode", list(max_star_modes))
+def test_decode_max_star_mode(max_star_mode, received_codewords, benchmark, monkeypatch):
+    received_slot_mapped_sequence, channel, sent_bit_sequence = received_codewords
+    monkeypatch.setattr(decoder_functions, 'poisson_noise', lambda *args, **kwargs: channel.copy())
+
+    _, _, bit_error_ratios, num_iterations = benchmark.pedantic(
+        decoder_functions.predict_iteratively,
+        args=(received_slot_mapped_sequence, M, CODE_RATE, 4, NS, NB),
+        kwargs={'sent_bit_sequence_no_csm': sent_bit_sequence, 'max_star_mode': max_star_mode, 'batched': True,
+                'return_num_iterations': True},
+        rounds=1
+    )
+
+    # Only the first codeword has sent bits, the others are the tail of the channel interleaver
+    first_bit_error_ratio = bit_error_ratios[0, 0]
+    final_bit_error_ratio = bit_error_ratios[num_iterations[0] - 1, 0]
+
+    # The bit error ratio is reported with the timing, it depends on the mode how well the decoder converges
+    benchmark.extra_info['first_bit_error_ratio'] = float(first_bit_error_ratio)
+    benchmark.extra_info['bit_error_ratio'] = float(final_bit_error_ratio)
+
+    assert final_bit_error_ratio < max_bit_error_ratios[max_star_mode]
+    assert final_bit_error_ratio <= first_bit_error_ratio
+
+
+def test_unknown_max_star_mode():
+    with pytest.raises(ValueError):
+        decoder_functions.predict_outer_SISO_arr(None, np.zeros(3), max_star_mode='min-sum')
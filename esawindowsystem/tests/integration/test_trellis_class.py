@@ -1,5 +1,7 @@
+import pytest
+
 from esawindowsystem.core.trellis import Trellis
-from esawindowsystem.core.utils import generate_outer_code_edges
+from esawindowsystem.core.utils import generate_inner_encoder_edges, generate_outer_code_edges
 
 
 def test_initialize_trellis():
@@ -50,3 +52,39 @@ def test_set_edges_trellis_zero_terminated():
     # The first and third state in the second to last stage should have only one possible transition to be zero terminated
     assert len(tr.stages[-2].states[0].edges) == 1
     assert len(tr.stages[-2].states[2].edges) == 1
+
+
+@pytest.mark.parametrize('zero_initiated', [True, False])
+@pytest.mark.parametrize('zero_terminated', [True, False])
+def test_lazy_trellis_matches_trellis(zero_initiated, zero_terminated):
+    memory_size = 2
+    num_output_bits = 3
+    edge_template = generate_outer_code_edges(memory_size, False)
+    time_steps = 7
+
+    tr = Trellis(memory_size, num_output_bits, time_steps, edge_template, 1)
+    tr.set_edges(edge_template, zero_initiated, zero_terminated)
+    lazy_tr = Trellis(memory_size, num_output_bits, time_steps, edge_template, 1, lazy=True)
+    lazy_tr.set_edges(edge_template, zero_initiated, zero_terminated)
+
+    assert len(lazy_tr.stages) == len(tr.stages)
+    for stage, lazy_stage in zip(tr.stages, lazy_tr.stages):
+        assert lazy_stage.time_step == stage.time_step
+        for state, lazy_state in zip(stage.states, lazy_stage.states):
+            assert [(e.from_state, e.to_state, e.edge_input) for e in lazy_state.edges] == \
+                [(e.from_state, e.to_state, e.edge_input) for e in state.edges]
+
+
+def test_lazy_trellis_shares_edges():
+    m = 3
+    edge_template = generate_inner_encoder_edges(m, False)
+    time_steps = 5040
+    tr = Trellis(1, m, time_steps, edge_template, m, lazy=True)
+    tr.set_edges(edge_template, zero_terminated=False)
+
+    # The stages are created on access, and the edges are not copied
+    assert tr.stages[10].states[1].edges[3] is edge_template[1][3]
+    assert tr.stages[-2].states[0].edges is tr.stages[100].states[0].edges
+    assert tr.stages[10] is tr.stages[10]
+    assert len(tr.stages[-1].states[0].edges) == 0
+    assert [stage.time_step for stage in tr.stages[2:5]] == [2, 3, 4]
@@ -0,0 +1,265 @@
+import numpy as np
+import pytest
+
+import esawindowsystem.core.BCJR_decoder_functions as decoder_functions
+from esawindowsystem.core.BCJR_array_decoder import (calculate_alphas_arr, calculate_betas_arr,
+                                                     calculate_edge_lambdas_arr, calculate_gammas_arr,
+                                                     calculate_LLRs_arr, calculate_outer_gammas_arr,
+                                                     calculate_outer_SISO_LLRs_arr, predict_inner_SISO_arr,
+                                                     predict_outer_SISO_arr)
+from esawindowsystem.core.BCJR_decoder_utils import max_star_arr, max_star_lru, max_star_modes
+from esawindowsystem.core.get_num_events_per_slot import max_star_mode_numba, outer_forward_backward
+from esawindowsystem.core.trellis import Trellis, TrellisTables
+from esawindowsystem.core.utils import generate_inner_encoder_edges, generate_outer_code_edges
+
+
+@pytest.fixture
+def outer_trellis():
+    time_steps = 40
+    edges = generate_outer_code_edges(2, bpsk_encoding=False)
+    trellis = Trellis(2, 3, time_steps, edges, 1)
+    trellis.set_edges(edges)
+
+    return trellis, TrellisTables(edges, time_steps, 2)
+
+
+def test_max_star_arr_compare_to_max_star_lru():
+    a = np.array([1, -1, 7, 2, -6, 0, 3.4, 4.6])
+    b = np.array([1, 1, -1, 6, -10, 0, -0.5, 2.5])
+
+    expected = [max_star_lru(x, y) for x, y in zip(a, b)]
+    np.testing.assert_array_equal(max_star_arr(a, b), expected)
+
+
+def test_max_star_arr_minus_inf_is_identity():
+    a = np.array([-3., 0., 2., -np.inf])
+    result = max_star_arr(a, np.full(4, -np.inf))
+    np.testing.assert_array_equal(result, a)
+
+
+def test_valid_edges_zero_initiated_and_terminated(outer_trellis):
+    trellis, tables = outer_trellis
+
+    # The zero initiated stages should have the same edges as the trellis
+    for i in range(tables.memory_size):
+        for j, state in enumerate(trellis.stages[i].states):
+            assert np.count_nonzero(tables.valid_edges[i, j]) == len(state.edges)
+
+    # In the zero terminated stages, only edges with a zero input exist
+    assert not np.any(tables.valid_edges[-tables.memory_size:, tables.edge_input_labels == 1])
+    assert np.all(tables.valid_edges[tables.memory_size:-tables.memory_size])
+
+
+def test_predict_outer_SISO_arr_compare_to_trellis(outer_trellis):
+    trellis, tables = outer_trellis
+    rng = np.random.default_rng(42)
+    symbol_bit_LLRs = rng.normal(0, 3, 3 * tables.time_steps)
+
+    decoder_functions.set_outer_code_gammas(trellis, symbol_bit_LLRs)
+    decoder_functions.calculate_alphas(trellis)
+    decoder_functions.calculate_betas(trellis)
+    expected_p_xk_O, expected_p_uk_O = decoder_functions.calculate_outer_SISO_LLRs(trellis, symbol_bit_LLRs)
+
+    p_xk_O, p_uk_O = predict_outer_SISO_arr(tables, symbol_bit_LLRs)
+
+    np.testing.assert_allclose(p_xk_O, expected_p_xk_O, rtol=1E-9, atol=1E-9)
+    np.testing.assert_allclose(p_uk_O, expected_p_uk_O, rtol=1E-9, atol=1E-9)
+
+
+def test_calculate_LLRs_arr_compare_to_trellis(outer_trellis):
+    trellis, tables = outer_trellis
+    rng = np.random.default_rng(7)
+    received_sequence = rng.normal(0, 1, 3 * tables.time_steps)
+
+    decoder_functions.calculate_gammas(trellis, received_sequence, 3, 1, 1)
+    decoder_functions.calculate_alphas(trellis)
+    decoder_functions.calculate_betas(trellis)
+    expected_LLRs = decoder_functions.calculate_LLRs(trellis)
+
+    gammas = calculate_gammas_arr(tables, received_sequence, 1, 1)
+    alphas = calculate_alphas_arr(tables, gammas)
+    betas = calculate_betas_arr(tables, gammas)
+    LLRs = calculate_LLRs_arr(tables, calculate_edge_lambdas_arr(tables, alphas, gammas, betas))
+
+    np.testing.assert_allclose(LLRs, expected_LLRs, rtol=1E-9, atol=1E-9)
+
+
+@pytest.mark.parametrize("zero_terminated", [True, False])
+def test_predict_trellis_compare_to_tables(zero_terminated):
+    time_steps = 40
+    edges = generate_outer_code_edges(2, bpsk_encoding=False)
+    trellis = Trellis(2, 3, time_steps, edges, 1)
+    trellis.set_edges(edges, zero_terminated=zero_terminated)
+    tables = TrellisTables(edges, time_steps, 2, zero_terminated=zero_terminated)
+    received_sequence = np.random.default_rng(9).normal(0, 1, 3 * time_steps)
+
+    np.testing.assert_array_equal(
+        decoder_functions.predict(trellis, received_sequence, Es=1, N0=1),
+        decoder_functions.predict(tables, received_sequence, Es=1, N0=1)
+    )
+
+
+def test_outer_forward_backward_compare_to_arr(outer_trellis):
+    _, tables = outer_trellis
+    rng = np.random.default_rng(5)
+    symbol_bit_LLRs = rng.normal(0, 3, (tables.time_steps, 3))
+    gammas = calculate_outer_gammas_arr(tables, symbol_bit_LLRs.flatten())
+
+    expected_alphas = calculate_alphas_arr(tables, gammas)
+    expected_betas = calculate_betas_arr(tables, gammas)
+    expected_p_xk_O, expected_p_uk_O = calculate_outer_SISO_LLRs_arr(
+        tables, calculate_edge_lambdas_arr(tables, expected_alphas, gammas, expected_betas), symbol_bit_LLRs)
+
+    boundary_metrics = np.array([0, -np.inf, -np.inf, -np.inf])
+    alphas, betas, p_xk_O, p_uk_O = outer_forward_backward(
+        gammas, tables.next_states, tables.edge_input_labels, tables.edge_outputs, symbol_bit_LLRs,
+        boundary_metrics, boundary_metrics)
+
+    np.testing.assert_array_equal(alphas, expected_alphas)
+    np.testing.assert_array_equal(betas, expected_betas)
+    np.testing.assert_array_equal(p_xk_O, expected_p_xk_O)
+    np.testing.assert_array_equal(p_uk_O, expected_p_uk_O)
+
+
+def test_predict_outer_SISO_arr_full_codeword(benchmark):
+    time_steps = 10080
+    tables = TrellisTables(generate_outer_code_edges(2, bpsk_encoding=False), time_steps, 2)
+    rng = np.random.default_rng(1)
+    symbol_bit_LLRs = rng.normal(0, 3, 3 * time_steps)
+
+    p_xk_O, p_uk_O = benchmark(predict_outer_SISO_arr, tables, symbol_bit_LLRs)
+
+    assert p_xk_O.shape == (time_steps, 3)
+    assert np.all(np.isfinite(p_xk_O))
+    assert np.all(np.isfinite(p_uk_O))
+
+
+def test_predict_outer_SISO_arr_batch_compare_to_single_codeword(outer_trellis):
+    _, tables = outer_trellis
+    rng = np.random.default_rng(3)
+    symbol_bit_LLRs = rng.normal(0, 3, (4, 3 * tables.time_steps))
+
+    p_xk_O, p_uk_O = predict_outer_SISO_arr(tables, symbol_bit_LLRs)
+
+    assert p_xk_O.shape == (4, tables.time_steps, 3)
+    for i in range(symbol_bit_LLRs.shape[0]):
+        expected_p_xk_O, expected_p_uk_O = predict_outer_SISO_arr(tables, symbol_bit_LLRs[i])
+        np.testing.assert_array_equal(p_xk_O[i], expected_p_xk_O)
+        np.testing.assert_array_equal(p_uk_O[i], expected_p_uk_O)
+
+
+@pytest.mark.parametrize("m", [2, 3, 4])
+def test_predict_inner_SISO_arr_compare_to_trellis(m):
+    time_steps = 60
+    edges = generate_inner_encoder_edges(m, bpsk_encoding=False)
+    trellis = Trellis(1, m, time_steps, edges, m)
+    trellis.set_edges(edges, zero_terminated=False)
+    tables = TrellisTables(edges, time_steps, 1, zero_terminated=False)
+
+    rng = np.random.default_rng(m)
+    channel_log_likelihoods = 1.3 * rng.poisson(0.5, (time_steps, 2**m))
+    symbol_bit_LLRs = rng.normal(0, 2, (time_steps, m))
+
+    expected_LLRs = decoder_functions.predict_inner_SISO(
+        trellis, decoder_functions.get_edge_input_array(trellis), channel_log_likelihoods, time_steps, m,
+        symbol_bit_LLRs=symbol_bit_LLRs)
+    LLRs = predict_inner_SISO_arr(tables, channel_log_likelihoods, symbol_bit_LLRs)
+
+    np.testing.assert_allclose(LLRs, expected_LLRs, rtol=1E-9, atol=1E-9)
+
+    # A batch of codewords gives the same result as decoding them one by one
+    batch_LLRs = predict_inner_SISO_arr(tables, np.stack([channel_log_likelihoods, 2 * channel_log_likelihoods]),
+                                        np.stack([symbol_bit_LLRs, -symbol_bit_LLRs]))
+    np.testing.assert_array_equal(batch_LLRs[0], LLRs)
+
+
+@pytest.mark.parametrize("max_star_mode", list(max_star_modes))
+def test_max_star_modes(max_star_mode):
+    a = np.array([1, -1, 7, 2, -6, 0, 3.4, 4.6, -np.inf, -np.inf])
+    b = np.array([1, 1, -1, 6, -10, 0, -0.5, 2.5, 3, -np.inf])
+    max_star = max_star_modes[max_star_mode]
+
+    # All approximations are between max(a, b) and max(a, b) + log(2)
+    result = max_star(a, b)
+    assert np.all(result[:-1] >= np.maximum(a, b)[:-1])
+    assert np.all(result[:-1] <= np.maximum(a, b)[:-1] + np.log(2) + 1E-12)
+
+    # -inf marks an edge that does not exist
+    assert result[-2] == 3
+    assert result[-1] == -np.inf
+
+    # The compiled version gives the same results
+    expected = [max_star_mode_numba(x, y, list(max_star_modes).index(max_star_mode)) for x, y in zip(a, b)]
+    np.testing.assert_allclose(result, expected, rtol=1E-12)
+
+
+def test_max_star_modes_error_order():
+    # Distances |a-b| up to beyond the end of the correction table
+    a = np.linspace(-2.3, 7.7, 1001)
+    b = np.full(a.shape, -2.3)
+    expected = np.logaddexp(a, b)
+
+    max_errors = {
+        max_star_mode: np.max(np.abs(max_star(a, b) - expected)) for max_star_mode, max_star in max_star_modes.items()
+    }
+
+    # The finer the approximation of the correction term, the closer it is to the exact max star
+    assert max_errors['exact'] < 1E-12
+    assert max_errors['exact'] < max_errors['table'] < max_errors['linear'] < max_errors['max-log']
+    assert max_errors['lookup'] < max_errors['max-log']
+    assert max_errors['max-log'] == pytest.approx(np.log(2))
+
+
+def test_max_star_exact_arr():
+    a = np.array([1, -1, 7, 2, -6, 0])
+    b = np.array([1, 1, -1, 6, -10, 0])
+    np.testing.assert_allclose(max_star_modes['exact'](a, b), np.log(np.exp(a) + np.exp(b)))
+
+
+@pytest.mark.parametrize("max_star_mode", list(max_star_modes))
+def test_predict_outer_SISO_arr_max_star_mode_compare_to_numpy(outer_trellis, max_star_mode):
+    _, tables = outer_trellis
+    rng = np.random.default_rng(9)
+    symbol_bit_LLRs = rng.normal(0, 3, 3 * tables.time_steps)
+    max_star = max_star_modes[max_star_mode]
+
+    gammas = calculate_outer_gammas_arr(tables, symbol_bit_LLRs)
+    alphas = calculate_alphas_arr(tables, gammas, max_star)
+    betas = calculate_betas_arr(tables, gammas, max_star)
+    lambdas = calculate_edge_lambdas_arr(tables, alphas, gammas, betas)
+    expected_p_xk_O, expected_p_uk_O = calculate_outer_SISO_LLRs_arr(tables, lambdas, symbol_bit_LLRs, max_star)
+
+    p_xk_O, p_uk_O = predict_outer_SISO_arr(tables, symbol_bit_LLRs, max_star_mode=max_star_mode)
+
+    np.testing.assert_allclose(p_xk_O, expected_p_xk_O, rtol=1E-9, atol=1E-9)
+    np.testing.assert_allclose(p_uk_O, expected_p_uk_O, rtol=1E-9, atol=1E-9)
+
+
+@pytest.mark.parametrize("window_size", [16, 50, 200])
+def test_predict_outer_SISO_arr_sliding_window(window_size):
+    time_steps = 200
+    tables = TrellisTables(generate_outer_code_edges(2, bpsk_encoding=False), time_steps, 2)
+    rng = np.random.default_rng(2)
+    symbol_bit_LLRs = rng.normal(0, 3, 3 * time_steps)
+
+    expected_p_xk_O, expected_p_uk_O = predict_outer_SISO_arr(tables, symbol_bit_LLRs)
+    p_xk_O, p_uk_O = predict_outer_SISO_arr(tables, symbol_bit_LLRs, window_size=window_size)
+
+    # Windows shorter than the codeword start the backward recursion from trained betas, which is nearly exact
+    np.testing.assert_allclose(p_xk_O, expected_p_xk_O, rtol=1E-6, atol=1E-6)
+    np.testing.assert_allclose(p_uk_O, expected_p_uk_O, rtol=1E-6, atol=1E-6)
+
+
+@pytest.mark.parametrize("window_size", [16, 50, 200])
+def test_predict_inner_SISO_arr_sliding_window(window_size):
+    time_steps = 200
+    m = 3
+    tables = TrellisTables(generate_inner_encoder_edges(m, bpsk_encoding=False), time_steps, 1, zero_terminated=False)
+    rng = np.random.default_rng(4)
+    channel_log_likelihoods = 1.3 * rng.poisson(0.5, (2, time_steps, 2**m))
+    symbol_bit_LLRs = rng.normal(0, 2, (2, time_steps, m))
+
+    expected_LLRs = predict_inner_SISO_arr(tables, channel_log_likelihoods, symbol_bit_LLRs)
+    LLRs = predict_inner_SISO_arr(tables, channel_log_likelihoods, symbol_bit_LLRs, window_size=window_size)
+
+    np.testing.assert_allclose(LLRs, expected_LLRs, rtol=1E-6, atol=1E-6)
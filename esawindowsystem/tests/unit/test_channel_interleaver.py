@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from esawindowsystem.core.channel_interleaver import ChannelDeinterleaverStream, ChannelInterleaverStream
+from esawindowsystem.core.encoder_functions import channel_deinterleave, channel_interleave
+
+
+def split_in_chunks(arr, rng):
+    boundaries = np.sort(rng.integers(0, arr.shape[0], 5))
+    return np.split(arr, boundaries)
+
+
+@pytest.mark.parametrize("B, N", [(3, 2), (2, 3), (5, 1)])
+@pytest.mark.parametrize("shape", [(61,), (61, 4)])
+def test_channel_interleaver_stream(B, N, shape):
+    rng = np.random.default_rng(7)
+    symbols = rng.integers(0, 8, shape)
+
+    interleaver = ChannelInterleaverStream(B, N)
+    interleaved_symbols = np.concatenate(
+        [interleaver.interleave(chunk) for chunk in split_in_chunks(symbols, rng)] + [interleaver.flush()])
+
+    np.testing.assert_array_equal(interleaved_symbols, channel_interleave(symbols, B, N))
+
+
+@pytest.mark.parametrize("B, N", [(3, 2), (2, 3), (5, 1)])
+@pytest.mark.parametrize("shape", [(61,), (61, 4)])
+def test_channel_deinterleaver_stream(B, N, shape):
+    rng = np.random.default_rng(8)
+    received_symbols = rng.integers(0, 8, shape)
+
+    deinterleaver = ChannelDeinterleaverStream(B, N)
+    deinterleaved_symbols = np.concatenate(
+        [deinterleaver.deinterleave(chunk) for chunk in split_in_chunks(received_symbols, rng)]
+        + [deinterleaver.flush()])
+
+    np.testing.assert_array_equal(deinterleaved_symbols, channel_deinterleave(received_symbols, B, N))
+
+
+def test_channel_deinterleaver_stream_state_size():
+    B, N = 4, 3
+    deinterleaver = ChannelDeinterleaverStream(B, N)
+    for chunk in np.split(np.arange(1000), 10):
+        deinterleaver.deinterleave(chunk)
+        assert deinterleaver.buffer.shape[0] <= B * N * (N - 1)
+
+
+def test_channel_interleave_round_trip_2D():
+    B, N = 3, 2
+    event_counts = np.random.default_rng(9).poisson(1, (40, 8))
+    deinterleaved_counts = channel_deinterleave(channel_interleave(event_counts, B, N), B, N)
+    np.testing.assert_array_equal(deinterleaved_counts[:40], event_counts)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from esawindowsystem.core.csm_synchroniser import CSMSynchroniser
+from esawindowsystem.core.encoder_functions import get_csm
+
+M = 16
+SLOT_LENGTH = 0.2E-9
+NUM_CODEWORDS = 6
+
+
+@pytest.fixture
+def time_stamps_and_csm_times() -> tuple[np.ndarray, np.ndarray, float]:
+    rng = np.random.default_rng(1)
+    CSM = get_csm(M)
+    symbols_per_codeword = int(15120 / np.log2(M))
+    num_slots_per_symbol = int(5 / 4 * M)
+    start_time = 3.3E-6
+    # A slightly fast clock on the transmitter side
+    drift = 1 + 2E-6
+
+    symbols = np.concatenate([np.concatenate((CSM, rng.integers(0, M, symbols_per_codeword)))
+                              for _ in range(NUM_CODEWORDS)])
+    time_stamps = (np.arange(symbols.shape[0]) * num_slots_per_symbol + symbols + 0.5) * SLOT_LENGTH
+    time_stamps += rng.normal(0, 0.05 * SLOT_LENGTH, symbols.shape[0])
+    time_stamps = time_stamps * drift + start_time
+
+    # Lose 30% of the pulses and add some dark counts
+    time_stamps = time_stamps[rng.random(time_stamps.shape[0]) > 0.3]
+    time_stamps = np.sort(np.concatenate((time_stamps, rng.uniform(time_stamps[0], time_stamps[-1], 300))))
+
+    frame_duration = (len(CSM) + symbols_per_codeword) * num_slots_per_symbol * SLOT_LENGTH * drift
+    csm_times = start_time + np.arange(NUM_CODEWORDS) * frame_duration
+
+    return time_stamps, csm_times, frame_duration
+
+
+def find_csm_times_in_chunks(time_stamps, num_chunks):
+    synchroniser = CSMSynchroniser(M, SLOT_LENGTH)
+    csm_times = [synchroniser.process(chunk) for chunk in np.array_split(time_stamps, num_chunks)]
+    csm_times.append(synchroniser.flush())
+
+    return np.concatenate(csm_times), synchroniser
+
+
+@pytest.mark.parametrize("num_chunks", [1, 7, 50])
+def test_csm_synchroniser(time_stamps_and_csm_times, num_chunks):
+    time_stamps, expected_csm_times, _ = time_stamps_and_csm_times
+    csm_times, synchroniser = find_csm_times_in_chunks(time_stamps, num_chunks)
+
+    assert csm_times.shape == expected_csm_times.shape
+    np.testing.assert_allclose(csm_times, expected_csm_times, atol=0.1 * SLOT_LENGTH)
+    assert synchroniser.num_reacquisitions == 0
+
+
+def test_csm_synchroniser_only_keeps_needed_time_stamps(time_stamps_and_csm_times):
+    time_stamps, _, frame_duration = time_stamps_and_csm_times
+    synchroniser = CSMSynchroniser(M, SLOT_LENGTH)
+
+    for chunk in np.array_split(time_stamps, 50):
+        synchroniser.process(chunk)
+        if synchroniser.buffer.shape[0] > 0:
+            assert synchroniser.buffer[-1] - synchroniser.buffer[0] < 2.1 * frame_duration
+
+
+def test_csm_synchroniser_reacquires(time_stamps_and_csm_times):
+    time_stamps, expected_csm_times, frame_duration = time_stamps_and_csm_times
+    # Nothing is received during the second and third codeword
+    lost = (time_stamps > expected_csm_times[1]) & (time_stamps < expected_csm_times[3])
+
+    csm_times, synchroniser = find_csm_times_in_chunks(time_stamps[~lost], 10)
+
+    np.testing.assert_allclose(csm_times, expected_csm_times[[0, 3, 4, 5]], atol=0.1 * SLOT_LENGTH)
+    assert synchroniser.num_reacquisitions == 1
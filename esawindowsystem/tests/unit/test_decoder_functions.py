@@ -1,9 +1,12 @@
 import pickle
+from fractions import Fraction
 
 import numpy as np
 import pytest
 
 import esawindowsystem.core.BCJR_decoder_functions as decoder_functions
+from esawindowsystem.core.encoder_functions import get_csm, randomize, slot_map
+from esawindowsystem.core.scppm_encoder import encoder
 
 
 def test_pi_ck_small_array(benchmark):
@@ -61,3 +64,35 @@ def test_outer_code_gammas_arr_based(trellis_fixture, benchmark):
         decoder_functions.get_outer_code_gammas_arr,
         edge_outputs, symbol_log_likelihoods)
     assert True
+
+
+def test_predict_iteratively_batched_compare_to_serial(monkeypatch):
+    M = 4
+    code_rate = Fraction(2, 3)
+    rng = np.random.default_rng(8)
+    slot_mapped_sequence, _, information_blocks = encoder(
+        rng.integers(0, 2, 25000), M, code_rate, use_randomizer=True, use_inner_encoder=True)
+
+    # Remove the CSMs, the decoder gets the PPM symbols of the codewords
+    csm = get_csm(M)
+    ppm_symbols = np.nonzero(slot_mapped_sequence)[1]
+    ppm_symbols = ppm_symbols.reshape(-1, int(15120 / np.log2(M)) + len(csm))[:, len(csm):].flatten()
+    received_slot_mapped_sequence = slot_map(ppm_symbols, M)
+
+    channel = rng.poisson(0.1, size=(ppm_symbols.shape[0], M))
+    channel[np.arange(ppm_symbols.shape[0]), ppm_symbols] = rng.poisson(2.6, size=ppm_symbols.shape[0])
+    monkeypatch.setattr(decoder_functions, 'poisson_noise', lambda *args, **kwargs: channel.copy())
+
+    sent_bit_sequence = randomize(information_blocks[:, :-2]).flatten()
+
+    serial_result = decoder_functions.predict_iteratively(
+        received_slot_mapped_sequence, M, code_rate, 2, 2.5, 0.1, sent_bit_sequence_no_csm=sent_bit_sequence,
+        return_num_iterations=True)
+    batched_result = decoder_functions.predict_iteratively(
+        received_slot_mapped_sequence, M, code_rate, 2, 2.5, 0.1, sent_bit_sequence_no_csm=sent_bit_sequence,
+        return_num_iterations=True, batched=True)
+
+    # Bit error ratios of 2 iterations, for the 3 codewords and the tail of the channel interleaver
+    assert serial_result[2].shape == (2, 4)
+    for serial, batched in zip(serial_result, batched_result):
+        np.testing.assert_array_equal(batched, serial)
@@ -3,7 +3,11 @@ from fractions import Fraction
 import numpy as np
 import pytest
 
-from esawindowsystem.core.encoder_functions import map_PPM_symbols, slot_map, channel_interleave, puncture, slicer, zero_terminate
+from esawindowsystem.core.encoder_functions import (map_PPM_symbols, slot_map, channel_interleave, puncture, slicer,
+                                                    zero_terminate, convolve, convolve_arr, unpuncture, append_CRC,
+                                                    get_CRC, get_CRC_arr, randomize, PSEUDO_RANDOMIZED_BYTES,
+                                                    get_randomizer_mask, accumulate)
+from esawindowsystem.core.shift_register import CRC
 
 
 def test_map_PPM_symbols_3_bits_0():
@@ -60,6 +64,22 @@ def test_slot_map_with_guard_slots():
     assert np.all(output_arr[:, -num_guard_slots:] == 0)
 
 
+def test_slot_map_sparse():
+    input_symbols = [0, 3, 2]
+    M = 4
+
+    pulse_slots = slot_map(input_symbols, M, sparse=True)
+    np.testing.assert_array_equal(pulse_slots, [0, 8, 12])
+    np.testing.assert_array_equal(pulse_slots, np.flatnonzero(slot_map(input_symbols, M)))
+    np.testing.assert_array_equal(slot_map(input_symbols, M, insert_guardslots=False, sparse=True), [0, 7, 10])
+
+
+def test_map_PPM_symbols_many_symbols():
+    bits = np.random.default_rng(2).integers(0, 2, 8 * 100)
+    expected_symbols = [int(''.join(str(b) for b in row), 2) for row in bits.reshape(-1, 8)]
+    np.testing.assert_array_equal(map_PPM_symbols(bits, 8), expected_symbols)
+
+
 def test_slot_map_PPM_symbol_too_large():
     # This test is a bit artificial, as a PPM symbol that is too high indicate other errors elsewhere,
     # but I want this error to handle it gracefully.
@@ -145,8 +165,114 @@ def test_puncture_two_third_coderate():
     assert np.all(output_arr == 1)
 
 
+def test_unpuncture_sets_last_position():
+    code_rate = Fraction(1, 3)
+    output_arr = unpuncture(np.arange(1, 7), code_rate)
+    np.testing.assert_array_equal(output_arr, np.arange(1, 7))
+
+
+@pytest.mark.parametrize("code_rate", [Fraction(1, 3), Fraction(1, 2), Fraction(2, 3)])
+def test_puncture_unpuncture_batch_of_LLRs(code_rate):
+    LLRs = np.random.default_rng(4).normal(size=(3, 24))
+
+    punctured_LLRs = puncture(LLRs, code_rate, dtype=float)
+    assert punctured_LLRs.shape == (3, int(24 / (3 * code_rate)))
+    assert punctured_LLRs.dtype == float
+
+    unpunctured_LLRs = unpuncture(punctured_LLRs, code_rate, dtype=float)
+    assert unpunctured_LLRs.shape == LLRs.shape
+
+    # Kept positions are restored, punctured positions are zero
+    kept = unpunctured_LLRs != 0
+    np.testing.assert_array_equal(unpunctured_LLRs[kept], LLRs[kept])
+    assert np.count_nonzero(kept) == punctured_LLRs.size
+
+    # Each row is the same as puncturing the row on its own
+    np.testing.assert_array_equal(unpuncture(punctured_LLRs[1], code_rate, dtype=float), unpunctured_LLRs[1])
+
+
 def test_zero_terminate():
     input_arr = np.ones((2, 12))
     output_arr = zero_terminate(input_arr, 2)
     assert np.all(output_arr[0, -2:] == 0)
     assert np.all(output_arr[1, -2:] == 0)
+
+
+@pytest.mark.parametrize("initial_state", [(0, 0), (1, 0), (0, 1), (1, 1)])
+def test_convolve_arr_matches_convolve(initial_state):
+    information_blocks = np.random.default_rng(3).integers(0, 2, (4, 50))
+    convolutional_codewords, terminal_states = convolve_arr(information_blocks, initial_state)
+
+    assert convolutional_codewords.shape == (4, 150)
+    for row, codeword, terminal_state in zip(information_blocks, convolutional_codewords, terminal_states):
+        expected_codeword, expected_terminal_state = convolve(row, initial_state)
+        np.testing.assert_array_equal(codeword, expected_codeword)
+        assert tuple(terminal_state) == expected_terminal_state
+
+
+def test_convolve_arr_one_block():
+    convolutional_codeword, terminal_state = convolve_arr(np.array([1, 0, 1, 1]))
+    np.testing.assert_array_equal(convolutional_codeword, convolve(np.array([1, 0, 1, 1]))[0])
+    np.testing.assert_array_equal(terminal_state, [1, 1])
+
+
+def shift_register_CRC(arr):
+    sr = CRC([1] * 32, [0, 3, 14, 18, 29])
+    for j in range(arr.shape[0] - 32):
+        sr.next(arr[j] ^ sr.state[-1])
+    return sr.state
+
+
+@pytest.mark.parametrize("num_bits", [32, 33, 47, 64, 301])
+def test_get_CRC_matches_shift_register(num_bits):
+    arr = np.random.default_rng(num_bits).integers(0, 2, num_bits)
+    np.testing.assert_array_equal(get_CRC(arr), shift_register_CRC(arr))
+
+
+@pytest.mark.parametrize("num_bits", [40, 301])
+def test_get_CRC_arr(num_bits):
+    arr = np.random.default_rng(num_bits).integers(0, 2, (5, num_bits))
+    np.testing.assert_array_equal(get_CRC_arr(arr), [get_CRC(row) for row in arr])
+
+
+def test_append_CRC():
+    arr = np.random.default_rng(8).integers(0, 2, (3, 100))
+    output_arr = append_CRC(arr)
+
+    assert output_arr.shape == (3, 132)
+    np.testing.assert_array_equal(output_arr[:, :100], arr)
+    np.testing.assert_array_equal(output_arr[:, 100:], [shift_register_CRC(np.hstack((row, np.zeros(32, dtype=int))))
+                                                        for row in arr])
+
+
+def test_pseudo_randomized_sequence():
+    # First bytes of the CCSDS pseudo-randomizer sequence
+    np.testing.assert_array_equal(PSEUDO_RANDOMIZED_BYTES[:4], [0xFF, 0x48, 0x0E, 0xC0])
+    assert not get_randomizer_mask(300).flags.writeable
+
+
+def test_randomize_batch():
+    information_blocks = np.random.default_rng(9).integers(0, 2, (3, 600))
+    randomized_blocks = randomize(information_blocks)
+
+    for row, randomized_row in zip(information_blocks, randomized_blocks):
+        np.testing.assert_array_equal(randomized_row, randomize(row))
+    np.testing.assert_array_equal(randomized_blocks[0, :256] ^ information_blocks[0, :256],
+                                  randomized_blocks[0, 256:512] ^ information_blocks[0, 256:512])
+    np.testing.assert_array_equal(randomize(randomized_blocks), information_blocks)
+
+
+def test_accumulate():
+    np.testing.assert_array_equal(accumulate(np.array([1, 0, 0, 1, 1, 0])), [1, 1, 1, 0, 1, 1])
+
+
+def test_accumulate_batch():
+    codewords = np.random.default_rng(10).integers(0, 2, (4, 120))
+    accumulated_codewords = accumulate(codewords)
+
+    assert accumulated_codewords.dtype == codewords.dtype
+    for codeword, accumulated_codeword in zip(codewords, accumulated_codewords):
+        expected = [codeword[0]]
+        for bit in codeword[1:]:
+            expected.append(expected[-1] ^ bit)
+        np.testing.assert_array_equal(accumulated_codeword, expected)
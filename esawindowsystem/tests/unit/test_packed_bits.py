@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from esawindowsystem.core.data_converter import DataConverter
+from esawindowsystem.core.encoder_functions import get_asm_bit_arr, prepend_asm, randomize
+from esawindowsystem.core.packed_bits import PackedBits
+from esawindowsystem.core.utils import tobits
+
+
+def test_packed_bits_round_trip():
+    bits = np.random.default_rng(1).integers(0, 2, (3, 21))
+    packed_bits = PackedBits.from_bits(bits)
+
+    assert packed_bits.shape == (3, 21)
+    assert packed_bits.data.shape == (3, 3)
+    assert len(packed_bits) == 3
+    np.testing.assert_array_equal(packed_bits.unpack(), bits)
+
+
+def test_packed_bits_from_bytes():
+    packed_bits = PackedBits.from_bytes(b'\x1a\xcf')
+    np.testing.assert_array_equal(packed_bits.unpack(), get_asm_bit_arr()[:16])
+
+
+def test_packed_bits_invalid_num_bits():
+    with pytest.raises(ValueError):
+        PackedBits(np.zeros(2, dtype=np.uint8), 17)
+
+
+def test_packed_bits_xor():
+    rng = np.random.default_rng(2)
+    a = rng.integers(0, 2, (4, 13))
+    b = rng.integers(0, 2, 13)
+
+    np.testing.assert_array_equal((PackedBits.from_bits(a) ^ PackedBits.from_bits(b)).unpack(), a ^ b)
+    np.testing.assert_array_equal((PackedBits.from_bits(a) ^ b).unpack(), a ^ b)
+
+    with pytest.raises(ValueError):
+        PackedBits.from_bits(a) ^ b[:12]
+
+
+@pytest.mark.parametrize("key", [
+    1, (slice(1, 3),), (0, slice(8, 19)), (slice(None), slice(3, 17)), (slice(None), slice(None, None, 2)), (2, 5)
+])
+def test_packed_bits_getitem(key):
+    bits = np.random.default_rng(3).integers(0, 2, (4, 20))
+    result = PackedBits.from_bits(bits)[key]
+
+    if isinstance(result, PackedBits):
+        result = result.unpack()
+    np.testing.assert_array_equal(result, bits[key])
+
+
+def test_packed_bits_reshape():
+    bits = np.random.default_rng(4).integers(0, 2, 96)
+    packed_bits = PackedBits.from_bits(bits)
+
+    np.testing.assert_array_equal(packed_bits.reshape(-1, 16).unpack(), bits.reshape(-1, 16))
+    np.testing.assert_array_equal(packed_bits.reshape((4, 24)).unpack(), bits.reshape(4, 24))
+    np.testing.assert_array_equal(packed_bits.reshape(8, 12).unpack(), bits.reshape(8, 12))
+
+
+@pytest.mark.parametrize("num_bits", [32, 33, 45, 200, 1001])
+def test_packed_bits_correlate(num_bits):
+    bits = np.random.default_rng(num_bits).integers(0, 2, num_bits)
+    ASM_arr = get_asm_bit_arr()
+
+    np.testing.assert_array_equal(PackedBits.from_bits(bits).correlate(ASM_arr), np.correlate(bits, ASM_arr, 'valid'))
+
+
+def test_packed_bits_correlate_finds_asm():
+    bits = np.random.default_rng(5).integers(0, 2, 2000)
+    bits[1234:1266] = get_asm_bit_arr()
+
+    assert PackedBits.from_bits(bits).correlate(get_asm_bit_arr())[1234] == np.sum(get_asm_bit_arr())
+
+
+def test_randomize_packed_bits():
+    bits = np.random.default_rng(6).integers(0, 2, (3, 10078))
+
+    np.testing.assert_array_equal(randomize(PackedBits.from_bits(bits)).unpack(), randomize(bits))
+
+
+def test_prepend_asm_packed_bits():
+    bits = np.random.default_rng(7).integers(0, 2, 44)
+
+    np.testing.assert_array_equal(prepend_asm(PackedBits.from_bits(bits)).unpack(), prepend_asm(bits))
+
+
+def test_data_converter_packed_string():
+    message = 'Optical Communications'
+    packed_bits = DataConverter(message, packed=True).bit_array
+
+    assert isinstance(packed_bits, PackedBits)
+    assert packed_bits.tobytes() == message.encode('ascii')
+    np.testing.assert_array_equal(packed_bits.unpack(), tobits(message))
@@ -0,0 +1,81 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import esawindowsystem.core.BCJR_decoder_functions as decoder_functions
+from esawindowsystem.core.encoder_functions import get_csm, randomize, slot_map
+from esawindowsystem.core.parallel_decoder import (_close_worker_shared_memory, _initialize_worker, _worker_state,
+                                                   from_shared_memory, to_shared_memory)
+from esawindowsystem.core.scppm_encoder import encoder
+
+M = 4
+CODE_RATE = Fraction(2, 3)
+NS = 2.5
+NB = 0.1
+
+
+def test_shared_memory_round_trip():
+    arr = np.arange(24, dtype=np.int8).reshape((2, 3, 4))
+    shm, description = to_shared_memory(arr)
+
+    try:
+        worker_shm, shared_arr = from_shared_memory(description)
+        np.testing.assert_array_equal(shared_arr, arr)
+        assert shared_arr.dtype == arr.dtype
+
+        # Workers only read the shared arrays
+        with pytest.raises(ValueError):
+            shared_arr[0, 0, 0] = 1
+
+        del shared_arr
+        worker_shm.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_close_worker_shared_memory():
+    shm, description = to_shared_memory(np.arange(6.))
+
+    try:
+        _initialize_worker(description, None, None, CODE_RATE, 1, 'lookup', None, None)
+        worker_shm = _worker_state['shared_memory']
+
+        _close_worker_shared_memory()
+
+        assert 'shared_memory' not in _worker_state
+        assert 'channel_log_likelihoods' not in _worker_state
+        assert worker_shm.buf is None
+    finally:
+        _worker_state.clear()
+        shm.close()
+        shm.unlink()
+
+
+def test_predict_iteratively_num_workers_compare_to_serial(monkeypatch):
+    rng = np.random.default_rng(5)
+    slot_mapped_sequence, _, information_blocks = encoder(
+        rng.integers(0, 2, 15000), M, CODE_RATE, use_randomizer=True, use_inner_encoder=True)
+
+    # Remove the CSMs, the decoder gets the PPM symbols of the codewords
+    csm = get_csm(M)
+    ppm_symbols = np.nonzero(slot_mapped_sequence)[1]
+    ppm_symbols = ppm_symbols.reshape(-1, int(15120 / np.log2(M)) + len(csm))[:, len(csm):].flatten()
+    received_slot_mapped_sequence = slot_map(ppm_symbols, M)
+
+    channel = rng.poisson(NB, size=(ppm_symbols.shape[0], M))
+    channel[np.arange(ppm_symbols.shape[0]), ppm_symbols] = rng.poisson(NS + NB, size=ppm_symbols.shape[0])
+    monkeypatch.setattr(decoder_functions, 'poisson_noise', lambda *args, **kwargs: channel.copy())
+
+    sent_bit_sequence = randomize(information_blocks[:, :-2]).flatten()
+
+    serial_result = decoder_functions.predict_iteratively(
+        received_slot_mapped_sequence, M, CODE_RATE, 2, NS, NB, sent_bit_sequence_no_csm=sent_bit_sequence,
+        return_num_iterations=True)
+    parallel_result = decoder_functions.predict_iteratively(
+        received_slot_mapped_sequence, M, CODE_RATE, 2, NS, NB, sent_bit_sequence_no_csm=sent_bit_sequence,
+        return_num_iterations=True, num_workers=2)
+
+    for serial, parallel in zip(serial_result, parallel_result):
+        np.testing.assert_array_equal(parallel, serial)
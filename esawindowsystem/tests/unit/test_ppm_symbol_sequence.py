@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from esawindowsystem.core.encoder_functions import get_csm, slot_map
+from esawindowsystem.core.ppm_symbol_sequence import PPMSymbolSequence
+
+
+@pytest.mark.parametrize("insert_guardslots", [True, False])
+def test_slot_mapped_sequence_round_trip(insert_guardslots):
+    M = 8
+    symbols = np.random.default_rng(10).integers(0, M, 100)
+    slot_mapped_sequence = slot_map(symbols, M, insert_guardslots=insert_guardslots)
+
+    ppm_symbol_sequence = PPMSymbolSequence.from_slot_mapped_sequence(slot_mapped_sequence, M)
+    assert ppm_symbol_sequence.insert_guardslots == insert_guardslots
+    assert len(ppm_symbol_sequence) == 100
+    assert ppm_symbol_sequence.symbols.dtype == np.uint8
+    assert ppm_symbol_sequence.num_slots_per_symbol == slot_mapped_sequence.shape[1]
+
+    np.testing.assert_array_equal(ppm_symbol_sequence.to_slot_mapped_sequence(), slot_mapped_sequence)
+    np.testing.assert_array_equal(ppm_symbol_sequence.pulse_slots, np.flatnonzero(slot_mapped_sequence))
+
+
+def test_ppm_symbol_sequence_M256():
+    ppm_symbol_sequence = PPMSymbolSequence([0, 255, 17], 256)
+    np.testing.assert_array_equal(ppm_symbol_sequence.symbols, [0, 255, 17])
+    np.testing.assert_array_equal(ppm_symbol_sequence.pulse_slots, [0, 320 + 255, 640 + 17])
+
+
+def test_get_codeword_symbols():
+    M = 4
+    csm = get_csm(M)
+    codewords = np.random.default_rng(11).integers(0, M, (2, 10))
+    symbols = np.hstack((csm, codewords[0], csm, codewords[1], [1, 2, 3]))
+
+    ppm_symbol_sequence = PPMSymbolSequence(symbols, M, symbols_per_codeword=10)
+    np.testing.assert_array_equal(ppm_symbol_sequence.get_codeword_symbols(), codewords.flatten())
+
+
+def test_invalid_PPM_order():
+    with pytest.raises(ValueError):
+        PPMSymbolSequence([0, 1], 6)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from esawindowsystem.core.encoder_functions import get_CRC
+from esawindowsystem.core.stopping_rules import (CRCStoppingRule, CrossEntropyStoppingRule, HardDecisionStoppingRule,
+                                                 MinimumLLRStoppingRule, check_stopping_rules, get_stopping_rules)
+
+
+def test_crc_stopping_rule():
+    rng = np.random.default_rng(1)
+    hard_decisions = np.zeros((2, 100), dtype=int)
+    hard_decisions[:, :66] = rng.integers(0, 2, (2, 66))
+    # Only the first codeword gets the right parity bits
+    hard_decisions[0, -34:-2] = get_CRC(hard_decisions[0, :-2])
+    hard_decisions[1, -34:-2] = 1 - np.array(get_CRC(hard_decisions[1, :-2]))
+
+    stop = CRCStoppingRule()(np.arange(2), np.zeros((2, 100)), hard_decisions)
+    np.testing.assert_array_equal(stop, [True, False])
+
+
+def test_hard_decision_stopping_rule():
+    rule = HardDecisionStoppingRule(num_iterations=1)
+    rule.reset(3, 4)
+    codewords = np.arange(3)
+    LLRs = np.zeros((3, 4))
+
+    hard_decisions = np.array([[0, 1, 0, 1], [1, 1, 1, 1], [0, 0, 0, 0]])
+    np.testing.assert_array_equal(rule(codewords, LLRs, hard_decisions), [False, False, False])
+
+    hard_decisions[1, 0] = 0
+    np.testing.assert_array_equal(rule(codewords, LLRs, hard_decisions), [True, False, True])
+
+    # Only the codewords that are still decoded are passed
+    np.testing.assert_array_equal(rule(codewords[1:2], LLRs[1:2], hard_decisions[1:2]), [True])
+
+
+def test_minimum_LLR_stopping_rule():
+    rule = MinimumLLRStoppingRule(threshold=5)
+    LLRs = np.array([[6., -7., 8.], [6., -4., 10.]])
+    np.testing.assert_array_equal(rule(np.arange(2), LLRs, np.zeros((2, 3), dtype=int)), [True, False])
+
+
+def test_cross_entropy_stopping_rule():
+    rule = CrossEntropyStoppingRule(ratio=1E-3)
+    rule.reset(2, 3)
+    codewords = np.arange(2)
+    hard_decisions = np.zeros((2, 3), dtype=int)
+
+    # Never stop after the first iteration, the first iteration is the reference
+    LLRs = np.array([[1., -1., 2.], [1., -1., 2.]])
+    np.testing.assert_array_equal(rule(codewords, LLRs, hard_decisions), [False, False])
+
+    # The first codeword converged, the second did not change much yet
+    LLRs = np.array([[20., -20., 20.], [1.5, -1., 2.]])
+    np.testing.assert_array_equal(rule(codewords, LLRs, hard_decisions), [True, False])
+
+
+def test_get_stopping_rules():
+    assert [type(rule) for rule in get_stopping_rules()] == [CRCStoppingRule]
+
+    rule = MinimumLLRStoppingRule(threshold=1)
+    rules = get_stopping_rules(['hard-decision', rule])
+    assert isinstance(rules[0], HardDecisionStoppingRule)
+    assert rules[1] is rule
+
+    with pytest.raises(ValueError):
+        get_stopping_rules(['parity'])
+
+
+def test_check_stopping_rules_any():
+    rules = get_stopping_rules(['hard-decision', MinimumLLRStoppingRule(threshold=5)])
+    for rule in rules:
+        rule.reset(2, 2)
+
+    LLRs = np.array([[10., 10.], [1., 1.]])
+    hard_decisions = np.zeros((2, 2), dtype=int)
+    np.testing.assert_array_equal(check_stopping_rules(rules, np.arange(2), LLRs, hard_decisions), [True, False])
+    np.testing.assert_array_equal(check_stopping_rules(rules, np.arange(2), LLRs, hard_decisions), [True, True])
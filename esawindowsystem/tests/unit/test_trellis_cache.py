@@ -0,0 +1,47 @@
+from fractions import Fraction
+
+import numpy as np
+
+from esawindowsystem.core.trellis import TrellisTables
+from esawindowsystem.core.trellis_cache import (CACHE_DIR_ENV_VARIABLE, build_trellis_tables, get_cache_dir,
+                                                get_cache_file_path, get_trellis_tables)
+
+
+def assert_tables_equal(tables: TrellisTables, expected_tables: TrellisTables):
+    for name in TrellisTables.__slots__:
+        np.testing.assert_array_equal(getattr(tables, name), getattr(expected_tables, name), err_msg=name)
+
+
+def test_cache_dir_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV_VARIABLE, str(tmp_path))
+    assert get_cache_dir() == tmp_path
+    assert get_cache_dir(tmp_path / 'other') == tmp_path / 'other'
+
+
+def test_trellis_tables_cache_round_trip(tmp_path):
+    M = 8
+    code_rate = Fraction(2, 3)
+    expected_inner_tables, expected_outer_tables = build_trellis_tables(M, code_rate, 120)
+
+    file_path = get_cache_file_path(M, code_rate, 120, cache_dir=tmp_path)
+    assert not file_path.is_file()
+
+    get_trellis_tables(M, code_rate, 120, cache_dir=tmp_path)
+    assert file_path.is_file()
+
+    # Second call is served from the cache file
+    inner_tables, outer_tables = get_trellis_tables(M, code_rate, 120, cache_dir=tmp_path)
+    assert_tables_equal(inner_tables, expected_inner_tables)
+    assert_tables_equal(outer_tables, expected_outer_tables)
+    assert isinstance(outer_tables.time_steps, int)
+    assert outer_tables.zero_terminated is True
+    assert inner_tables.zero_terminated is False
+
+
+def test_trellis_tables_cache_rebuilds_corrupt_file(tmp_path):
+    file_path = get_cache_file_path(4, Fraction(1, 2), 60, zero_terminated=False, cache_dir=tmp_path)
+    file_path.write_bytes(b'not a cache file')
+
+    _, outer_tables = get_trellis_tables(4, Fraction(1, 2), 60, zero_terminated=False, cache_dir=tmp_path)
+    assert not outer_tables.zero_terminated
+    assert outer_tables.valid_edges.shape == (60, 4, 2)